@@ -0,0 +1,439 @@
+# Imports
+import numpy as np
+from collections import Counter
+from replicates import SeasonResult
+
+
+class RunningMoments:
+    def __init__(self, size):
+        """
+        Method:
+            init method for RunningMoments class. Keeps the mean and variance of
+            every element of a fixed length vector as replicates stream in, using
+            Welford's update so nothing but the running totals is stored.
+
+        Params:
+            size (int): The length of the vectors being aggregated
+        """
+        self.count = 0
+        self.mean = np.zeros(size)
+        self.m2 = np.zeros(size)
+
+    def update(self, values):
+        """
+        Method:
+            Adds one replicate
+
+        Params:
+            values (np.ndarray): One value per element
+        """
+        self.count += 1
+        delta = values - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (values - self.mean)
+
+    def merge(self, other):
+        """
+        Method:
+            Combines the moments of another aggregator over the same elements into this one
+
+        Params:
+            other (RunningMoments)
+        """
+        if other.count == 0:
+            return None
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta**2 * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+
+    def variance(self, ddof=0):
+        """
+        Method:
+            Returns the variance of every element
+
+        Params:
+            ddof (int): Delta degrees of freedom, 1 for the sample variance
+
+        Return:
+            variance (np.ndarray)
+        """
+        if self.count <= ddof:
+            return np.full_like(self.mean, np.nan)
+        return self.m2 / (self.count - ddof)
+
+    def std(self, ddof=0):
+        return np.sqrt(self.variance(ddof))
+
+
+class QuantileSketch:
+    def __init__(self, size, numBins=512):
+        """
+        Method:
+            init method for QuantileSketch class. An equal width histogram per element
+            with its own range, which doubles (merging neighbouring bins) whenever one
+            of the element's values falls outside it. Each range starts narrow around
+            the element's first value, so it only grows as far as that element's
+            values spread and quantiles are accurate to within a small fraction of it.
+
+        Params:
+            size (int): The length of the vectors being aggregated
+            numBins (int): The number of bins per element, must be even
+        """
+        self.size = size
+        self.numBins = numBins
+        self.count = 0
+        # Lowest value and bin width of each element's histogram, set by the first replicate
+        self.low = None
+        self.binWidth = None
+        self.counts = np.zeros((size, numBins), dtype=np.int64)
+
+    def update(self, values):
+        """
+        Method:
+            Adds one replicate
+
+        Params:
+            values (np.ndarray): One value per element
+        """
+        values = np.asarray(values, dtype=float)
+
+        # An infinite value would never fit however far its range doubled
+        if not np.isfinite(values).all():
+            raise ValueError("QuantileSketch values must be finite")
+
+        # The first replicate centres each range on the element's value, a small fraction of its size wide
+        if self.low is None:
+            span = np.where(values != 0, np.abs(values), 1.0) / self.numBins
+            self.low = values - span / 2
+            self.binWidth = span / self.numBins
+
+        # Double the ranges of the elements with a value outside them until every value fits
+        while True:
+            below = values < self.low
+            outside = below | (values >= self.low + self.binWidth * self.numBins)
+            if not outside.any():
+                break
+            self.expand(outside, below)
+
+        bins = np.clip(((values - self.low) / self.binWidth).astype(int), 0, self.numBins - 1)
+        self.counts[np.arange(self.size), bins] += 1
+        self.count += 1
+
+    def expand(self, rows, downwards):
+        """
+        Method:
+            Doubles the range of some elements by merging pairs of bins into one half
+            of their histograms
+
+        Params:
+            rows (np.ndarray): Boolean mask of the elements to expand
+            downwards (np.ndarray): Boolean mask of the elements to extend below their current low, the rest extend above
+        """
+        half = self.numBins // 2
+        merged = self.counts[rows].reshape(-1, half, 2).sum(axis=2)
+        down = downwards[rows]
+
+        expanded = np.zeros((len(merged), self.numBins), dtype=self.counts.dtype)
+        expanded[down, half:] = merged[down]
+        expanded[~down, :half] = merged[~down]
+        self.counts[rows] = expanded
+
+        self.low[rows] -= np.where(down, self.binWidth[rows] * self.numBins, 0)
+        self.binWidth[rows] *= 2
+
+    def quantile(self, q):
+        """
+        Method:
+            Estimates a quantile of every element, interpolating within the bin it falls in
+
+        Params:
+            q (float): The quantile in [0, 1]
+
+        Return:
+            values (np.ndarray)
+        """
+        if self.count == 0:
+            return np.full(self.size, np.nan)
+
+        cumulative = np.cumsum(self.counts, axis=1)
+        target = q * self.count
+        bins = np.argmax(cumulative >= target, axis=1)
+
+        rows = np.arange(self.size)
+        before = np.where(bins > 0, cumulative[rows, np.maximum(bins - 1, 0)], 0)
+        inBin = self.counts[rows, bins]
+        fraction = np.divide(target - before, inBin, out=np.full(self.size, 0.5), where=inBin > 0)
+        return self.low + (bins + fraction) * self.binWidth
+
+    def median(self):
+        return self.quantile(0.5)
+
+
+class RankHistogram:
+    def __init__(self, numPlayers):
+        """
+        Method:
+            init method for RankHistogram class. Counts how often each strategy's
+            players finish at every ranking position.
+
+        Params:
+            numPlayers (int): The number of ranking positions
+        """
+        self.numPlayers = numPlayers
+        self.counts = {}
+
+    def update(self, strategyNames):
+        """
+        Method:
+            Adds one replicate
+
+        Params:
+            strategyNames (List(str)): The strategy of the player at each ranking position
+        """
+        names = np.asarray(strategyNames)
+        for name in np.unique(names):
+            if name not in self.counts:
+                self.counts[name] = np.zeros(self.numPlayers, dtype=np.int64)
+            self.counts[name][names == name] += 1
+
+    def strategies(self):
+        return list(self.counts.keys())
+
+    def mean(self, strategy):
+        counts = self.counts[strategy]
+        return (counts * np.arange(1, self.numPlayers + 1)).sum() / counts.sum()
+
+    def std(self, strategy):
+        counts = self.counts[strategy]
+        ranks = np.arange(1, self.numPlayers + 1)
+        return np.sqrt((counts * (ranks - self.mean(strategy)) ** 2).sum() / counts.sum())
+
+    def quantile(self, strategy, q):
+        """
+        Method:
+            Returns a quantile of a strategy's rankings, interpolating between
+            ranks the way np.quantile does for the raw rankings
+
+        Params:
+            strategy (str)
+            q (float): The quantile in [0, 1]
+
+        Return:
+            ranking (float)
+        """
+        counts = self.counts[strategy]
+        cumulative = np.cumsum(counts)
+        position = q * (cumulative[-1] - 1)
+
+        # Ranks of the order statistics either side of the position
+        lower = np.searchsorted(cumulative, np.floor(position), side="right") + 1
+        upper = np.searchsorted(cumulative, np.ceil(position), side="right") + 1
+        return lower + (upper - lower) * (position - np.floor(position))
+
+    def fraction_within(self, strategy, ranking):
+        """
+        Method:
+            Fraction of a strategy's players that finished at or above a ranking
+
+        Params:
+            strategy (str)
+            ranking (int)
+
+        Return:
+            fraction (float)
+        """
+        counts = self.counts[strategy]
+        return counts[:ranking].sum() / counts.sum()
+
+    def box_stats(self, strategy):
+        """
+        Method:
+            Summary statistics in the form matplotlib's bxp draws, with whiskers at
+            the furthest rankings within 1.5 interquartile ranges of the box
+
+        Params:
+            strategy (str)
+
+        Return:
+            stats (dict)
+        """
+        q1, median, q3 = (self.quantile(strategy, q) for q in (0.25, 0.5, 0.75))
+        iqr = q3 - q1
+        ranks = np.flatnonzero(self.counts[strategy]) + 1
+        return {
+            "label": strategy,
+            "med": median,
+            "q1": q1,
+            "q3": q3,
+            "whislo": ranks[ranks >= q1 - 1.5 * iqr].min(),
+            "whishi": ranks[ranks <= q3 + 1.5 * iqr].max(),
+            "fliers": [],
+        }
+
+
+class ReplicateArray:
+    def __init__(self, numPlayers, fields=SeasonResult.COLUMNS, capacity=64):
+        """
+        Method:
+            init method for ReplicateArray class. Holds every replicate as one dense
+            array of shape (replicates, positions, stats) so that aggregating across
+            replicates is a single reduction over the first axis. Capacity doubles
+            as replicates are added.
+
+        Params:
+            numPlayers (int): The number of ranking positions
+            fields (tuple(str)): The stats held, in column order
+            capacity (int): The number of replicates to allocate space for up front
+        """
+        self.fields = fields
+        self.fieldIndex = {field: i for i, field in enumerate(fields)}
+        self.count = 0
+        self.values = np.empty((max(1, capacity), numPlayers, len(fields)))
+
+    @property
+    def data(self):
+        return self.values[: self.count]
+
+    def update(self, stats):
+        """
+        Method:
+            Adds one replicate
+
+        Params:
+            stats (dict): Maps each field to its values in ranking order
+        """
+        if self.count == len(self.values):
+            grown = np.empty((2 * len(self.values),) + self.values.shape[1:])
+            grown[: self.count] = self.values
+            self.values = grown
+
+        for field, i in self.fieldIndex.items():
+            self.values[self.count, :, i] = stats[field]
+        self.count += 1
+
+    def mean(self):
+        return self.data.mean(axis=0)
+
+    def median(self):
+        return np.median(self.data, axis=0)
+
+    def quantile(self, q):
+        return np.quantile(self.data, q, axis=0)
+
+
+class PositionAggregator:
+    def __init__(self, numPlayers, fields=SeasonResult.COLUMNS, numBins=512, keepArray=False):
+        """
+        Method:
+            init method for PositionAggregator class. Streams player attributes by
+            ranking position: moments and a quantile sketch per attribute, and the
+            name seen most often at each position. Optionally every replicate is
+            also kept in a ReplicateArray for exact quantiles.
+
+        Params:
+            numPlayers (int): The number of ranking positions
+            fields (tuple(str)): The attributes to aggregate
+            numBins (int): Bins per position in each quantile sketch
+            keepArray (bool): Whether to keep every replicate in a dense array
+        """
+        self.numPlayers = numPlayers
+        self.fields = fields
+        self.moments = {field: RunningMoments(numPlayers) for field in fields}
+        self.sketches = {field: QuantileSketch(numPlayers, numBins) for field in fields}
+        self.names = [Counter() for _ in range(numPlayers)]
+        self.array = ReplicateArray(numPlayers, fields) if keepArray else None
+        self.count = 0
+
+    def update(self, stats, names):
+        """
+        Method:
+            Adds one replicate
+
+        Params:
+            stats (dict): Maps each field to its values in ranking order
+            names (List(str)): Player names in ranking order
+        """
+        for field in self.fields:
+            values = stats[field].astype(float)
+            self.moments[field].update(values)
+            self.sketches[field].update(values)
+        for counter, name in zip(self.names, names):
+            counter[name] += 1
+        if self.array is not None:
+            self.array.update(stats)
+        self.count += 1
+
+    def mean(self, field):
+        return self.moments[field].mean
+
+    def std(self, field):
+        return self.moments[field].std()
+
+    def median(self, field):
+        return self.sketches[field].median()
+
+    def most_common_names(self):
+        return [counter.most_common(1)[0][0] for counter in self.names]
+
+    def aggregate(self, method="average", q=None):
+        """
+        Method:
+            Aggregates every field across replicates, exactly from the dense array
+            when it is kept and from the running moments and sketches otherwise
+
+        Params:
+            method (str): "average", "median" or "quantile"
+            q (float): The quantile for the "quantile" method
+
+        Return:
+            values (np.ndarray): Shape (positions, fields), columns in the order of self.fields
+        """
+        if method == "median":
+            q = 0.5
+        elif method != "quantile":
+            if self.array is not None:
+                return self.array.mean()
+            return np.column_stack([self.moments[field].mean for field in self.fields])
+
+        if self.array is not None:
+            return self.array.quantile(q)
+        return np.column_stack([self.sketches[field].quantile(q) for field in self.fields])
+
+
+class ReplicateAggregator:
+    def __init__(self, numPlayers, numBins=512, keepArray=False):
+        """
+        Method:
+            init method for ReplicateAggregator class. Folds SeasonResults in one at
+            a time, keeping only per position and per strategy summaries so memory
+            does not grow with the number of replicates, unless the dense arrays
+            of every replicate are asked for.
+
+        Params:
+            numPlayers (int): The number of players in each season
+            numBins (int): Bins per position in each quantile sketch
+            keepArray (bool): Whether to also keep every replicate for exact quantiles
+        """
+        self.numPlayers = numPlayers
+        self.actual = PositionAggregator(numPlayers, numBins=numBins, keepArray=keepArray)
+        self.predicted = PositionAggregator(numPlayers, numBins=numBins, keepArray=keepArray)
+        self.strategyRanks = RankHistogram(numPlayers)
+        self.count = 0
+
+    def update(self, result):
+        """
+        Method:
+            Adds one replicate
+
+        Params:
+            result (SeasonResult)
+        """
+        self.actual.update(result.stats, result.names)
+
+        order = result.predictedOrder
+        self.predicted.update({field: values[order] for field, values in result.stats.items()}, [result.names[i] for i in order])
+
+        self.strategyRanks.update(result.strategyNames)
+        self.count += 1
@@ -0,0 +1,66 @@
+# Imports
+import numpy as np
+from random_streams import resolve_rng
+
+
+class AliasTable:
+    def __init__(self, probabilities):
+        """
+        Method:
+            init method for AliasTable class. Builds Walker's alias table (Vose's
+            method) so that a discrete distribution can be sampled in constant time
+            from a single uniform draw.
+
+        Params:
+            probabilities (array like): The probability of each outcome
+        """
+        probabilities = np.asarray(probabilities, dtype=float)
+        self.size = len(probabilities)
+
+        # Scale so that the average bucket holds exactly 1
+        scaled = (probabilities / probabilities.sum() * self.size).tolist()
+        self.accept = [1.0] * self.size
+        self.alias = list(range(self.size))
+
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+
+        # Pair each under full bucket with an over full one
+        while small and large:
+            smallIndex = small.pop()
+            largeIndex = large.pop()
+
+            self.accept[smallIndex] = scaled[smallIndex]
+            self.alias[smallIndex] = largeIndex
+
+            scaled[largeIndex] -= 1 - scaled[smallIndex]
+            if scaled[largeIndex] < 1:
+                small.append(largeIndex)
+            else:
+                large.append(largeIndex)
+
+        # Anything left over is full up to rounding error
+        for index in small + large:
+            self.accept[index] = 1.0
+
+    def sample(self, uniform=None, rng=None):
+        """
+        Method:
+            Samples an outcome index
+
+        Params:
+            uniform (float): Optional uniform value in [0, 1) to sample with
+            rng (np.random.Generator): Generator to draw from when no uniform is given
+
+        Return:
+            index (int)
+        """
+        if uniform is None:
+            uniform = resolve_rng(rng).random()
+
+        # The integer part picks a bucket and the fractional part chooses within it
+        position = uniform * self.size
+        index = min(int(position), self.size - 1)
+        if position - index < self.accept[index]:
+            return index
+        return self.alias[index]
@@ -0,0 +1,481 @@
+"""
+
+Seeded benchmarks of every layer of the simulation, from a single game up to full seasons
+
+    python benchmarks.py run --output baseline.json
+    python benchmarks.py run --output current.json --baseline baseline.json
+    python benchmarks.py compare baseline.json current.json
+    python benchmarks.py run --group scaling --sizes 200 2000 20000
+
+Every benchmark draws its players and random streams from a seed derived from the
+suite seed and its own name, so reruns and filtered runs time exactly the same work.
+Results are written as JSON, and comparing against a baseline exits with status 1
+when any benchmark has slowed down by more than the threshold.
+
+"""
+
+# Imports
+import argparse
+import fnmatch
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import zlib
+from datetime import datetime, timezone
+import numpy as np
+from game import Game
+from tiebreak import Tiebreak, get_tiebreak_distribution
+from set import Set, get_set_distribution
+from match import Match, get_quantized_match_win_probability
+from tournament import GrandSlam, ATP250
+from win_matrix import WinMatrix
+from season import Season
+from player import Player, PlayerPool
+from replicates import assign_strategies
+
+# Field sizes of the scaling benchmarks
+SCALING_SIZES = (200, 2000, 20000)
+
+# Caches that every call of a layer benchmark hits after the first, as it replays one pair of players
+TIEBREAK_CACHES = (get_tiebreak_distribution,)
+SET_CACHES = (get_tiebreak_distribution, get_set_distribution)
+MATCH_CACHES = (get_quantized_match_win_probability,)
+
+
+class Benchmark:
+    def __init__(self, name, group, setup, number=1, repeats=5, warmup=False, params=None):
+        """
+        Method:
+            init method for Benchmark class. A named piece of work that is set up
+            afresh for every repeat and then timed over a number of calls.
+
+        Params:
+            name (str): Unique name of the benchmark
+            group (str): "layer" for the per layer benchmarks or "scaling" for field size scaling
+            setup (function): Takes a SeedSequence and returns the function to time, called with no arguments
+            number (int): Calls timed in each repeat
+            repeats (int): Times the benchmark is set up and timed
+            warmup (bool): Whether to make one untimed call before timing, for work that does not change state
+            params (dict): Parameters recorded alongside the timings
+        """
+        self.name = name
+        self.group = group
+        self.setup = setup
+        self.number = number
+        self.repeats = repeats
+        self.warmup = warmup
+        self.params = params or {}
+
+    def get_seed_sequence(self, seed, repeat):
+        """
+        Method:
+            Seed of one repeat, depending only on the suite seed, the benchmark name and the repeat
+
+        Params:
+            seed (int): The suite seed
+            repeat (int): The repeat number
+
+        Return:
+            seedSequence (np.random.SeedSequence)
+        """
+        return np.random.SeedSequence([seed, zlib.crc32(self.name.encode()), repeat])
+
+    def time(self, seed=0, repeats=None):
+        """
+        Method:
+            Times the benchmark with the garbage collector paused, as timeit does
+
+        Params:
+            seed (int): The suite seed
+            repeats (int): Overrides the benchmark's own number of repeats when given
+
+        Return:
+            result (dict): Seconds per call of every repeat and their summary statistics
+        """
+        times = []
+        for repeat in range(repeats or self.repeats):
+            run = self.setup(self.get_seed_sequence(seed, repeat))
+            if self.warmup:
+                run()
+
+            gcEnabled = gc.isenabled()
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                for _ in range(self.number):
+                    run()
+                elapsed = time.perf_counter() - start
+            finally:
+                if gcEnabled:
+                    gc.enable()
+
+            times.append(elapsed / self.number)
+
+        return {
+            "group": self.group,
+            "params": self.params,
+            "number": self.number,
+            "repeats": len(times),
+            "times": times,
+            "min": min(times),
+            "median": statistics.median(times),
+            "mean": statistics.fmean(times),
+            "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        }
+
+
+def make_field(numPlayers, seedSequence, original=False):
+    """
+    Method:
+        Creates a field of players sharing one pool. Names are numbered rather
+        than drawn, so fields can be larger than the pool of random names.
+
+    Params:
+        numPlayers (int)
+        seedSequence (np.random.SeedSequence)
+        original (bool): Whether every player uses the original strategy, the five strategies in rotation otherwise
+
+    Return:
+        players (List(Player))
+    """
+    rng = np.random.default_rng(seedSequence)
+    pool = PlayerPool(numPlayers)
+    players = [Player(f"Player {i}", pool, rng) for i in range(numPlayers)]
+    assign_strategies(players, original)
+    return players
+
+
+def setup_game(seedSequence):
+    playerSeed, runSeed = seedSequence.spawn(2)
+    server, returner = make_field(2, playerSeed)
+    return Game(server, returner, rng=np.random.default_rng(runSeed)).simulate_game
+
+
+def setup_tiebreak(seedSequence):
+    playerSeed, runSeed = seedSequence.spawn(2)
+    server, returner = make_field(2, playerSeed)
+    return Tiebreak(server, returner, rng=np.random.default_rng(runSeed)).simulate_tiebreak
+
+
+def setup_set(seedSequence):
+    playerSeed, runSeed = seedSequence.spawn(2)
+    server, returner = make_field(2, playerSeed)
+    return Set(server, returner, rng=np.random.default_rng(runSeed)).simulate_set
+
+
+def uncached(setup, caches):
+    """
+    Method:
+        Wraps a benchmark setup so the given lru caches are emptied before every
+        call, so the call times the computation the caches would otherwise skip
+
+    Params:
+        setup (function): Takes a SeedSequence and returns the function to time
+        caches (tuple(function)): lru_cache wrapped functions to clear
+
+    Return:
+        setup (function)
+    """
+    def uncachedSetup(seedSequence):
+        run = setup(seedSequence)
+
+        def uncachedRun():
+            for cache in caches:
+                cache.cache_clear()
+            run()
+
+        return uncachedRun
+
+    return uncachedSetup
+
+
+def get_match_setup(setFormat):
+    """
+    Method:
+        Builds the setup of a match benchmark. Matches change both players' form,
+        so it is reset after every match to keep each call the same work.
+
+    Params:
+        setFormat (int): 3 or 5 sets
+
+    Return:
+        setup (function)
+    """
+    def setup(seedSequence):
+        playerSeed, runSeed = seedSequence.spawn(2)
+        player1, player2 = make_field(2, playerSeed)
+        forms = (player1.form, player2.form)
+        rng = np.random.default_rng(runSeed)
+
+        def run():
+            Match(player1, player2, setFormat, rng=rng).simulate_match()
+            player1.form, player2.form = forms
+
+        return run
+
+    return setup
+
+
+def get_tournament_setup(tournamentClass, setFormat):
+    """
+    Method:
+        Builds the setup of a tournament benchmark, which draws and plays one
+        edition of the tournament with a full field the way the season does
+
+    Params:
+        tournamentClass (type): The Tournament subclass to play
+        setFormat (int): 3 or 5 sets
+
+    Return:
+        setup (function)
+    """
+    def setup(seedSequence):
+        playerSeed, runSeed = seedSequence.spawn(2)
+        tournament = tournamentClass("Hard", "Benchmark")
+        tournament.add_set_format(setFormat)
+        players = make_field(tournament.drawSize, playerSeed)
+        rng = np.random.default_rng(runSeed)
+
+        def run():
+            tournament.winMatrix = WinMatrix(players, setFormat)
+            tournament.generate_draw(players, rng=rng)
+            tournament.simulate_tournament()
+
+        return run
+
+    return setup
+
+
+def get_season_setup(numPlayers):
+    """
+    Method:
+        Builds the setup of a season benchmark over a field of the given size,
+        with the five strategies in rotation
+
+    Params:
+        numPlayers (int)
+
+    Return:
+        setup (function)
+    """
+    def setup(seedSequence):
+        playerSeed, seasonSeed = seedSequence.spawn(2)
+        season = Season(make_field(numPlayers, playerSeed), seasonSeed)
+        return season.simulate_season
+
+    return setup
+
+
+def get_benchmarks(sizes=SCALING_SIZES):
+    """
+    Method:
+        Returns every benchmark in the suite
+
+    Params:
+        sizes (tuple(int)): Field sizes of the scaling benchmarks
+
+    Return:
+        benchmarks (List(Benchmark))
+    """
+    benchmarks = [
+        Benchmark("game", "layer", setup_game, number=20000, warmup=True),
+        # The layers compute their distributions on every call, the cached variants time the cache hits
+        Benchmark("tiebreak", "layer", uncached(setup_tiebreak, TIEBREAK_CACHES), number=2000, warmup=True),
+        Benchmark("tiebreak_cached", "layer", setup_tiebreak, number=20000, warmup=True),
+        Benchmark("set", "layer", uncached(setup_set, SET_CACHES), number=2000, warmup=True),
+        Benchmark("set_cached", "layer", setup_set, number=20000, warmup=True),
+        Benchmark("match_best_of_3", "layer", uncached(get_match_setup(3), MATCH_CACHES), number=1000, warmup=True, params={"setFormat": 3}),
+        Benchmark("match_best_of_3_cached", "layer", get_match_setup(3), number=5000, warmup=True, params={"setFormat": 3}),
+        Benchmark("match_best_of_5", "layer", uncached(get_match_setup(5), MATCH_CACHES), number=1000, warmup=True, params={"setFormat": 5}),
+        Benchmark("match_best_of_5_cached", "layer", get_match_setup(5), number=5000, warmup=True, params={"setFormat": 5}),
+        Benchmark("tournament_64", "layer", get_tournament_setup(ATP250, 3), repeats=20, params={"drawSize": 64}),
+        Benchmark("tournament_128", "layer", get_tournament_setup(GrandSlam, 5), repeats=20, params={"drawSize": 128}),
+        Benchmark("season_200", "layer", get_season_setup(200), repeats=3, params={"numPlayers": 200}),
+    ]
+    for numPlayers in sizes:
+        benchmarks.append(Benchmark(f"season_scaling_{numPlayers}", "scaling", get_season_setup(numPlayers), repeats=1 if numPlayers > 2000 else 3, params={"numPlayers": numPlayers}))
+    return benchmarks
+
+
+def select_benchmarks(benchmarks, patterns=None, group=None):
+    """
+    Method:
+        Filters benchmarks by group and by shell style patterns on their names
+
+    Params:
+        benchmarks (List(Benchmark))
+        patterns (List(str)): Keep benchmarks matching any pattern, all of them if None
+        group (str): Keep only this group, both if None
+
+    Return:
+        benchmarks (List(Benchmark))
+    """
+    return [
+        benchmark for benchmark in benchmarks
+        if (group is None or benchmark.group == group)
+        and (not patterns or any(fnmatch.fnmatch(benchmark.name, pattern) for pattern in patterns))
+    ]
+
+
+def run_suite(benchmarks, seed=0, repeats=None, verbose=True):
+    """
+    Method:
+        Times every benchmark and collects the results along with the environment they ran in
+
+    Params:
+        benchmarks (List(Benchmark))
+        seed (int): The suite seed
+        repeats (int): Overrides every benchmark's number of repeats when given
+        verbose (bool): Whether to print each result as it finishes
+
+    Return:
+        report (dict)
+    """
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "seed": seed,
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpuCount": os.cpu_count(),
+        },
+        "benchmarks": {},
+    }
+
+    for benchmark in benchmarks:
+        result = benchmark.time(seed, repeats)
+        report["benchmarks"][benchmark.name] = result
+        if verbose:
+            print(f"{benchmark.name:<24}{format_seconds(result['min']):>12}{format_seconds(result['median']):>12}  x{benchmark.number} over {result['repeats']} repeats")
+
+    return report
+
+
+def compare_reports(baseline, current, threshold=0.2):
+    """
+    Method:
+        Compares the fastest repeat of every benchmark in both reports. A benchmark
+        regresses when it is more than threshold slower than the baseline, and
+        improves when the baseline is more than threshold slower than it.
+
+    Params:
+        baseline (dict): Report to compare against
+        current (dict): Report being checked
+        threshold (float): Relative change treated as noise
+
+    Return:
+        rows (List(dict)): One row per benchmark in both reports
+    """
+    rows = []
+    for name, result in current["benchmarks"].items():
+        if name not in baseline["benchmarks"]:
+            continue
+        baselineTime = baseline["benchmarks"][name]["min"]
+        ratio = result["min"] / baselineTime
+
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 / (1 + threshold):
+            status = "improvement"
+        else:
+            status = "ok"
+
+        rows.append({"name": name, "baseline": baselineTime, "current": result["min"], "ratio": ratio, "status": status})
+    return rows
+
+
+def print_comparison(rows):
+    print(f"\n{'Benchmark':<24}{'Baseline':>12}{'Current':>12}{'Ratio':>8}  Status")
+    for row in rows:
+        print(f"{row['name']:<24}{format_seconds(row['baseline']):>12}{format_seconds(row['current']):>12}{row['ratio']:>8.2f}  {row['status']}")
+
+
+def format_seconds(seconds):
+    """
+    Method:
+        Formats a duration with the most readable unit
+
+    Params:
+        seconds (float)
+
+    Return:
+        text (str)
+    """
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def load_report(path):
+    with open(path) as file:
+        return json.load(file)
+
+
+def run_command(args):
+    benchmarks = select_benchmarks(get_benchmarks(tuple(args.sizes)), args.filter, args.group)
+    if not benchmarks:
+        sys.exit("No benchmarks match the filters")
+
+    print(f"{'Benchmark':<24}{'Min':>12}{'Median':>12}")
+    report = run_suite(benchmarks, args.seed, args.repeats)
+
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.baseline is not None:
+        rows = compare_reports(load_report(args.baseline), report, args.threshold)
+        print_comparison(rows)
+        if any(row["status"] == "regression" for row in rows):
+            sys.exit(1)
+
+
+def compare_command(args):
+    rows = compare_reports(load_report(args.baseline), load_report(args.current), args.threshold)
+    print_comparison(rows)
+    if any(row["status"] == "regression" for row in rows):
+        sys.exit(1)
+
+
+def build_parser():
+    """
+    Build the argument parser with the run and compare subcommands
+    """
+    parser = argparse.ArgumentParser(description="Seeded benchmarks of the simulation layers")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    # Options for flagging regressions
+    comparison = argparse.ArgumentParser(add_help=False)
+    comparison.add_argument("--threshold", type=float, default=0.2, help="relative slowdown flagged as a regression")
+
+    run = subparsers.add_parser("run", parents=[comparison], help="run the benchmarks")
+    run.add_argument("--filter", nargs="+", default=None, help="only run benchmarks whose names match these patterns")
+    run.add_argument("--group", choices=["layer", "scaling"], default=None, help="only run one group of benchmarks")
+    run.add_argument("--sizes", type=int, nargs="+", default=list(SCALING_SIZES), help="field sizes of the scaling benchmarks")
+    run.add_argument("--seed", type=int, default=0, help="suite seed")
+    run.add_argument("--repeats", type=int, default=None, help="override the repeats of every benchmark")
+    run.add_argument("--output", default=None, help="JSON file to write the results to")
+    run.add_argument("--baseline", default=None, help="JSON results to compare against")
+    run.set_defaults(func=run_command)
+
+    compare = subparsers.add_parser("compare", parents=[comparison], help="compare two stored results")
+    compare.add_argument("baseline", help="JSON results to compare against")
+    compare.add_argument("current", help="JSON results being checked")
+    compare.set_defaults(func=compare_command)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
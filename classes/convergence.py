@@ -0,0 +1,224 @@
+# Imports
+import math
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+from aggregators import RunningMoments
+from random_streams import as_seed_sequence
+from replicates import iter_replicates
+
+
+def get_mean_ranks(result):
+    """
+    Method:
+        Average final ranking of each strategy's players in one season
+
+    Params:
+        result (SeasonResult)
+
+    Return:
+        values (dict): Maps each strategy to its mean ranking
+    """
+    names = np.asarray(result.strategyNames)
+    ranks = np.arange(1, len(names) + 1)
+    return {strategy: ranks[names == strategy].mean() for strategy in np.unique(names)}
+
+
+def get_top50_percentages(result, cutoff=50):
+    """
+    Method:
+        Percentage of each strategy's players that finished inside the top 50 in one season
+
+    Params:
+        result (SeasonResult)
+        cutoff (int): The last ranking counted as inside
+
+    Return:
+        values (dict): Maps each strategy to its percentage
+    """
+    names = np.asarray(result.strategyNames)
+    inside = np.arange(1, len(names) + 1) <= cutoff
+    return {strategy: inside[names == strategy].mean() * 100 for strategy in np.unique(names)}
+
+
+class ConvergenceMonitor:
+    # Per season metrics that can be tracked, each giving one value per strategy
+    METRICS = {
+        "mean_rank": get_mean_ranks,
+        "top50": get_top50_percentages,
+    }
+
+    def __init__(self, targets, confidence=0.95, minReplicates=10):
+        """
+        Method:
+            init method for ConvergenceMonitor class. Tracks the mean of per season
+            metrics across replicates and the half width of their confidence
+            intervals. Seasons are independent, so each interval is the normal
+            approximation z * s / sqrt(n) over the per season values.
+
+        Params:
+            targets (dict): Maps each metric in METRICS to the half width it must reach, in the metric's units
+            confidence (float): Confidence level of the intervals
+            minReplicates (int): Replicates needed before the sample standard deviation is trusted
+        """
+        unknown = set(targets) - set(self.METRICS)
+        if unknown:
+            raise ValueError(f"Unknown metrics {sorted(unknown)}, choose from {sorted(self.METRICS)}")
+
+        self.targets = dict(targets)
+        self.confidence = confidence
+        self.minReplicates = max(2, minReplicates)
+        self.z = NormalDist().inv_cdf((1 + confidence) / 2)
+
+        # Named values and their targets, fixed by the first replicate
+        self.names = None
+        self.nameTargets = None
+        self.moments = None
+        self.count = 0
+
+        # Set by iter_until_converged when it stops
+        self.stopReason = None
+        self.elapsed = None
+
+    def get_values(self, result):
+        """
+        Method:
+            Computes every tracked metric for one season
+
+        Params:
+            result (SeasonResult)
+
+        Return:
+            values (dict): Maps "metric[strategy]" to its value
+        """
+        values = {}
+        for metric in self.targets:
+            for strategy, value in self.METRICS[metric](result).items():
+                values[f"{metric}[{strategy}]"] = value
+        return values
+
+    def update(self, result):
+        """
+        Method:
+            Adds one replicate
+
+        Params:
+            result (SeasonResult)
+        """
+        values = self.get_values(result)
+        if self.names is None:
+            self.names = list(values)
+            self.nameTargets = np.array([self.targets[name.split("[")[0]] for name in self.names])
+            self.moments = RunningMoments(len(self.names))
+
+        self.moments.update(np.array([values.get(name, np.nan) for name in self.names]))
+        self.count += 1
+
+    def half_widths(self):
+        """
+        Method:
+            Half width of the confidence interval of every tracked value, infinite before minReplicates
+
+        Return:
+            halfWidths (np.ndarray)
+        """
+        if self.count < self.minReplicates:
+            return np.full(len(self.names or ()), np.inf)
+        return self.z * self.moments.std(ddof=1) / math.sqrt(self.count)
+
+    def is_converged(self):
+        return self.names is not None and bool((self.half_widths() <= self.nameTargets).all())
+
+    def get_required_replicates(self):
+        """
+        Method:
+            Projects the total replicates needed for every value to reach its target,
+            as the half width shrinks with the square root of the replicates
+
+        Return:
+            required (int): None until minReplicates have been seen
+        """
+        if self.count < self.minReplicates:
+            return None
+        ratio = (self.half_widths() / self.nameTargets).max()
+        return math.ceil(self.count * ratio**2)
+
+    def summary(self):
+        """
+        Method:
+            Achieved precision of every tracked value
+
+        Return:
+            report (dict): Maps "metric[strategy]" to its mean, half width and target
+        """
+        if self.names is None:
+            return {}
+        halfWidths = self.half_widths()
+        return {
+            name: {"mean": float(mean), "halfWidth": float(halfWidth), "target": float(target), "converged": bool(halfWidth <= target)}
+            for name, mean, halfWidth, target in zip(self.names, self.moments.mean, halfWidths, self.nameTargets)
+        }
+
+
+def iter_until_converged(monitor, numPlayers=200, original=False, maxReplicates=1000, timeBudget=None, batchSize=None, workers=None, seed=None):
+    """
+    Method:
+        Simulates seasons in batches until every metric of the monitor reaches its
+        target half width, the wall clock budget is spent or maxReplicates have run.
+        After the first batch each batch is sized from the projected number of
+        replicates still needed and the time left. The reason for stopping is left
+        in monitor.stopReason and the time taken in monitor.elapsed.
+
+        Batches continue spawning from one root SeedSequence, so a run that stops
+        after n replicates gives the same seasons as iter_replicates(n, seed=seed).
+
+    Params:
+        monitor (ConvergenceMonitor): Monitor every result is added to
+        numPlayers (int): The number of players in each season
+        original (bool): Whether every player uses the original strategy
+        maxReplicates (int): Upper limit on the number of seasons
+        timeBudget (float): Seconds of wall clock time to stop after, no limit if None
+        batchSize (int): Largest batch, four seasons per worker if None
+        workers (int): Number of worker processes, every core if None and in process if 1
+        seed (int | np.random.SeedSequence): Root seed for the whole run, fresh entropy if None
+
+    Yield:
+        result (SeasonResult)
+    """
+    root = as_seed_sequence(seed)
+    workers = workers or os.cpu_count() or 1
+    batchSize = batchSize or 4 * workers
+    start = time.perf_counter()
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while True:
+            elapsed = time.perf_counter() - start
+            if monitor.is_converged():
+                monitor.stopReason = "converged"
+            elif monitor.count >= maxReplicates:
+                monitor.stopReason = "max replicates"
+            elif timeBudget is not None and elapsed >= timeBudget:
+                monitor.stopReason = "time budget"
+            if monitor.stopReason is not None:
+                monitor.elapsed = elapsed
+                break
+
+            # Enough for the projected need, but never more than the time left allows
+            size = batchSize
+            required = monitor.get_required_replicates()
+            if required is not None:
+                size = min(size, max(workers, required - monitor.count))
+            if timeBudget is not None and monitor.count > 0:
+                replicatesLeft = int((timeBudget - elapsed) * monitor.count / elapsed)
+                size = min(size, max(workers, replicatesLeft))
+            size = max(1, min(size, maxReplicates - monitor.count))
+
+            for result in iter_replicates(size, numPlayers, original, workers, root, executor):
+                monitor.update(result)
+                yield result
+    finally:
+        if executor is not None:
+            executor.shutdown()
@@ -1,9 +1,12 @@
 # Imports
 import numpy as np
+from hold_table import get_hold_table
+from player import gather_attribute
+from random_streams import resolve_rng
 
 
 class Game:
-    def __init__(self, server, returner):
+    def __init__(self, server, returner, method="table", rng=None):
         """
         Method:
             init method for Game class
@@ -11,14 +14,20 @@ class Game:
         Params:
             server (Player):   The player that is serving in the game
             returner (Player): The player that is returning in the game
+            method (str):      "table" to look the hold probability up in the precomputed
+                               hold table or "markov" to solve the Markov chain for this game
+            rng (np.random.Generator): Generator to draw from, the process wide one if None
         """
         # Players
         self.server = server
         self.returner = returner
+        self.method = method
+        self.rng = resolve_rng(rng)
 
-        # Markov Chain
-        self.markovChainIndex = self.generate_markov_chain_index()
-        self.markovChain = self.generate_markov_chain()
+        # Markov Chain (only needed when solving the chain directly)
+        if method == "markov":
+            self.markovChainIndex = self.generate_markov_chain_index()
+            self.markovChain = self.generate_markov_chain()
 
         # Points
         self.score = (0, 0)
@@ -30,6 +39,36 @@ class Game:
         Method:
             Simulates the game
         """
+        # Fetch the win percentage of server holding their game
+        if self.method == "table":
+            sWin = get_hold_table().lookup(self.get_point_probability())
+        else:
+            sWin = self.compute_hold_probability()
+
+        # Monte Carlo to draw the winner of the game
+        if self.rng.random() <= sWin:
+            self.winner = self.server
+        else:
+            self.winner = self.returner
+
+    def get_point_probability(self):
+        """
+        Method:
+            Calculates probability of server winning each point based on player attributes
+
+        Return:
+            sWin (float): The probability that the server wins a point
+        """
+        return (self.server.serveStrength * self.server.form) / (self.server.serveStrength * self.server.form + self.returner.returnStrength * self.returner.form )
+
+    def compute_hold_probability(self):
+        """
+        Method:
+            Solves the Markov chain of the game for the probability that the server holds
+
+        Return:
+            sWin (float): The probability that the server holds their serve
+        """
         # Get index of initial transition value of markov chain to the absorption value
         startIndex = self.markovChainIndex["0-0"]
         holdIndex = self.markovChainIndex["Hold"]
@@ -40,16 +79,10 @@ class Game:
         # Fetch the win percentage of server holding their game from the fundemental matrix
         start_i = np.where(transient_indices == startIndex)[0][0]
         hold_j = np.where(absorbing_indices == holdIndex)[0][0]
-        sWin = B[start_i, hold_j]
-
-        # Monte Carlo to draw the winner of the game
-        if np.random.uniform(0,1) <= sWin:
-            self.winner = self.server
-        else:
-            self.winner = self.returner
+        return B[start_i, hold_j]
 
-
-    def compute_absorption_probabilities(self, P):
+    @staticmethod
+    def compute_absorption_probabilities(P):
         """
         Compute the absorption probabilities for a Markov chain with absorbing states.
         
@@ -93,8 +126,23 @@ class Game:
             markovChain (np.ndarray): The generated markov chain
         """
         # Obtaining probability that server will win each point based on player attributes
-        sWin = (self.server.serveStrength * self.server.form) / (self.server.serveStrength * self.server.form + self.returner.returnStrength * self.returner.form )
+        sWin = self.get_point_probability()
+
+        return self.build_markov_chain(sWin)
+
+    @staticmethod
+    def build_markov_chain(sWin):
+        """
+        Method:
+            Builds the markov chain of the point transitions of a game for a given
+            probability of the server winning each point
+
+        Params:
+            sWin (float): The probability that the server wins a point
 
+        Return:
+            markovChain (np.ndarray): The generated markov chain
+        """
         # The probability that the returner will win the point is just the compliment of the server's probability
         rWin = 1 - sWin
 
@@ -123,7 +171,8 @@ class Game:
 
         return markovChain
     
-    def generate_markov_chain_index(self):
+    @staticmethod
+    def generate_markov_chain_index():
             """
             Method:
                 Returns a dictionary of the indexes for the markov
@@ -150,4 +199,116 @@ class Game:
                 "30-40": 14,
                 "Hold": 15,
                 "Break": 16,
-            }
\ No newline at end of file
+            }
+
+
+class GameBatch:
+    def __init__(self, serveStrengths, serverForms, returnStrengths, returnerForms):
+        """
+        Method:
+            init method for GameBatch class, the vectorised counterpart of Game that
+            plays many independent games at once. Element i of each array describes
+            the server and returner of game i.
+
+        Params:
+            serveStrengths (np.ndarray):  Serve strengths of the servers
+            serverForms (np.ndarray):     Forms of the servers
+            returnStrengths (np.ndarray): Return strengths of the returners
+            returnerForms (np.ndarray):   Forms of the returners
+        """
+        # Player attributes for each game
+        self.serveStrengths = np.asarray(serveStrengths, dtype=float)
+        self.serverForms = np.asarray(serverForms, dtype=float)
+        self.returnStrengths = np.asarray(returnStrengths, dtype=float)
+        self.returnerForms = np.asarray(returnerForms, dtype=float)
+
+        # Results
+        self.holdProbabilities = None
+        self.serverWins = None
+
+    @classmethod
+    def from_players(cls, servers, returners):
+        """
+        Method:
+            Builds a batch from two equal length lists of players
+
+        Params:
+            servers (List(Player)):   The players serving in each game
+            returners (List(Player)): The players returning in each game
+
+        Return:
+            gameBatch (GameBatch)
+        """
+        return cls(
+            gather_attribute(servers, "serveStrength"),
+            gather_attribute(servers, "form"),
+            gather_attribute(returners, "returnStrength"),
+            gather_attribute(returners, "form"),
+        )
+
+    def get_point_probabilities(self):
+        """
+        Method:
+            Calculates the probability of each server winning a point on serve
+
+        Return:
+            sWin (np.ndarray): The point win probabilities of the servers
+        """
+        serve = self.serveStrengths * self.serverForms
+        return serve / (serve + self.returnStrengths * self.returnerForms)
+
+    def compute_hold_probabilities(self):
+        """
+        Method:
+            Looks up the hold probability of every game in the hold table
+
+        Return:
+            holdProbabilities (np.ndarray): The probability that each server holds
+        """
+        self.holdProbabilities = get_hold_table().lookup_array(self.get_point_probabilities())
+        return self.holdProbabilities
+
+    def simulate_games(self, rng=None):
+        """
+        Method:
+            Simulates every game with a single batch of uniform draws
+
+        Params:
+            rng (np.random.Generator): Generator to draw from, the process wide one if None
+
+        Return:
+            serverWins (np.ndarray): Boolean array, True where the server held
+        """
+        if self.holdProbabilities is None:
+            self.compute_hold_probabilities()
+
+        self.serverWins = resolve_rng(rng).random(self.holdProbabilities.shape) <= self.holdProbabilities
+        return self.serverWins
+
+
+def check_hold_table(holdTable=None, numProbabilities=1000):
+    """
+    Method:
+        Compares the hold table against solving the Markov chain directly over an
+        evenly spaced set of point win probabilities
+
+    Params:
+        holdTable (HoldTable): The table to check, defaults to the process wide table
+        numProbabilities (int): The number of point win probabilities to compare at
+
+    Return:
+        maxError (float): The largest absolute difference in hold probability
+    """
+    holdTable = holdTable if holdTable is not None else get_hold_table()
+    holdIndex = Game.generate_markov_chain_index()["Hold"]
+
+    maxError = 0.0
+    for sWin in np.linspace(0, 1, numProbabilities):
+        # Solve the chain for this point win probability
+        B, transient_indices, absorbing_indices = Game.compute_absorption_probabilities(Game.build_markov_chain(sWin))
+        hold_j = np.where(absorbing_indices == holdIndex)[0][0]
+        markovHold = B[np.where(transient_indices == 0)[0][0], hold_j]
+
+        maxError = max(maxError, abs(holdTable.lookup(sWin) - markovHold))
+
+    return maxError
@@ -0,0 +1,108 @@
+# Imports
+import numpy as np
+
+
+def hold_probability(sWin):
+    """
+    Method:
+        Closed form probability that the server holds serve given the probability
+        that they win any single point on serve. Matches the Markov chain in the
+        Game class, where deuce is treated the same as 30-30.
+
+    Params:
+        sWin (float | np.ndarray): Probability that the server wins a point
+
+    Return:
+        holdProbability (float | np.ndarray): Probability that the server holds
+    """
+    p = np.asarray(sWin, dtype=float)
+    q = 1 - p
+
+    # Winning to 0, 15 or 30 (1, 4 and 10 ways of ordering the lost points)
+    beforeDeuce = p**4 * (1 + 4 * q + 10 * q**2)
+
+    # Reaching deuce (20 orderings of 3-3) and then winning two points in a row before losing two
+    fromDeuce = 20 * p**3 * q**3 * p**2 / (1 - 2 * p * q)
+
+    holdProbability = beforeDeuce + fromDeuce
+    return holdProbability if holdProbability.ndim else float(holdProbability)
+
+
+class HoldTable:
+    def __init__(self, resolution=10001):
+        """
+        Method:
+            init method for HoldTable class. Tabulates the hold probability over an
+            evenly spaced grid of point win probabilities between 0 and 1 so that a
+            game only costs a lookup and a linear interpolation.
+
+        Params:
+            resolution (int): The number of grid points in the table
+        """
+        self.resolution = resolution
+        self.step = 1 / (resolution - 1)
+        self.grid = np.linspace(0, 1, resolution)
+        self.holdProbabilities = hold_probability(self.grid)
+
+        # Plain list copy for fast scalar indexing from Python
+        self.holdList = self.holdProbabilities.tolist()
+
+    def lookup(self, sWin):
+        """
+        Method:
+            Fetches the hold probability for a single point win probability.
+            Probabilities outside of [0, 1] (possible with negative form) are clipped.
+
+        Params:
+            sWin (float): Probability that the server wins a point
+
+        Return:
+            holdProbability (float)
+        """
+        if sWin <= 0:
+            return 0.0
+        if sWin >= 1:
+            return 1.0
+
+        # Find the grid cell and interpolate within it
+        position = sWin / self.step
+        index = int(position)
+        fraction = position - index
+        lower = self.holdList[index]
+        return lower + (self.holdList[index + 1] - lower) * fraction
+
+    def lookup_array(self, sWin):
+        """
+        Method:
+            Vectorised version of lookup for arrays of point win probabilities
+
+        Params:
+            sWin (np.ndarray): Probabilities that the server wins a point
+
+        Return:
+            holdProbabilities (np.ndarray)
+        """
+        # Uniform grid so the cell can be found directly instead of searched for
+        position = np.clip(sWin, 0, 1) / self.step
+        index = np.minimum(position.astype(int), self.resolution - 2)
+        fraction = position - index
+        lower = self.holdProbabilities[index]
+        return lower + (self.holdProbabilities[index + 1] - lower) * fraction
+
+
+# Table is built once per process on first use
+_holdTable = None
+
+
+def get_hold_table():
+    """
+    Method:
+        Returns the process wide hold probability table, building it on first use
+
+    Return:
+        holdTable (HoldTable)
+    """
+    global _holdTable
+    if _holdTable is None:
+        _holdTable = HoldTable()
+    return _holdTable
@@ -0,0 +1,218 @@
+# Imports
+import functools
+import time
+from game import Game
+from tiebreak import Tiebreak
+from set import Set
+from match import Match
+from tournament import Tournament
+from win_matrix import WinMatrix
+from strategies.tournament_strategy import TournamentStrategy
+
+
+class Instrumentation:
+    # Bucket for events that happen outside of any tournament, such as ranking updates
+    NO_TIER = "other"
+
+    # Only one instrumentation can be installed at a time
+    active = None
+
+    def __init__(self):
+        """
+        Method:
+            init method for Instrumentation class. Counts and times the hot paths of
+            the simulation per week and per tournament tier. Nothing is measured until
+            it is installed, which wraps the instrumented methods in place, and
+            uninstalling restores the original methods, so a run without
+            instrumentation executes exactly the same code as before.
+
+            Use as a context manager around the work to measure. Times are inclusive,
+            so a match played inside a tournament counts towards both.
+        """
+        self.week = None
+        self.tier = None
+        self.weekStart = None
+        self.weekSeconds = {}
+        self.records = {}
+        self.originals = []
+
+    def __enter__(self):
+        self.install()
+        return self
+
+    def __exit__(self, *exc):
+        self.uninstall()
+
+    def get_targets(self):
+        """
+        Method:
+            Lists every method that is instrumented
+
+        Return:
+            targets (List(tuple)): (owner, attribute, event, getTier, getItems) where getTier
+                                   and getItems take the call's arguments (and result for
+                                   getItems) and may be None
+        """
+        # Imported here as season imports this module
+        from season import Season
+
+        tournamentTier = lambda args: args[0].type
+        targets = [
+            (Game, "__init__", "game", None, None),
+            (Game, "compute_absorption_probabilities", "markov_inversion", None, None),
+            # Tiebreak points are the points of the final score, none when only the winner was drawn
+            (Tiebreak, "simulate_tiebreak", "tiebreak", None, lambda args, result: sum(args[0].score)),
+            (Set, "simulate_set", "set", None, None),
+            (Match, "simulate_match", "match", None, None),
+            # Rounds of the bracket engine resolve many matches in one call, count those that were played
+            (Tournament, "simulate_round", "match_round", None, lambda args, result: int((result[1] >= 0).sum())),
+            (WinMatrix, "fill", "win_matrix_pair", None, lambda args, result: len(args[1])),
+            (Tournament, "generate_draw", "draw", tournamentTier, None),
+            (Tournament, "simulate_tournament", "tournament", tournamentTier, None),
+            # Entry decisions are made for a tournament, so they are attributed to its tier
+            (Season, "get_entry_mask", "entry_decision", lambda args: args[2].type, lambda args, result: len(args[1])),
+            # Pooled seasons read the order off the ranking index instead of sorting
+            (Season, "sort_rankings", "ranking_sort", None, None),
+            (Season, "read_rankings", "ranking_read", None, None),
+        ]
+
+        # Every strategy that decides in batches, counting the players decided for
+        strategies = [TournamentStrategy]
+        while strategies:
+            strategy = strategies.pop()
+            strategies += strategy.__subclasses__()
+            if "should_play_batch" in strategy.__dict__:
+                targets.append((strategy, "should_play_batch", "strategy_call", None, lambda args, result: len(args[1])))
+
+        return targets
+
+    def install(self):
+        """
+        Method:
+            Wraps every instrumented method so that calls are recorded
+        """
+        if Instrumentation.active is not None:
+            raise RuntimeError("Another instrumentation is already installed")
+        Instrumentation.active = self
+
+        for owner, attribute, event, getTier, getItems in self.get_targets():
+            original = owner.__dict__[attribute]
+            isStatic = isinstance(original, staticmethod)
+            function = original.__func__ if isStatic else original
+            wrapper = self.wrap(function, event, getTier, getItems)
+
+            self.originals.append((owner, attribute, original))
+            setattr(owner, attribute, staticmethod(wrapper) if isStatic else wrapper)
+
+    def uninstall(self):
+        """
+        Method:
+            Restores the original methods and closes the timing of the current week
+        """
+        for owner, attribute, original in reversed(self.originals):
+            setattr(owner, attribute, original)
+        self.originals = []
+
+        self.end_week()
+        if Instrumentation.active is self:
+            Instrumentation.active = None
+
+    def wrap(self, function, event, getTier=None, getItems=None):
+        """
+        Method:
+            Builds a wrapper that times one method and records it under the current
+            week and tier, switching the tier for the length of the call if asked to
+
+        Params:
+            function (function): The method to wrap
+            event (str): The name the calls are recorded under
+            getTier (function): Finds the tier of the call from its arguments, the current tier is kept if None
+            getItems (function): Counts the items handled by the call from its arguments and result, 1 if None
+
+        Return:
+            wrapper (function)
+        """
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            previousTier = self.tier
+            if getTier is not None:
+                self.tier = getTier(args)
+
+            start = time.perf_counter()
+            try:
+                result = function(*args, **kwargs)
+                seconds = time.perf_counter() - start
+                self.record(event, seconds, getItems(args, result) if getItems is not None else 1)
+            finally:
+                self.tier = previousTier
+            return result
+
+        return wrapper
+
+    def record(self, event, seconds, items=1):
+        """
+        Method:
+            Adds one call of an event to the current week and tier
+
+        Params:
+            event (str)
+            seconds (float): Time spent in the call
+            items (int): Items handled by the call, such as players decided for
+        """
+        key = (self.week, self.tier or self.NO_TIER, event)
+        record = self.records.get(key)
+        if record is None:
+            record = self.records[key] = [0, 0, 0.0]
+        record[0] += 1
+        record[1] += items
+        record[2] += seconds
+
+    def start_week(self, week):
+        """
+        Method:
+            Attributes the following calls to a new week and starts timing it
+
+        Params:
+            week (int): Index of the week in the schedule
+        """
+        self.end_week()
+        self.week = week
+        self.weekStart = time.perf_counter()
+
+    def end_week(self):
+        if self.weekStart is not None:
+            self.weekSeconds[self.week] = self.weekSeconds.get(self.week, 0.0) + time.perf_counter() - self.weekStart
+            self.weekStart = None
+
+    def summary(self):
+        """
+        Method:
+            Summarises every recorded event in total, per tier and per week. Each
+            event has the number of calls, the items handled and the seconds spent.
+
+        Return:
+            report (dict)
+        """
+        def add(events, event, record):
+            totals = events.setdefault(event, {"count": 0, "items": 0, "seconds": 0.0})
+            totals["count"] += record[0]
+            totals["items"] += record[1]
+            totals["seconds"] += record[2]
+
+        events = {}
+        byTier = {}
+        byWeek = {}
+        for (week, tier, event), record in self.records.items():
+            add(events, event, record)
+            add(byTier.setdefault(tier, {}), event, record)
+            if week is not None:
+                add(byWeek.setdefault(week, {}), event, record)
+
+        return {
+            "events": events,
+            "byTier": byTier,
+            "byWeek": [
+                {"week": week, "seconds": self.weekSeconds.get(week, 0.0), "events": byWeek.get(week, {})}
+                for week in sorted(set(byWeek) | set(self.weekSeconds))
+            ],
+        }
@@ -1,656 +1,317 @@
-from season import Season
-from player import Player
-import random
-import matplotlib.pyplot as plt
-import numpy as np
-import seaborn as sns
-import pandas as pd
-from strategies.big_event_focus import BigEventFocus
-from strategies.injury_avoider import InjuryAvoider
-from strategies.original import Original
-from strategies.play_everything import PlayEverything
-from strategies.ranking_based import RankingBased
-
+"""
 
+Command line entry point for the season simulations
 
-"""
+    python main.py simulate --replicates 50 --players 200 --strategies original --output results/original
+    python main.py analyze --input results/original
+    python main.py plot --input results/original --save-dir figures
+    python main.py simulate --target mean_rank=2 top50=3 --time-budget 600 --replicates 1000
+    python main.py compare --replicates 20 --reference Original --antithetic
+    python main.py sweep --cache sweeps/injury --design lhs --configs 20 --replicates 5 --param InjuryAvoider.injury_threshold=0.1:0.5 InjuryAvoider.fitness_threshold=0.3:0.8
 
-The following functions are general functions that help set up the simulation environment
+Plotting libraries are only imported by the plot command, so headless runs start quickly.
 
 """
 
+import argparse
+import sys
 
 
-def init_players(numPlayers):
-    # Create lists of first names and last names
-    first_names = [
-    "Liam", "Noah", "Oliver", "Elijah", "James", "William", "Benjamin", "Lucas",
-    "Henry", "Alexander", "Daniel", "Matthew", "Jack", "Sebastian", "Logan",
-    "Michael", "Ethan", "Jacob", "Mason", "David", "Samuel", "Joseph", "John",
-    "Owen", "Luke", "Gabriel", "Anthony", "Isaac", "Dylan", "Andrew" ]
-
-    last_names = [
-    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller",
-    "Davis", "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez",
-    "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
-    "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark",
-    "Ramirez", "Lewis", "Robinson" ]
-    
-    # Initiating empty list to store player objects
-    players = []
-    nameDict = {}
-    
-    # Creating players with different random stats
-    for _ in range(numPlayers):
-        
-        # Make sure that player name is unique
-        while True:
-            playerName = f'{random.choice(first_names)} {random.choice(last_names)}'
-            
-            if playerName not in nameDict:
-                players.append(Player(playerName))
-                nameDict[playerName] = 0
-                break
-
-    return players
-
-
-def assign_strategies(players, original=False):
-    if original == True:
-        for player in players:
-            player.set_strategy(Original())
-    else:
-        # Strategies
-        strategies = [BigEventFocus(), InjuryAvoider(), Original(), PlayEverything(), RankingBased()]
-
-        i = 0 
-        for player in players:
-            player.set_strategy(strategies[i])
-            
-            if i == 4:
-                i = 0
-            else:
-                i += 1
-        
+def collect_replicates(simSteps, numPlayers, original=False, storePath=None, workers=None, seed=None, keepArray=False, targets=None, timeBudget=None, confidence=0.95):
+    """
+    Simulate independent seasons in parallel and fold each into the aggregates. With
+    targets or a time budget seasons are run in batches until the confidence intervals
+    are narrow enough or the time is spent, with simSteps as the most to run
 
+    Args:
+        simSteps: Number of seasons to simulate
+        numPlayers: Number of players in each season
+        original: Whether every player uses the original strategy
+        storePath: Optional results store directory to also append every season to
+        workers: Number of worker processes, None uses every core
+        seed: Root seed for the run, None draws fresh entropy
+        keepArray: Whether to keep every season in dense arrays for exact quantiles
+        targets: Maps metrics to the confidence interval half width to stop at
+        timeBudget: Seconds to stop after
+        confidence: Confidence level of the intervals
 
+    Returns:
+        ReplicateAggregator holding every season
+    """
+    from replicates import iter_replicates
+    from aggregators import ReplicateAggregator
+    from results_store import ResultsStore
 
+    aggregator = ReplicateAggregator(numPlayers, keepArray=keepArray)
+    writer = ResultsStore(storePath).writer() if storePath is not None else None
 
-"""
+    monitor = None
+    if targets or timeBudget is not None:
+        from convergence import ConvergenceMonitor, iter_until_converged
 
-The following functions are all used to plot for simulation 1
+        # Without targets every metric is tracked but only the time budget stops the run
+        monitor = ConvergenceMonitor(targets or {"mean_rank": 0.0, "top50": 0.0}, confidence)
+        results = iter_until_converged(monitor, numPlayers, original, maxReplicates=simSteps, timeBudget=timeBudget, workers=workers, seed=seed)
+    else:
+        results = iter_replicates(simSteps, numPlayers, original=original, workers=workers, seed=seed)
 
-"""
+    for result in results:
+        aggregator.update(result)
+        if writer is not None:
+            writer.append(result)
 
+    if writer is not None:
+        writer.close()
 
+    if monitor is not None:
+        print_precision(monitor)
 
+    return aggregator
 
-class AggregatedPlayerStats:
-    """Class to hold aggregated statistics across multiple simulations"""
-    def __init__(self, name, ranking_position):
-        self.name = name
-        self.ranking_position = ranking_position
-        self.serveStrength = 0
-        self.returnStrength = 0
-        self.form = 0
-        self.injuryThreshold = 0
-        self.injuryProbability = 0
 
-def create_aggregated_rankings(all_rankings, method='average'):
+def print_precision(monitor):
     """
-    Create aggregated rankings using either average or median statistics
-    
-    Args:
-        all_rankings: List of lists, each containing Player objects from one simulation
-        method: 'average' or 'median'
-    
-    Returns:
-        List of AggregatedPlayerStats objects sorted by ranking position
+    Print why an adaptive run stopped and the precision every metric reached
     """
-    num_players = len(all_rankings[0])
-    num_simulations = len(all_rankings)
-    
-    # Collect all stats for each ranking position across simulations
-    position_stats = {i: {
-        'serve_strength': [],
-        'return_strength': [],
-        'form': [],
-        'injury_threshold': [],
-        'injury_probability': [],
-        'names': []
-    } for i in range(num_players)}
-    
-    # Gather stats for each position across all simulations
-    for sim_rankings in all_rankings:
-        for pos, player in enumerate(sim_rankings):
-            position_stats[pos]['serve_strength'].append(player.serveStrength)
-            position_stats[pos]['return_strength'].append(player.returnStrength)
-            position_stats[pos]['form'].append(player.form)
-            position_stats[pos]['injury_threshold'].append(player.injuryThreshold)
-            position_stats[pos]['injury_probability'].append(player.injuryProbability)
-            position_stats[pos]['names'].append(player.name)
-    
-    # Create aggregated player objects
-    aggregated_rankings = []
-    
-    for pos in range(num_players):
-        # Get most common name for this position (or use a generic name)
-        most_common_name = max(set(position_stats[pos]['names']), 
-                             key=position_stats[pos]['names'].count)
-        
-        agg_player = AggregatedPlayerStats(f"Pos_{pos+1}_{most_common_name}", pos)
-        
-        if method == 'average':
-            agg_player.serveStrength = np.mean(position_stats[pos]['serve_strength'])
-            agg_player.returnStrength = np.mean(position_stats[pos]['return_strength'])
-            agg_player.form = np.mean(position_stats[pos]['form'])
-            agg_player.injuryThreshold = np.mean(position_stats[pos]['injury_threshold'])
-            agg_player.injuryProbability = np.mean(position_stats[pos]['injury_probability'])
-        elif method == 'median':
-            agg_player.serveStrength = np.median(position_stats[pos]['serve_strength'])
-            agg_player.returnStrength = np.median(position_stats[pos]['return_strength'])
-            agg_player.form = np.median(position_stats[pos]['form'])
-            agg_player.injuryThreshold = np.median(position_stats[pos]['injury_threshold'])
-            agg_player.injuryProbability = np.median(position_stats[pos]['injury_probability'])
-        
-        aggregated_rankings.append(agg_player)
-    
-    return aggregated_rankings
-
-def visualize_individual_stats_by_ranking(actualRankings, title_suffix=""):
-    """Break down individual statistics by ranking position"""
-    
-    # Extract individual stats for each ranking position
-    serve_strength = [player.serveStrength for player in actualRankings]
-    return_strength = [player.returnStrength for player in actualRankings]
-    form = [player.form for player in actualRankings]
-    injury_threshold = [player.injuryThreshold for player in actualRankings]
-    injury_probability = [player.injuryProbability for player in actualRankings]
-    
-    # Create subplots for each stat - REDUCED SIZE
-    fig, axes = plt.subplots(2, 3, figsize=(12, 8))  # Reduced from (18, 12)
-    fig.suptitle(f'Individual Statistics by Ranking Position {title_suffix}', fontsize=12)
-    
-    # Serve Strength
-    axes[0, 0].plot(range(len(actualRankings)), serve_strength, color='blue', alpha=0.7)
-    axes[0, 0].set_title('Serve Strength', fontsize=10)
-    axes[0, 0].set_xlabel('Ranking Position', fontsize=9)
-    axes[0, 0].set_ylabel('Serve Strength', fontsize=9)
-    axes[0, 0].grid(True, alpha=0.3)
-    axes[0, 0].tick_params(labelsize=8)
-    
-    # Return Strength
-    axes[0, 1].plot(range(len(actualRankings)), return_strength, color='green', alpha=0.7)
-    axes[0, 1].set_title('Return Strength', fontsize=10)
-    axes[0, 1].set_xlabel('Ranking Position', fontsize=9)
-    axes[0, 1].set_ylabel('Return Strength', fontsize=9)
-    axes[0, 1].grid(True, alpha=0.3)
-    axes[0, 1].tick_params(labelsize=8)
-    
-    # Form
-    axes[0, 2].plot(range(len(actualRankings)), form, color='orange', alpha=0.7)
-    axes[0, 2].set_title('Form', fontsize=10)
-    axes[0, 2].set_xlabel('Ranking Position', fontsize=9)
-    axes[0, 2].set_ylabel('Form', fontsize=9)
-    axes[0, 2].grid(True, alpha=0.3)
-    axes[0, 2].tick_params(labelsize=8)
-    
-    # Injury Threshold
-    axes[1, 0].plot(range(len(actualRankings)), injury_threshold, color='red', alpha=0.7)
-    axes[1, 0].set_title('Injury Threshold', fontsize=10)
-    axes[1, 0].set_xlabel('Ranking Position', fontsize=9)
-    axes[1, 0].set_ylabel('Injury Threshold', fontsize=9)
-    axes[1, 0].grid(True, alpha=0.3)
-    axes[1, 0].tick_params(labelsize=8)
-    
-    # Injury Probability
-    axes[1, 1].plot(range(len(actualRankings)), injury_probability, color='purple', alpha=0.7)
-    axes[1, 1].set_title('Injury Probability', fontsize=10)
-    axes[1, 1].set_xlabel('Ranking Position', fontsize=9)
-    axes[1, 1].set_ylabel('Injury Probability', fontsize=9)
-    axes[1, 1].grid(True, alpha=0.3)
-    axes[1, 1].tick_params(labelsize=8)
-    
-    # Combined Score
-    combined_score = [(player.serveStrength + player.returnStrength) * player.form * 
-                     player.injuryThreshold * (1 - player.injuryProbability) 
-                     for player in actualRankings]
-    axes[1, 2].plot(range(len(actualRankings)), combined_score, color='black', alpha=0.7)
-    axes[1, 2].set_title('Combined Score', fontsize=10)
-    axes[1, 2].set_xlabel('Ranking Position', fontsize=9)
-    axes[1, 2].set_ylabel('Combined Score', fontsize=9)
-    axes[1, 2].grid(True, alpha=0.3)
-    axes[1, 2].tick_params(labelsize=8)
-    
-    plt.tight_layout()
-    plt.show()
-
-def create_ranking_tier_analysis(actualRankings, tier_size=50):
-    """Analyze statistics by ranking tiers"""
-    
-    # Create tiers
-    tiers = []
-    tier_labels = []
-    
-    for i in range(0, len(actualRankings), tier_size):
-        tier_players = actualRankings[i:i+tier_size]
-        tiers.append(tier_players)
-        tier_labels.append(f'Rank {i+1}-{min(i+tier_size, len(actualRankings))}')
-    
-    # Calculate statistics for each tier
-    stats_by_tier = {
-        'serve_strength': [],
-        'return_strength': [],
-        'form': [],
-        'injury_threshold': [],
-        'injury_probability': [],
-        'combined_score': []
-    }
-    
-    for tier in tiers:
-        stats_by_tier['serve_strength'].append(np.mean([p.serveStrength for p in tier]))
-        stats_by_tier['return_strength'].append(np.mean([p.returnStrength for p in tier]))
-        stats_by_tier['form'].append(np.mean([p.form for p in tier])*20)
-        stats_by_tier['injury_threshold'].append(np.mean([p.injuryThreshold for p in tier])*100)
-        stats_by_tier['injury_probability'].append(np.mean([p.injuryProbability for p in tier])*100)
-        stats_by_tier['combined_score'].append(np.mean([
-            (p.serveStrength + p.returnStrength) * p.form * p.injuryThreshold * (1 - p.injuryProbability) 
-            for p in tier
-        ]))
-    
-    # Create bar chart - REDUCED SIZE
-    fig, ax = plt.subplots(figsize=(10, 6))  # Reduced from (15, 8)
-    x = np.arange(len(tier_labels))
-    width = 0.12
-    
-    bars1 = ax.bar(x - 2.5*width, stats_by_tier['serve_strength'], width, label='Serve Strength', alpha=0.8)
-    bars2 = ax.bar(x - 1.5*width, stats_by_tier['return_strength'], width, label='Return Strength', alpha=0.8)
-    bars3 = ax.bar(x - 0.5*width, stats_by_tier['form'], width, label='Form', alpha=0.8)
-    bars4 = ax.bar(x + 0.5*width, stats_by_tier['injury_threshold'], width, label='Injury Threshold', alpha=0.8)
-    bars5 = ax.bar(x + 1.5*width, stats_by_tier['injury_probability'], width, label='Injury Probability', alpha=0.8)
-    
-    ax.set_xlabel('Ranking Tiers', fontsize=10)
-    ax.set_ylabel('Average Statistic Value', fontsize=10)
-    ax.set_title('Average Statistics by Ranking Tier', fontsize=12)
-    ax.set_xticks(x)
-    ax.set_xticklabels(tier_labels, rotation=45, fontsize=9)
-    ax.legend(fontsize=8)
-    ax.grid(True, alpha=0.3)
-    ax.tick_params(labelsize=8)
-    
-    plt.tight_layout()
-    plt.show()
-
-def create_distribution_plots(actualRankings, top_n=50):
-    """Compare distributions of top N vs bottom N players"""
-    
-    top_players = actualRankings[:top_n]
-    bottom_players = actualRankings[-top_n:]
-    
-    # REDUCED SIZE
-    fig, axes = plt.subplots(2, 3, figsize=(12, 8))  # Reduced from (18, 12)
-    fig.suptitle(f'Distribution Comparison: Top {top_n} vs Bottom {top_n} Players', fontsize=12)
-    
-    stats = [
-        ('serveStrength', 'Serve Strength'),
-        ('returnStrength', 'Return Strength'),
-        ('form', 'Form'),
-        ('injuryThreshold', 'Injury Threshold'),
-        ('injuryProbability', 'Injury Probability')
-    ]
-    
-    for i, (stat_attr, stat_name) in enumerate(stats):
-        row, col = i // 3, i % 3
-        
-        top_values = [getattr(p, stat_attr) for p in top_players]
-        bottom_values = [getattr(p, stat_attr) for p in bottom_players]
-        
-        axes[row, col].hist(top_values, alpha=0.7, label=f'Top {top_n}', bins=15, color='blue')
-        axes[row, col].hist(bottom_values, alpha=0.7, label=f'Bottom {top_n}', bins=15, color='red')
-        axes[row, col].set_title(stat_name, fontsize=10)
-        axes[row, col].set_xlabel(stat_name, fontsize=9)
-        axes[row, col].set_ylabel('Frequency', fontsize=9)
-        axes[row, col].legend(fontsize=8)
-        axes[row, col].grid(True, alpha=0.3)
-        axes[row, col].tick_params(labelsize=8)
-    
-    # Combined score distribution
-    top_combined = [(p.serveStrength + p.returnStrength) * p.form * 
-                   p.injuryThreshold * (1 - p.injuryProbability) for p in top_players]
-    bottom_combined = [(p.serveStrength + p.returnStrength) * p.form * 
-                      p.injuryThreshold * (1 - p.injuryProbability) for p in bottom_players]
-    
-    axes[1, 2].hist(top_combined, alpha=0.7, label=f'Top {top_n}', bins=15, color='blue')
-    axes[1, 2].hist(bottom_combined, alpha=0.7, label=f'Bottom {top_n}', bins=15, color='red')
-    axes[1, 2].set_title('Combined Score', fontsize=10)
-    axes[1, 2].set_xlabel('Combined Score', fontsize=9)
-    axes[1, 2].set_ylabel('Frequency', fontsize=9)
-    axes[1, 2].legend(fontsize=8)
-    axes[1, 2].grid(True, alpha=0.3)
-    axes[1, 2].tick_params(labelsize=8)
-    
-    plt.tight_layout()
-    plt.show()
-
-def create_serve_vs_return_scatter(actualRankings):
-    """Scatter plot of serve vs return strength colored by ranking"""
-    
-    serve_strength = [p.serveStrength for p in actualRankings]
-    return_strength = [p.returnStrength for p in actualRankings]
-    rankings = list(range(len(actualRankings)))
-    
-    # REDUCED SIZE
-    plt.figure(figsize=(8, 6))  # Reduced from (12, 8)
-    scatter = plt.scatter(serve_strength, return_strength, c=rankings, 
-                         cmap='viridis', alpha=0.7, s=50)
-    plt.colorbar(scatter, label='Ranking Position')
-    plt.xlabel('Serve Strength', fontsize=10)
-    plt.ylabel('Return Strength', fontsize=10)
-    plt.title('Serve Strength vs Return Strength (Colored by Ranking)', fontsize=12)
-    
-    # Add diagonal line to show balanced players
-    min_val = min(min(serve_strength), min(return_strength))
-    max_val = max(max(serve_strength), max(return_strength))
-    plt.plot([min_val, max_val], [min_val, max_val], 'r--', alpha=0.5, label='Balanced Line')
-    plt.legend(fontsize=9)
-    plt.grid(True, alpha=0.3)
-    plt.tick_params(labelsize=9)
-    plt.tight_layout()
-    plt.show()
-
-def create_rolling_average_plot(actualRankings, window_size=20):
-    """Create rolling average plots for smoother trend visualization"""
-    
-    def rolling_average(data, window):
-        return [np.mean(data[max(0, i-window//2):i+window//2+1]) for i in range(len(data))]
-    
-    serve_strength = [p.serveStrength for p in actualRankings]
-    return_strength = [p.returnStrength for p in actualRankings]
-    form = [p.form for p in actualRankings]
-    
-    serve_rolling = rolling_average(serve_strength, window_size)
-    return_rolling = rolling_average(return_strength, window_size)
-    form_rolling = rolling_average(form, window_size)
-    
-    # REDUCED SIZE
-    plt.figure(figsize=(12, 8))  # Reduced from (15, 10)
-    
-    plt.subplot(2, 2, 1)
-    plt.plot(serve_strength, alpha=0.3, color='blue', label='Raw Data')
-    plt.plot(serve_rolling, color='blue', linewidth=2, label=f'Rolling Average (window={window_size})')
-    plt.title('Serve Strength by Ranking', fontsize=10)
-    plt.xlabel('Ranking Position', fontsize=9)
-    plt.ylabel('Serve Strength', fontsize=9)
-    plt.legend(fontsize=8)
-    plt.grid(True, alpha=0.3)
-    plt.tick_params(labelsize=8)
-    
-    plt.subplot(2, 2, 2)
-    plt.plot(return_strength, alpha=0.3, color='green', label='Raw Data')
-    plt.plot(return_rolling, color='green', linewidth=2, label=f'Rolling Average (window={window_size})')
-    plt.title('Return Strength by Ranking', fontsize=10)
-    plt.xlabel('Ranking Position', fontsize=9)
-    plt.ylabel('Return Strength', fontsize=9)
-    plt.legend(fontsize=8)
-    plt.grid(True, alpha=0.3)
-    plt.tick_params(labelsize=8)
-    
-    plt.subplot(2, 2, 3)
-    plt.plot(form, alpha=0.3, color='orange', label='Raw Data')
-    plt.plot(form_rolling, color='orange', linewidth=2, label=f'Rolling Average (window={window_size})')
-    plt.title('Form by Ranking', fontsize=10)
-    plt.xlabel('Ranking Position', fontsize=9)
-    plt.ylabel('Form', fontsize=9)
-    plt.legend(fontsize=8)
-    plt.grid(True, alpha=0.3)
-    plt.tick_params(labelsize=8)
-    
-    plt.subplot(2, 2, 4)
-    plt.plot(serve_rolling, label='Serve Strength', linewidth=2)
-    plt.plot(return_rolling, label='Return Strength', linewidth=2)
-    plt.plot(form_rolling, label='Form', linewidth=2)
-    plt.title('All Stats Comparison (Rolling Averages)', fontsize=10)
-    plt.xlabel('Ranking Position', fontsize=9)
-    plt.ylabel('Stat Value', fontsize=9)
-    plt.legend(fontsize=8)
-    plt.grid(True, alpha=0.3)
-    plt.tick_params(labelsize=8)
-    
-    plt.tight_layout()
-    plt.show()
-
-def create_comprehensive_analysis(all_predicted_rankings, all_actual_rankings, method='average'):
+    print(f"Stopped on {monitor.stopReason} after {monitor.count} seasons in {monitor.elapsed:.1f}s")
+    print(f"\n{'Metric':<32}{'Mean':>10}{'Half width':>12}{'Target':>10}")
+    for name, values in monitor.summary().items():
+        print(f"{name:<32}{values['mean']:>10.2f}{values['halfWidth']:>12.2f}{values['target']:>10.2f}{'' if values['converged'] else '  *'}")
+    print(f"(half widths of {monitor.confidence:.0%} confidence intervals, * not yet at target)\n")
+
+
+def parse_targets(values):
     """
-    Create comprehensive analysis using aggregated data from all simulations
-    
-    Args:
-        all_predicted_rankings: List of lists containing predicted rankings from all simulations
-        all_actual_rankings: List of lists containing actual rankings from all simulations
-        method: 'average' or 'median' for aggregation
+    Parse METRIC=HALFWIDTH pairs into a dict
     """
-    print(f"\nCreating comprehensive analysis using {method} across all simulations...")
-    
-    # Create aggregated rankings
-    agg_predicted = create_aggregated_rankings(all_predicted_rankings, method)
-    agg_actual = create_aggregated_rankings(all_actual_rankings, method)
-    
-    # Run all visualization functions with aggregated data
-    print("1. Individual stats by ranking...")
-    visualize_individual_stats_by_ranking(agg_actual, f"({method.title()} across all simulations)")
-    
-    print("2. Ranking tier analysis...")
-    create_ranking_tier_analysis(agg_actual)
-    
-    print("5. Serve vs return scatter...")
-    create_serve_vs_return_scatter(agg_actual)
-    
-    print("6. Rolling average plot...")
-    create_rolling_average_plot(agg_actual)
+    targets = {}
+    for value in values or ():
+        metric, _, halfWidth = value.partition("=")
+        try:
+            targets[metric] = float(halfWidth)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Expected METRIC=HALFWIDTH, got {value!r}")
+    return targets
 
 
-"""
-Simulation 2 plotting functions
-"""
+def load_aggregator(args, keepArray=False):
+    """
+    Aggregate a stored run when --input is given, otherwise simulate one in memory
+    """
+    if args.input is not None:
+        from results_store import ResultsStore
 
+        aggregator = ResultsStore(args.input).aggregate(keepArray=keepArray)
+        if aggregator is None:
+            sys.exit(f"No replicates stored in {args.input}")
+        return aggregator
 
+    return collect_replicates(args.replicates, args.players, args.strategies == "original", workers=args.workers, seed=args.seed, keepArray=keepArray, **get_adaptive_options(args))
 
-f"""
-Simulation 2 plotting functions
-"""
 
+def get_adaptive_options(args):
+    """
+    Keyword arguments of collect_replicates for the adaptive stopping options
+    """
+    try:
+        targets = parse_targets(args.target)
+    except argparse.ArgumentTypeError as error:
+        sys.exit(str(error))
+
+    if targets:
+        from convergence import ConvergenceMonitor
 
+        unknown = set(targets) - set(ConvergenceMonitor.METRICS)
+        if unknown:
+            sys.exit(f"Unknown metrics {sorted(unknown)}, choose from {sorted(ConvergenceMonitor.METRICS)}")
+    return {"targets": targets, "timeBudget": args.time_budget, "confidence": args.confidence}
 
-from collections import defaultdict
 
-def analyze_strategy_performance(all_actual_rankings, title_suffix=""):
+def print_summary(aggregator, tier_size=50):
     """
-    Analyze how different strategies perform in terms of rankings
-    
-    Args:
-        all_actual_rankings: List of lists containing actual rankings from all simulations
-        title_suffix: Additional text for plot titles
+    Print per strategy ranking statistics and per ranking tier averages
     """
-    
-    # Dictionary to store results for each strategy
-    strategy_results = defaultdict(list)
-    strategy_rankings = defaultdict(list)
-    
-    # Collect data from all simulations
-    for sim_rankings in all_actual_rankings:
-        for rank, player in enumerate(sim_rankings):
-            strategy_name = type(player.strategy).__name__
-            strategy_results[strategy_name].append(rank + 1)  # Rankings start from 1
-            strategy_rankings[strategy_name].append(player)
-    
-    return strategy_results, strategy_rankings
-
-def plot_strategy_ranking_distributions(strategy_results, title_suffix=""):
-    """Create box plots showing ranking distributions for each strategy"""
-    
-    # REDUCED SIZE
-    plt.figure(figsize=(8, 6))  # Reduced from (12, 8)
-    
-    strategies = list(strategy_results.keys())
-    ranking_data = [strategy_results[strategy] for strategy in strategies]
-    
-    box_plot = plt.boxplot(ranking_data, labels=strategies, patch_artist=True)
-    
-    # Color the boxes differently
-    colors = ['lightblue', 'lightgreen', 'lightcoral', 'lightyellow', 'lightpink']
-    for patch, color in zip(box_plot['boxes'], colors[:len(strategies)]):
-        patch.set_facecolor(color)
-    
-    plt.title(f'Ranking Distribution by Strategy {title_suffix}', fontsize=12)
-    plt.xlabel('Strategy', fontsize=10)
-    plt.ylabel('Final Ranking Position', fontsize=10)
-    plt.xticks(rotation=45, fontsize=9)
-    plt.yticks(fontsize=9)
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.show()
-
-def plot_strategy_performance_metrics(strategy_results, title_suffix=""):
-    """Create bar charts showing average ranking and other metrics for each strategy"""
-    
-    strategies = list(strategy_results.keys())
-    avg_rankings = [np.mean(strategy_results[strategy]) for strategy in strategies]
-    median_rankings = [np.median(strategy_results[strategy]) for strategy in strategies]
-    std_rankings = [np.std(strategy_results[strategy]) for strategy in strategies]
-    
-    # REDUCED SIZE
-    fig, axes = plt.subplots(2, 2, figsize=(10, 8))  # Reduced from (15, 12)
-    fig.suptitle(f'Strategy Performance Metrics {title_suffix}', fontsize=12)
-    
-    # Average ranking (lower is better)
-    axes[0, 0].bar(strategies, avg_rankings, color='skyblue', alpha=0.7)
-    axes[0, 0].set_title('Average Ranking by Strategy', fontsize=10)
-    axes[0, 0].set_ylabel('Average Ranking', fontsize=9)
-    axes[0, 0].tick_params(axis='x', rotation=45, labelsize=8)
-    axes[0, 0].tick_params(axis='y', labelsize=8)
-    axes[0, 0].grid(True, alpha=0.3)
-    
-    # Median ranking (lower is better)
-    axes[0, 1].bar(strategies, median_rankings, color='lightgreen', alpha=0.7)
-    axes[0, 1].set_title('Median Ranking by Strategy', fontsize=10)
-    axes[0, 1].set_ylabel('Median Ranking', fontsize=9)
-    axes[0, 1].tick_params(axis='x', rotation=45, labelsize=8)
-    axes[0, 1].tick_params(axis='y', labelsize=8)
-    axes[0, 1].grid(True, alpha=0.3)
-    
-    # Standard deviation of rankings (consistency)
-    axes[1, 0].bar(strategies, std_rankings, color='lightcoral', alpha=0.7)
-    axes[1, 0].set_title('Ranking Consistency by Strategy\n(Lower = More Consistent)', fontsize=9)
-    axes[1, 0].set_ylabel('Standard Deviation of Rankings', fontsize=8)
-    axes[1, 0].tick_params(axis='x', rotation=45, labelsize=8)
-    axes[1, 0].tick_params(axis='y', labelsize=8)
-    axes[1, 0].grid(True, alpha=0.3)
-    
-    # Top 50 percentage
-    top_50_percentages = []
-    for strategy in strategies:
-        rankings = strategy_results[strategy]
-        top_50_count = sum(1 for rank in rankings if rank <= 50)
-        percentage = (top_50_count / len(rankings)) * 100
-        top_50_percentages.append(percentage)
-    
-    axes[1, 1].bar(strategies, top_50_percentages, color='gold', alpha=0.7)
-    axes[1, 1].set_title('Percentage of Players in Top 50', fontsize=10)
-    axes[1, 1].set_ylabel('Percentage (%)', fontsize=9)
-    axes[1, 1].tick_params(axis='x', rotation=45, labelsize=8)
-    axes[1, 1].tick_params(axis='y', labelsize=8)
-    axes[1, 1].grid(True, alpha=0.3)
-    
-    plt.tight_layout()
-    plt.show()
-
-def comprehensive_strategy_analysis(all_actual_rankings, title_suffix=""):
+    print(f"{aggregator.count} seasons of {aggregator.numPlayers} players")
+
+    ranks = aggregator.strategyRanks
+    print(f"\n{'Strategy':<16}{'Mean':>8}{'Median':>8}{'Std':>8}{'Top 50':>8}")
+    for strategy in ranks.strategies():
+        print(f"{strategy:<16}{ranks.mean(strategy):>8.1f}{ranks.quantile(strategy, 0.5):>8.1f}{ranks.std(strategy):>8.1f}{ranks.fraction_within(strategy, 50) * 100:>7.1f}%")
+
+    actual = aggregator.actual
+    columns = ["serveStrength", "returnStrength", "form", "rankingPoints", "entriesGrandSlam", "entriesMaster1000", "entriesATP500", "entriesATP250"]
+    print(f"\n{'Ranks':<12}" + "".join(f"{column[:12]:>14}" for column in columns))
+    for start in range(0, aggregator.numPlayers, tier_size):
+        end = min(start + tier_size, aggregator.numPlayers)
+        print(f"{f'{start + 1}-{end}':<12}" + "".join(f"{actual.mean(column)[start:end].mean():>14.2f}" for column in columns))
+
+
+def simulate_command(args):
+    aggregator = collect_replicates(args.replicates, args.players, args.strategies == "original", args.output, args.workers, args.seed, **get_adaptive_options(args))
+    print_summary(aggregator)
+
+
+def analyze_command(args):
+    print_summary(load_aggregator(args))
+
+
+def plot_command(args):
+    # Use a non interactive backend when the figures are only being saved
+    if args.save_dir is not None:
+        import matplotlib
+        matplotlib.use("Agg")
+
+    import plots
+
+    plots.set_output_directory(args.save_dir)
+    aggregator = load_aggregator(args, keepArray=args.exact)
+
+    kind = args.kind
+    if kind is None:
+        kind = "strategy" if len(aggregator.strategyRanks.strategies()) > 1 else "comprehensive"
+
+    if kind in ("comprehensive", "all"):
+        plots.create_comprehensive_analysis(aggregator, args.method, args.quantile)
+    if kind in ("strategy", "all"):
+        plots.comprehensive_strategy_analysis(aggregator, "(Multi-Strategy Simulation)" if args.strategies == "mixed" else "")
+
+
+def compare_command(args):
+    from paired import iter_paired_replicates, PairedComparison
+
+    comparison = PairedComparison(args.reference, args.metric, args.confidence)
+    for result in iter_paired_replicates(args.replicates, args.players, antithetic=args.antithetic, workers=args.workers, seed=args.seed):
+        comparison.update(result)
+
+    print(f"{comparison.count} populations of {args.players} players, {comparison.seasonsPerReplicate} seasons each, paired differences in {args.metric}")
+    print(f"\n{'Strategy':<16}{'Versus':<16}{'Paired':>10}{'+/-':>8}{'Single':>10}{'+/-':>8}{'Efficiency':>12}")
+    for row in comparison.summary():
+        print(f"{row['strategy']:<16}{row['versus']:<16}{row['difference']:>10.2f}{row['halfWidth']:>8.2f}{row['unpairedDifference']:>10.2f}{row['unpairedHalfWidth']:>8.2f}{row['efficiency']:>12.2f}")
+    print(f"(+/- are half widths of {args.confidence:.0%} confidence intervals, single is what one mixed season per population gives,")
+    print(" efficiency above 1 means the paired runs reach the same precision in fewer seasons)")
+
+
+def parse_space(values, design):
     """
-    Run all strategy analysis functions
-    
-    Args:
-        all_actual_rankings: List of lists containing actual rankings from all simulations with different strategies
-        title_suffix: Additional text for plot titles
+    Parse NAME=SPEC parameters, where SPEC lists values (a,b,c) for a grid or gives a range (low:high) otherwise
     """
-    
-    print("Analyzing strategy performance...")
-    strategy_results, strategy_rankings = analyze_strategy_performance(all_actual_rankings, title_suffix)
-    
-    print("1. Creating ranking distribution plots...")
-    plot_strategy_ranking_distributions(strategy_results, title_suffix)
-    
-    print("2. Creating performance metrics...")
-    plot_strategy_performance_metrics(strategy_results, title_suffix)
-    
-    return strategy_results, strategy_rankings
-
-
-""" 
-Simulation 1:
-This simulation is set to all players having the original strategy for tournament selection.
-This will help me get plots and answer the question how does skill effect rankings at the
-end of the season?
-"""
+    space = {}
+    for value in values:
+        name, _, spec = value.partition("=")
+        try:
+            if design == "grid":
+                space[name] = [float(item) for item in spec.split(",")]
+            else:
+                low, high = spec.split(":")
+                space[name] = (float(low), float(high))
+        except ValueError:
+            sys.exit(f"Expected {name}=a,b,c for a grid or {name}=low:high otherwise, got {value!r}")
+    return space
 
-# Main simulation code
-simSteps = 50
-tempPredicted = []
-tempActual = []
-all_predicted_rankings = []  # Store actual player objects for each simulation
-all_actual_rankings = []     # Store actual player objects for each simulation
-
-# Getting data by simulating season
-for i in range(simSteps):   
-    print(f'\n\n\n\n Simulation Step {i}')
-    # Create new players
-    newPlayers = init_players(200)
-    assign_strategies(newPlayers, True)
-    
-    # Copy new players list
-    predictedRankings = [player for player in newPlayers]
-    
-    # Calculate predicted rankings (sorted by servingStrength + returningStrength)
-    predictedRankings.sort(key = lambda player: (player.serveStrength + player.returnStrength)*player.form*player.injuryThreshold*(1-player.injuryProbability), reverse=True)
-    
-    # Simulate season
-    newSeason = Season(newPlayers)
-    newSeason.simulate_season()
-    
-    all_actual_rankings.append(newSeason.rankings)
-    all_predicted_rankings.append(predictedRankings)
-
-create_comprehensive_analysis(all_predicted_rankings, all_actual_rankings)
 
+def sweep_command(args):
+    import numpy as np
+    from sweep import ParameterSweep, get_sweep_seed, grid_design, random_design, latin_hypercube_design, summarise_table, write_csv
 
-"""
-Simulation 2:
-every one will use different strategies now
-"""
+    space = parse_space(args.param, args.design)
+    seed = get_sweep_seed(args.cache, args.seed)
 
-# Main simulation code
-simSteps = 50
-tempPredicted = []
-tempActual = []
-all_predicted_rankings = []  # Store actual player objects for each simulation
-all_actual_rankings = []     # Store actual player objects for each simulation
-
-# Getting data by simulating season
-for i in range(simSteps):   
-    print(f'\n\n\n\n Simulation Step {i}')
-    # Create new players
-    newPlayers = init_players(200)
-    assign_strategies(newPlayers)
-    
-    # Copy new players list
-    predictedRankings = [player for player in newPlayers]
-    
-    # Calculate predicted rankings (sorted by servingStrength + returningStrength)
-    predictedRankings.sort(key = lambda player: (player.serveStrength + player.returnStrength)*player.form*player.injuryThreshold*(1-player.injuryProbability), reverse=True)
-    
-    # Simulate season
-    newSeason = Season(newPlayers)
-    newSeason.simulate_season()
-    
-    all_actual_rankings.append(newSeason.rankings)
-    all_predicted_rankings.append(predictedRankings)
-
-comprehensive_strategy_analysis(all_actual_rankings, "(Multi-Strategy Simulation)")
\ No newline at end of file
+    # The design is drawn from the sweep seed so a resumed sweep rebuilds the same configurations
+    if args.design == "grid":
+        configs = grid_design(space)
+    else:
+        designRng = np.random.default_rng([seed, 1])
+        design = random_design if args.design == "random" else latin_hypercube_design
+        configs = design(space, args.configs, designRng)
+
+    try:
+        sweep = ParameterSweep(configs, args.replicates, args.cache, args.players, args.strategies == "original", seed)
+    except (ValueError, AttributeError, KeyError) as error:
+        sys.exit(error.args[0])
+    sweep.run(args.workers)
+
+    table = sweep.get_table()
+    summary = summarise_table(table)
+    if args.output is not None:
+        write_csv(table, args.output)
+    if args.summary is not None:
+        write_csv(summary, args.summary)
+
+    names = list(space)
+    print(f"\n{'Config':<8}" + "".join(f"{name.split('.', 1)[1][:18]:>20}" for name in names) + f"{'Strategy':>16}{'Mean rank':>11}{'Top 50':>8}")
+    for row in summary:
+        print(f"{row['config']:<8}" + "".join(f"{row[name]:>20.3f}" for name in names) + f"{row['strategy']:>16}{row['meanRank']:>11.1f}{row['top50']:>7.1f}%")
+
+
+def build_parser():
+    """
+    Build the argument parser with the simulate, analyze and plot subcommands
+    """
+    parser = argparse.ArgumentParser(description="Monte Carlo simulation of ATP seasons and tournament entry strategies")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    # Options for simulating seasons
+    simulation = argparse.ArgumentParser(add_help=False)
+    simulation.add_argument("--replicates", type=int, default=50, help="number of seasons to simulate")
+    simulation.add_argument("--players", type=int, default=200, help="number of players in each season")
+    simulation.add_argument("--strategies", choices=["original", "mixed"], default="original", help="every player on the original strategy, or the five strategies in rotation")
+    simulation.add_argument("--seed", type=int, default=None, help="root seed, fresh entropy if omitted")
+    simulation.add_argument("--workers", type=int, default=None, help="worker processes, every core if omitted")
+    simulation.add_argument("--target", nargs="+", default=None, metavar="METRIC=HALFWIDTH", help="run until the confidence intervals of these metrics (mean_rank, top50) are this narrow, with --replicates as the most to run")
+    simulation.add_argument("--time-budget", type=float, default=None, help="stop running seasons after this many seconds")
+    simulation.add_argument("--confidence", type=float, default=0.95, help="confidence level of the stopping intervals")
+
+    # Options for reading a stored run instead
+    stored = argparse.ArgumentParser(add_help=False)
+    stored.add_argument("--input", default=None, help="results store to analyse instead of simulating")
+
+    simulate = subparsers.add_parser("simulate", parents=[simulation], help="simulate seasons and print a summary")
+    simulate.add_argument("--output", default=None, help="results store directory to append the seasons to")
+    simulate.set_defaults(func=simulate_command)
+
+    analyze = subparsers.add_parser("analyze", parents=[simulation, stored], help="print a summary of a stored or new run")
+    analyze.set_defaults(func=analyze_command)
+
+    plot = subparsers.add_parser("plot", parents=[simulation, stored], help="plot a stored or new run")
+    plot.add_argument("--kind", choices=["comprehensive", "strategy", "all"], default=None, help="plots to draw, chosen from the strategy mix if omitted")
+    plot.add_argument("--method", choices=["average", "median", "quantile"], default="average", help="aggregation across seasons for the comprehensive plots")
+    plot.add_argument("--quantile", type=float, default=0.9, help="quantile for the quantile method")
+    plot.add_argument("--exact", action="store_true", help="keep every season in memory for exact medians and quantiles instead of sketches")
+    plot.add_argument("--save-dir", default=None, help="save figures as PNG files here instead of showing them")
+    plot.set_defaults(func=plot_command)
+
+    compare = subparsers.add_parser("compare", help="compare strategies on the same players and random streams")
+    compare.add_argument("--replicates", type=int, default=20, help="number of player populations, each played once per strategy rotation")
+    compare.add_argument("--players", type=int, default=200, help="number of players in each population")
+    compare.add_argument("--seed", type=int, default=None, help="root seed, fresh entropy if omitted")
+    compare.add_argument("--workers", type=int, default=None, help="worker processes, every core if omitted")
+    compare.add_argument("--reference", default=None, help="compare every strategy against this one, every pair if omitted")
+    compare.add_argument("--metric", choices=["rank", "points"], default="rank", help="player outcome to compare")
+    compare.add_argument("--antithetic", action="store_true", help="also play every season with antithetic draws")
+    compare.add_argument("--confidence", type=float, default=0.95, help="confidence level of the intervals")
+    compare.set_defaults(func=compare_command)
+
+    sweep = subparsers.add_parser("sweep", help="sweep strategy parameters, resuming from a cache of finished seasons")
+    sweep.add_argument("--param", nargs="+", required=True, metavar="Strategy.parameter=SPEC", help="values a,b,c for a grid or a range low:high otherwise, tables by key as Original.IMPORTANCE.ATP250")
+    sweep.add_argument("--design", choices=["grid", "random", "lhs"], default="grid", help="every combination of the values, uniform draws or a Latin hypercube over the ranges")
+    sweep.add_argument("--configs", type=int, default=10, help="configurations drawn for the random and lhs designs")
+    sweep.add_argument("--replicates", type=int, default=5, help="seasons of every configuration")
+    sweep.add_argument("--players", type=int, default=200, help="number of players in each season")
+    sweep.add_argument("--strategies", choices=["original", "mixed"], default="mixed", help="every player on the original strategy, or the five strategies in rotation")
+    sweep.add_argument("--seed", type=int, default=None, help="root seed, the one stored in the cache or fresh entropy if omitted")
+    sweep.add_argument("--workers", type=int, default=None, help="worker processes, every core if omitted")
+    sweep.add_argument("--cache", required=True, help="directory of finished seasons, an interrupted sweep resumes from it")
+    sweep.add_argument("--output", default=None, help="CSV file for the tidy table, one row per configuration, season and strategy")
+    sweep.add_argument("--summary", default=None, help="CSV file for the table averaged over seasons")
+    sweep.set_defaults(func=sweep_command)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,98 @@
 # Imports
+import functools
 import numpy as np
-from set import Set
+from set import Set, get_set_outcome_probabilities
+from tiebreak import Tiebreak
+from random_streams import resolve_rng
+
+
+# Point probabilities are rounded to this many steps before caching match win probabilities
+MATCH_CACHE_RESOLUTION = 10000
+
+
+@functools.lru_cache(maxsize=200000)
+def get_quantized_match_win_probability(serverKey, returnerKey, setTarget):
+    """
+    Method:
+        Calculates the exact probability that the starting server wins the match for
+        quantized point probabilities. Results are kept in a bounded LRU cache.
+
+    Params:
+        serverKey (int) - Starting server's point win probability on serve, in cache resolution steps
+        returnerKey (int) - Starting returner's point win probability on serve, in cache resolution steps
+        setTarget (int) - The number of sets needed to win the match
+
+    Return:
+        winProbability (float) - The probability the starting server wins the match
+    """
+    serverPoint = np.array([serverKey / MATCH_CACHE_RESOLUTION])
+    returnerPoint = np.array([returnerKey / MATCH_CACHE_RESOLUTION])
+    return float(get_match_win_probabilities(serverPoint, returnerPoint, setTarget)[0])
+
+
+def get_match_win_probabilities(serverPoint, returnerPoint, setTarget, averageServe=False):
+    """
+    Method:
+        Vectorised exact probabilities that the starting server wins the match
+
+    Params:
+        serverPoint (np.ndarray) - Probabilities the starting server wins a point on their serve
+        returnerPoint (np.ndarray) - Probabilities the starting returner wins a point on their serve
+        setTarget (int) - The number of sets needed to win the match
+        averageServe (bool) - Average over either player serving first (i.e. before the coin toss)
+
+    Return:
+        winProbabilities (np.ndarray)
+    """
+    # Set outcomes from the starting server's perspective, keyed by who serves first in the set
+    outcomes = {True: get_set_outcome_probabilities(serverPoint, returnerPoint), False: {}}
+    for (firstWins, firstServesNext), probability in get_set_outcome_probabilities(returnerPoint, serverPoint).items():
+        outcomes[False][(not firstWins, not firstServesNext)] = probability
+
+    # Walk back from the finished scores (sets won by starting server, sets won by returner, server serves)
+    winProbability = {}
+    for total in range(2 * setTarget - 2, -1, -1):
+        for serverSets in range(max(0, total - setTarget + 1), min(total, setTarget - 1) + 1):
+            returnerSets = total - serverSets
+            for serverFirst in (True, False):
+                probability = 0.0
+                for (serverWinsSet, serverServesNext), outcome in outcomes[serverFirst].items():
+                    if serverWinsSet:
+                        if serverSets + 1 == setTarget:
+                            probability = probability + outcome
+                        else:
+                            probability = probability + outcome * winProbability[(serverSets + 1, returnerSets, serverServesNext)]
+                    elif returnerSets + 1 < setTarget:
+                        probability = probability + outcome * winProbability[(serverSets, returnerSets + 1, serverServesNext)]
+                winProbability[(serverSets, returnerSets, serverFirst)] = probability
+
+    if averageServe:
+        return (winProbability[(0, 0, True)] + winProbability[(0, 0, False)]) / 2
+    return winProbability[(0, 0, True)]
+
+
+def get_match_win_probability(serverPoint, returnerPoint, setTarget):
+    """
+    Method:
+        Calculates the probability that the starting server wins the match
+
+    Params:
+        serverPoint (float) - Probability the starting server wins a point on their serve
+        returnerPoint (float) - Probability the starting returner wins a point on their serve
+        setTarget (int) - The number of sets needed to win the match
+
+    Return:
+        winProbability (float)
+    """
+    return get_quantized_match_win_probability(
+        int(round(serverPoint * MATCH_CACHE_RESOLUTION)),
+        int(round(returnerPoint * MATCH_CACHE_RESOLUTION)),
+        setTarget,
+    )
 
 
 class Match:
-    def __init__(self, player1, player2, setFormat):
+    def __init__(self, player1, player2, setFormat, method="fast", winMatrix=None, rng=None):
         """
         Method:
             init method for match class
@@ -13,17 +101,24 @@ class Match:
             player1 (Player) - One of the players participating in the match
             player2 (Player) - One of the players participating in the match
             setFormat (int) - The format of the set e.g. grand slams are 5 sets and other events are 3
+            method (str) - "fast" to resolve the match with one draw from its win probability
+                           or "detailed" to play it set by set and keep the scoreline
+            winMatrix (WinMatrix) - Optional weekly win probability matrix used by the fast method
+            rng (np.random.Generator) - Generator to draw from, the process wide one if None
         """
         # Match attributes
         self.player1 = player1
         self.player2 = player2
+        self.method = method
+        self.winMatrix = winMatrix
+        self.rng = resolve_rng(rng)
         self.winner = None
         self.loser = None
         self.setTarget = 2 if setFormat == 3 else 3
         self.score = [0, 0]
 
         # Coin toss to see who starting server is
-        coinToss = np.random.random_integers(low=1, high=2)
+        coinToss = self.rng.integers(low=1, high=3)
         self.startingServer = player1 if coinToss == 1 else player2
         self.startingReturner = player2 if coinToss == 1 else player1
 
@@ -48,17 +143,33 @@ class Match:
             self.loser = self.startingServer
             return None
         elif self.startingReturner.isInjured:
-            self.winner = self.startingReturner
-            self.loser = self.startingServer
+            self.winner = self.startingServer
+            self.loser = self.startingReturner
             return None
         
+        # Resolve the match from its exact win probability
+        if self.method == "fast":
+            if self.winMatrix is not None:
+                winProbability = self.winMatrix.get(self.startingServer, self.startingReturner)
+            else:
+                winProbability = get_match_win_probability(
+                    Tiebreak.get_point_probability(self.startingServer, self.startingReturner),
+                    Tiebreak.get_point_probability(self.startingReturner, self.startingServer),
+                    self.setTarget,
+                )
+            if self.rng.random() <= winProbability:
+                self.finish(self.startingServer, self.startingReturner)
+            else:
+                self.finish(self.startingReturner, self.startingServer)
+            return None
+
         # Initiating starting server and returner
         playerList = [self.startingServer, self.startingReturner]
 
         # Play sets until there is a winner of the match
         while self.winner == None:
             # Initiate current set
-            currentSet = Set(playerList[0], playerList[1])
+            currentSet = Set(playerList[0], playerList[1], rng=self.rng)
 
             # Simulating the set
             playerList = currentSet.simulate_set()
@@ -68,16 +179,29 @@ class Match:
 
             # Checking if there is a winner
             if self.score[0] == self.setTarget:
-                self.winner = self.player1
-                self.loser = self.player2
-                self.player1.form += 0.1
-                self.player2.form -= 0.1
+                self.finish(self.player1, self.player2)
 
             elif self.score[1] == self.setTarget:
-                self.winner = self.player2
-                self.loser = self.player1
-                self.player1.form -= 0.1
-                self.player2.form += 0.1
+                self.finish(self.player2, self.player1)
+
+    def finish(self, winner, loser):
+        """
+        Method:
+            Records the result of the match and updates both players' form
+
+        Params:
+            winner (Player) - The player that won the match
+            loser (Player) - The player that lost the match
+        """
+        self.winner = winner
+        self.loser = loser
+        winner.form += 0.1
+        loser.form -= 0.1
+
+        # Both players' win probabilities are now stale
+        if self.winMatrix is not None:
+            self.winMatrix.mark_dirty(winner)
+            self.winMatrix.mark_dirty(loser)
 
     def increment_score(self, player):
         """
@@ -0,0 +1,206 @@
+# Imports
+import itertools
+import math
+import numpy as np
+from statistics import NormalDist
+from aggregators import RunningMoments
+from random_streams import as_seed_sequence, copy_seed_sequence
+from replicates import init_players, assign_strategies, map_replicates
+from season import Season
+
+# Number of strategies in the rotation of assign_strategies
+NUM_STRATEGIES = 5
+
+
+class PairedResult:
+    def __init__(self, strategyNames, ranks, points):
+        """
+        Method:
+            init method for PairedResult class. The outcome of every player of one
+            population under every arm of a paired experiment. Arms give the players
+            different strategies but replay the same random streams, and each arm may
+            be played twice, the second time with antithetic draws.
+
+        Params:
+            strategyNames (np.ndarray): Shape (arms, players), the strategy of each player in each arm
+            ranks (np.ndarray): Shape (arms, draws, players), final ranking of each player
+            points (np.ndarray): Shape (arms, draws, players), ranking points of each player
+        """
+        self.strategyNames = strategyNames
+        self.ranks = ranks
+        self.points = points
+
+
+def simulate_paired_replicate(task):
+    """
+    Method:
+        Plays one population of players through every arm of a paired experiment.
+        The population is rebuilt from the same seed for every arm and every season
+        replays the same match, injury and draw streams, so the arms differ only in
+        the strategies the players follow. With offset 0 and no antithetic draw the
+        season is the same as simulate_replicate gives for this seed.
+
+    Params:
+        task (tuple): (numPlayers, offsets, antithetic, seedSequence)
+
+    Return:
+        result (PairedResult)
+    """
+    numPlayers, offsets, antithetic, seedSequence = task
+    playerSeed, seasonSeed = seedSequence.spawn(2)
+    draws = (False, True) if antithetic else (False,)
+
+    strategyNames = np.empty((len(offsets), numPlayers), dtype=object)
+    ranks = np.empty((len(offsets), len(draws), numPlayers), dtype=np.int64)
+    points = np.empty((len(offsets), len(draws), numPlayers))
+
+    for arm, offset in enumerate(offsets):
+        for draw, mirrored in enumerate(draws):
+            players = init_players(numPlayers, np.random.default_rng(playerSeed))
+            assign_strategies(players, offset=offset)
+            strategyNames[arm] = [type(player.strategy).__name__ for player in players]
+
+            season = Season(players, copy_seed_sequence(seasonSeed), antithetic=mirrored)
+            season.simulate_season()
+
+            # Outcomes by the player's position in the population rather than in the rankings
+            ranks[arm, draw] = [player.ranking for player in players]
+            points[arm, draw] = [player.rankingPoints for player in players]
+
+    return PairedResult(strategyNames, ranks, points)
+
+
+def iter_paired_replicates(numReplicates, numPlayers=200, offsets=range(NUM_STRATEGIES), antithetic=False, workers=None, seed=None):
+    """
+    Method:
+        Runs independent populations through a paired experiment across a pool of
+        worker processes, yielding their results in replicate order
+
+    Params:
+        numReplicates (int): The number of populations
+        numPlayers (int): The number of players in each population
+        offsets (List(int)): Rotation offset of the strategies in each arm, every rotation by default
+                             so that every player follows every strategy once
+        antithetic (bool): Whether to also play every arm with antithetic draws
+        workers (int): Number of worker processes, every core if None and in process if 1
+        seed (int | np.random.SeedSequence): Root seed for the whole run, fresh entropy if None
+
+    Yield:
+        result (PairedResult)
+    """
+    offsets = tuple(offsets)
+    tasks = [(numPlayers, offsets, antithetic, seedSequence) for seedSequence in as_seed_sequence(seed).spawn(numReplicates)]
+    yield from map_replicates(simulate_paired_replicate, tasks, workers)
+
+
+class PairedComparison:
+    # Per player outcomes that can be compared
+    METRICS = ("rank", "points")
+
+    def __init__(self, reference=None, metric="rank", confidence=0.95):
+        """
+        Method:
+            init method for PairedComparison class. Streams paired results into the
+            difference in a player outcome between each pair of strategies. Within a
+            replicate each player that followed both strategies in different arms
+            contributes their own difference, with antithetic draws averaged first,
+            and the replicate's value is the mean over those players.
+
+            The same replicates also give the estimate a single mixed season gives,
+            the difference between the strategies' means in the first arm, so the
+            variance of the two can be compared.
+
+        Params:
+            reference (str): Compare every strategy against this one, every pair of strategies if None
+            metric (str): "rank" or "points"
+            confidence (float): Confidence level of the intervals
+        """
+        if metric not in self.METRICS:
+            raise ValueError(f"Unknown metric {metric}, choose from {self.METRICS}")
+
+        self.reference = reference
+        self.metric = metric
+        self.confidence = confidence
+        self.z = NormalDist().inv_cdf((1 + confidence) / 2)
+
+        # Pairs and their moments, fixed by the first replicate
+        self.pairs = None
+        self.paired = None
+        self.unpaired = None
+        self.seasonsPerReplicate = None
+        self.count = 0
+
+    def get_pairs(self, strategies):
+        if self.reference is None:
+            return list(itertools.combinations(strategies, 2))
+        if self.reference not in strategies:
+            raise ValueError(f"Reference strategy {self.reference} is not in the experiment")
+        return [(strategy, self.reference) for strategy in strategies if strategy != self.reference]
+
+    def update(self, result):
+        """
+        Method:
+            Adds one replicate
+
+        Params:
+            result (PairedResult)
+        """
+        values = result.ranks if self.metric == "rank" else result.points
+
+        # Antithetic draws of an arm are averaged into one outcome per player
+        outcomes = values.mean(axis=1)
+        names = result.strategyNames
+
+        if self.pairs is None:
+            self.pairs = self.get_pairs(sorted(set(names.ravel())))
+            self.paired = RunningMoments(len(self.pairs))
+            self.unpaired = RunningMoments(len(self.pairs))
+            self.seasonsPerReplicate = values.shape[0] * values.shape[1]
+
+        paired = np.full(len(self.pairs), np.nan)
+        unpaired = np.full(len(self.pairs), np.nan)
+        for i, (strategy1, strategy2) in enumerate(self.pairs):
+            # Each player's outcome under either strategy, whichever arm it was followed in
+            outcome1 = np.where(names == strategy1, outcomes, 0).sum(axis=0)
+            outcome2 = np.where(names == strategy2, outcomes, 0).sum(axis=0)
+            both = (names == strategy1).any(axis=0) & (names == strategy2).any(axis=0)
+            if both.any():
+                paired[i] = (outcome1[both] - outcome2[both]).mean()
+
+            # What one mixed season on its own gives
+            firstArm = values[0, 0]
+            unpaired[i] = firstArm[names[0] == strategy1].mean() - firstArm[names[0] == strategy2].mean()
+
+        self.paired.update(paired)
+        self.unpaired.update(unpaired)
+        self.count += 1
+
+    def summary(self):
+        """
+        Method:
+            Paired differences of every pair with their confidence intervals. The
+            efficiency is how many times more seasons single mixed seasons need for
+            the same precision, allowing for the extra seasons every paired replicate
+            plays, so above 1 the paired experiment is cheaper.
+
+        Return:
+            report (List(dict)): One row per pair
+        """
+        if self.pairs is None or self.count < 2:
+            return []
+
+        pairedVariance = self.paired.variance(ddof=1)
+        unpairedVariance = self.unpaired.variance(ddof=1)
+        rows = []
+        for i, (strategy1, strategy2) in enumerate(self.pairs):
+            pairedCost = pairedVariance[i] * self.seasonsPerReplicate
+            rows.append({
+                "strategy": strategy1,
+                "versus": strategy2,
+                "difference": float(self.paired.mean[i]),
+                "halfWidth": float(self.z * math.sqrt(pairedVariance[i] / self.count)),
+                "unpairedDifference": float(self.unpaired.mean[i]),
+                "unpairedHalfWidth": float(self.z * math.sqrt(unpairedVariance[i] / self.count)),
+                "efficiency": float(unpairedVariance[i] / pairedCost) if pairedCost > 0 else math.inf,
+            })
+        return rows
@@ -1,37 +1,295 @@
 # Imports
 import numpy as np
-import random
+from random_streams import resolve_rng
+
+
+class PlayerPool:
+    # Per player state stored as contiguous arrays, with the type of each array
+    FIELDS = {
+        "serveStrength": float,
+        "returnStrength": float,
+        "form": float,
+        "fitness": float,
+        "injuryRisk": float,
+        "injuryThreshold": float,
+        "injuryProbability": float,
+        "isInjured": bool,
+        "noInjured": np.int64,
+        "ranking": np.int64,
+        "rankingPoints": np.int64,
+    }
+
+    def __init__(self, capacity=256):
+        """
+        Method:
+            init method for PlayerPool class. Stores the numeric state of every player
+            in struct of arrays form, indexed by integer player id.
+
+        Params:
+            capacity (int): The number of players to allocate space for up front
+        """
+        self.size = 0
+        self.capacity = max(1, capacity)
+        for field, dtype in self.FIELDS.items():
+            setattr(self, field, np.zeros(self.capacity, dtype=dtype))
+
+    def add_player(self):
+        """
+        Method:
+            Reserves the next player id, growing the arrays if they are full
+
+        Return:
+            playerId (int)
+        """
+        if self.size == self.capacity:
+            self.grow()
+
+        playerId = self.size
+        self.size += 1
+        return playerId
+
+    def grow(self):
+        """
+        Method:
+            Doubles the capacity of every array
+        """
+        self.capacity *= 2
+        for field in self.FIELDS:
+            old = getattr(self, field)
+            new = np.zeros(self.capacity, dtype=old.dtype)
+            new[: self.size] = old[: self.size]
+            setattr(self, field, new)
+
+    def add_points(self, ids, points):
+        """
+        Method:
+            Vectorised Player.increment_points for many players at once
+
+        Params:
+            ids (np.ndarray): Unique ids of the players to update
+            points (int | np.ndarray): The amount of points to increment by
+        """
+        self.rankingPoints[ids] += points
+
+    def update_fitness(self, ids, matchRisk):
+        """
+        Method:
+            Vectorised Player.update_fitness for many players at once
+
+        Params:
+            ids (np.ndarray): Unique ids of the players to update
+            matchRisk (float | np.ndarray): The risk associated with each player's match
+        """
+        matchRisk = np.broadcast_to(matchRisk, ids.shape)
+        self.injuryRisk[ids] += matchRisk
+
+        # Negative risk (resting) reduces fitness by 1 + risk, otherwise fitness tracks injury risk
+        self.fitness[ids] = np.where(
+            matchRisk < 0,
+            self.fitness[ids] - (1 + matchRisk),
+            np.maximum(0, 1 - self.injuryRisk[ids]),
+        )
+
+    def check_injuries(self, ids, uniforms=None, rng=None):
+        """
+        Method:
+            Vectorised Player.check_injury for many players at once
+
+        Params:
+            ids (np.ndarray): Ids of the players to check
+            uniforms (np.ndarray): Optional uniform draws, one per player
+            rng (np.random.Generator): Generator to draw from when no uniforms are given
+        """
+        if uniforms is None:
+            uniforms = resolve_rng(rng).random(len(ids))
+
+        injured = (self.injuryRisk[ids] >= self.injuryThreshold[ids]) & (uniforms < self.injuryProbability[ids])
+        self.isInjured[ids] |= injured
+
+    def rest(self, ids, uniforms=None, rng=None):
+        """
+        Method:
+            Applies a week of rest: injured players recover with probability 0.5
+            and fitness is updated with a negative match risk
+
+        Params:
+            ids (np.ndarray): Unique ids of the resting players
+            uniforms (np.ndarray): Optional uniform draws, one per player
+            rng (np.random.Generator): Generator to draw from when no uniforms are given
+        """
+        if uniforms is None:
+            uniforms = resolve_rng(rng).random(len(ids))
+
+        self.isInjured[ids] &= uniforms > 0.5
+        self.update_fitness(ids, -0.5)
+
+
+def pool_field(field):
+    """
+    Method:
+        Creates a property that reads and writes a field of the player's pool
+
+    Params:
+        field (str): The name of the pool array
+
+    Return:
+        property
+    """
+    def getter(self):
+        return getattr(self.pool, field).item(self.id)
+
+    def setter(self, value):
+        getattr(self.pool, field)[self.id] = value
+
+    return property(getter, setter)
+
+
+def get_shared_pool(players):
+    """
+    Method:
+        Returns the pool that every player belongs to, if they all share one
+
+    Params:
+        players (List(Player))
+
+    Return:
+        pool (PlayerPool | None)
+    """
+    if not players:
+        return None
+    pool = players[0].pool
+    return pool if all(player.pool is pool for player in players) else None
+
+
+def gather_attribute(players, field):
+    """
+    Method:
+        Collects one attribute of a list of players into an array, indexing the
+        pool directly when the players share one
+
+    Params:
+        players (List(Player))
+        field (str): The attribute to collect
+
+    Return:
+        values (np.ndarray)
+    """
+    pool = get_shared_pool(players)
+    if pool is not None:
+        return getattr(pool, field)[[player.id for player in players]]
+    return np.array([getattr(player, field) for player in players])
+
+
+def update_fitness(players, matchRisk):
+    """
+    Method:
+        Updates the fitness of a list of distinct players, in one array operation
+        when they share a pool
+
+    Params:
+        players (List(Player))
+        matchRisk (float): The risk associated with playing a match
+    """
+    pool = get_shared_pool(players)
+    if pool is not None:
+        pool.update_fitness(np.array([player.id for player in players], dtype=int), matchRisk)
+    else:
+        for player in players:
+            player.update_fitness(matchRisk)
+
+
+def check_injuries(players, rng=None):
+    """
+    Method:
+        Checks a list of players for injuries, in one array operation when they share a pool
+
+    Params:
+        players (List(Player))
+        rng (np.random.Generator): Generator to draw from, the process wide one if None
+    """
+    pool = get_shared_pool(players)
+    if pool is not None:
+        pool.check_injuries(np.array([player.id for player in players], dtype=int), rng=rng)
+    else:
+        for player in players:
+            player.check_injury(rng)
+
+
+def rest_players(players, rng=None):
+    """
+    Method:
+        Applies a week of rest to a list of distinct players, in one array operation
+        when they share a pool
+
+    Params:
+        players (List(Player))
+        rng (np.random.Generator): Generator to draw from, the process wide one if None
+    """
+    rng = resolve_rng(rng)
+    pool = get_shared_pool(players)
+    if pool is not None:
+        pool.rest(np.array([player.id for player in players], dtype=int), rng=rng)
+        return None
+
+    for player in players:
+        # Randomly treat injury if the player is injured
+        if player.isInjured and rng.random() <= 0.5:
+            player.isInjured = False
+
+        # Increase fitness level
+        player.update_fitness(-0.5)
+
 
 class Player:
+    __slots__ = ("name", "strategy", "pool", "id")
 
-    def __init__(self, name):
+    def __init__(self, name, pool=None, rng=None):
         """
         Method:
             init method where serve, return and form multipliers are assigned random values
 
         Params:
             name (str): The name of the player
+            pool (PlayerPool): The pool holding this player's state, a pool of its own if None
+            rng (np.random.Generator): Generator for the random attributes, the process wide one if None
         """
+        rng = resolve_rng(rng)
+
         # Player Identity
         self.name = name
+        self.pool = pool if pool is not None else PlayerPool(1)
+        self.id = self.pool.add_player()
 
         # Player attributes
-        self.serveStrength = 58 * np.random.normal( loc=1.0, scale=0.2 )  # Tour average of service points won is 58%
-        self.returnStrength = 42 * np.random.normal( loc=1.0, scale=0.2 )  # Tour average of return points won is 42%
-        self.form = np.random.normal(loc=1.0, scale=0.2)
-        
+        self.serveStrength = 58 * rng.normal( loc=1.0, scale=0.2 )  # Tour average of service points won is 58%
+        self.returnStrength = 42 * rng.normal( loc=1.0, scale=0.2 )  # Tour average of return points won is 42%
+        self.form = rng.normal(loc=1.0, scale=0.2)
+
         # Manage injuries
         self.fitness = 1.0
         self.injuryRisk = 0.0
-        self.injuryThreshold = np.random.normal(loc=0.6, scale=0.1)
-        self.injuryProbability = np.random.normal(loc=0.2, scale=0.1)
+        self.injuryThreshold = rng.normal(loc=0.6, scale=0.1)
+        self.injuryProbability = rng.normal(loc=0.2, scale=0.1)
         self.isInjured = False
         self.noInjured = 0
 
         # Player stats
         self.ranking = 0
         self.rankingPoints = 0
-    
+
+    # Numeric state lives in the pool
+    serveStrength = pool_field("serveStrength")
+    returnStrength = pool_field("returnStrength")
+    form = pool_field("form")
+    fitness = pool_field("fitness")
+    injuryRisk = pool_field("injuryRisk")
+    injuryThreshold = pool_field("injuryThreshold")
+    injuryProbability = pool_field("injuryProbability")
+    isInjured = pool_field("isInjured")
+    noInjured = pool_field("noInjured")
+    ranking = pool_field("ranking")
+    rankingPoints = pool_field("rankingPoints")
+
     def set_strategy(self, strategy):
         self.strategy = strategy
 
@@ -44,12 +302,12 @@ class Player:
             points (int): The amount of points to increment by
         """
         self.rankingPoints += points
-    
+
     def update_fitness(self, matchRisk):
         """
         Method:
             Updates the fitness and injury attributes of the player
-        
+
         Params:
             matchRisk (float): The risk associated with playing a match
         """
@@ -61,12 +319,15 @@ class Player:
         else:
             self.injuryRisk += matchRisk
             self.fitness = max(0, 1-self.injuryRisk)
-    
-    def check_injury(self):
+
+    def check_injury(self, rng=None):
         """
         Method:
             Checks if the player has passed their injury threshold and draw a random value
             to assign if they are injured.
+
+        Params:
+            rng (np.random.Generator): Generator to draw from, the process wide one if None
         """
-        if self.injuryRisk >= self.injuryThreshold and random.random() < self.injuryProbability:
+        if self.injuryRisk >= self.injuryThreshold and resolve_rng(rng).random() < self.injuryProbability:
             self.isInjured = True
@@ -0,0 +1,459 @@
+import os
+import matplotlib.pyplot as plt
+import numpy as np
+
+
+
+# Directory figures are saved to instead of being shown, None to show them
+outputDirectory = None
+
+
+def set_output_directory(path):
+    """
+    Save figures as PNG files in path instead of showing them, or show them again if path is None
+    """
+    global outputDirectory
+    outputDirectory = path
+    if path is not None:
+        os.makedirs(path, exist_ok=True)
+
+
+def show_figure(name):
+    """Show the current figure, or save it under name when an output directory is set"""
+    if outputDirectory is None:
+        plt.show()
+    else:
+        plt.savefig(os.path.join(outputDirectory, f"{name}.png"))
+        plt.close()
+
+
+
+"""
+
+The following functions are all used to plot for simulation 1
+
+"""
+
+
+
+
+class AggregatedRankings:
+    """Statistics of each ranking position aggregated across multiple simulations, one column per stat"""
+    def __init__(self, values, fields, names):
+        self.values = values
+        self.fieldIndex = {field: i for i, field in enumerate(fields)}
+        self.names = names
+
+    def __len__(self):
+        return len(self.values)
+
+    def column(self, field, rows=slice(None)):
+        """Values of one stat for the given ranking positions (all of them by default)"""
+        return self.values[rows, self.fieldIndex[field]]
+
+    def combined_score(self, rows=slice(None)):
+        """Combined score used to predict rankings, for the given ranking positions"""
+        return ((self.column('serveStrength', rows) + self.column('returnStrength', rows)) * self.column('form', rows)
+                * self.column('injuryThreshold', rows) * (1 - self.column('injuryProbability', rows)))
+
+def create_aggregated_rankings(aggregator, method='average', q=None):
+    """
+    Create aggregated rankings using average, median or quantile statistics
+    
+    Args:
+        aggregator: PositionAggregator holding the stats of every simulation
+        method: 'average', 'median' or 'quantile'
+        q: The quantile for the 'quantile' method
+    
+    Returns:
+        AggregatedRankings with one row per ranking position
+    """
+    # Each position is named after the most common player there
+    names = [f"Pos_{pos+1}_{name}" for pos, name in enumerate(aggregator.most_common_names())]
+    return AggregatedRankings(aggregator.aggregate(method, q), aggregator.fields, names)
+
+def visualize_individual_stats_by_ranking(actualRankings, title_suffix=""):
+    """Break down individual statistics by ranking position"""
+    
+    # Extract individual stats for each ranking position
+    serve_strength = actualRankings.column('serveStrength')
+    return_strength = actualRankings.column('returnStrength')
+    form = actualRankings.column('form')
+    injury_threshold = actualRankings.column('injuryThreshold')
+    injury_probability = actualRankings.column('injuryProbability')
+    
+    # Create subplots for each stat - REDUCED SIZE
+    fig, axes = plt.subplots(2, 3, figsize=(12, 8))  # Reduced from (18, 12)
+    fig.suptitle(f'Individual Statistics by Ranking Position {title_suffix}', fontsize=12)
+    
+    # Serve Strength
+    axes[0, 0].plot(range(len(actualRankings)), serve_strength, color='blue', alpha=0.7)
+    axes[0, 0].set_title('Serve Strength', fontsize=10)
+    axes[0, 0].set_xlabel('Ranking Position', fontsize=9)
+    axes[0, 0].set_ylabel('Serve Strength', fontsize=9)
+    axes[0, 0].grid(True, alpha=0.3)
+    axes[0, 0].tick_params(labelsize=8)
+    
+    # Return Strength
+    axes[0, 1].plot(range(len(actualRankings)), return_strength, color='green', alpha=0.7)
+    axes[0, 1].set_title('Return Strength', fontsize=10)
+    axes[0, 1].set_xlabel('Ranking Position', fontsize=9)
+    axes[0, 1].set_ylabel('Return Strength', fontsize=9)
+    axes[0, 1].grid(True, alpha=0.3)
+    axes[0, 1].tick_params(labelsize=8)
+    
+    # Form
+    axes[0, 2].plot(range(len(actualRankings)), form, color='orange', alpha=0.7)
+    axes[0, 2].set_title('Form', fontsize=10)
+    axes[0, 2].set_xlabel('Ranking Position', fontsize=9)
+    axes[0, 2].set_ylabel('Form', fontsize=9)
+    axes[0, 2].grid(True, alpha=0.3)
+    axes[0, 2].tick_params(labelsize=8)
+    
+    # Injury Threshold
+    axes[1, 0].plot(range(len(actualRankings)), injury_threshold, color='red', alpha=0.7)
+    axes[1, 0].set_title('Injury Threshold', fontsize=10)
+    axes[1, 0].set_xlabel('Ranking Position', fontsize=9)
+    axes[1, 0].set_ylabel('Injury Threshold', fontsize=9)
+    axes[1, 0].grid(True, alpha=0.3)
+    axes[1, 0].tick_params(labelsize=8)
+    
+    # Injury Probability
+    axes[1, 1].plot(range(len(actualRankings)), injury_probability, color='purple', alpha=0.7)
+    axes[1, 1].set_title('Injury Probability', fontsize=10)
+    axes[1, 1].set_xlabel('Ranking Position', fontsize=9)
+    axes[1, 1].set_ylabel('Injury Probability', fontsize=9)
+    axes[1, 1].grid(True, alpha=0.3)
+    axes[1, 1].tick_params(labelsize=8)
+    
+    # Combined Score
+    combined_score = actualRankings.combined_score()
+    axes[1, 2].plot(range(len(actualRankings)), combined_score, color='black', alpha=0.7)
+    axes[1, 2].set_title('Combined Score', fontsize=10)
+    axes[1, 2].set_xlabel('Ranking Position', fontsize=9)
+    axes[1, 2].set_ylabel('Combined Score', fontsize=9)
+    axes[1, 2].grid(True, alpha=0.3)
+    axes[1, 2].tick_params(labelsize=8)
+    
+    plt.tight_layout()
+    show_figure("individual_stats_by_ranking")
+
+def create_ranking_tier_analysis(actualRankings, tier_size=50):
+    """Analyze statistics by ranking tiers"""
+    
+    # Create tiers
+    tier_starts = np.arange(0, len(actualRankings), tier_size)
+    tier_sizes = np.diff(np.append(tier_starts, len(actualRankings)))
+    tier_labels = [f'Rank {i+1}-{min(i+tier_size, len(actualRankings))}' for i in tier_starts]
+    
+    # Calculate statistics for each tier, averaging every column at once
+    tier_means = np.add.reduceat(actualRankings.values, tier_starts, axis=0) / tier_sizes[:, None]
+    tier_stat = lambda field: tier_means[:, actualRankings.fieldIndex[field]]
+    stats_by_tier = {
+        'serve_strength': tier_stat('serveStrength'),
+        'return_strength': tier_stat('returnStrength'),
+        'form': tier_stat('form')*20,
+        'injury_threshold': tier_stat('injuryThreshold')*100,
+        'injury_probability': tier_stat('injuryProbability')*100,
+        'combined_score': np.add.reduceat(actualRankings.combined_score(), tier_starts) / tier_sizes
+    }
+    
+    # Create bar chart - REDUCED SIZE
+    fig, ax = plt.subplots(figsize=(10, 6))  # Reduced from (15, 8)
+    x = np.arange(len(tier_labels))
+    width = 0.12
+    
+    bars1 = ax.bar(x - 2.5*width, stats_by_tier['serve_strength'], width, label='Serve Strength', alpha=0.8)
+    bars2 = ax.bar(x - 1.5*width, stats_by_tier['return_strength'], width, label='Return Strength', alpha=0.8)
+    bars3 = ax.bar(x - 0.5*width, stats_by_tier['form'], width, label='Form', alpha=0.8)
+    bars4 = ax.bar(x + 0.5*width, stats_by_tier['injury_threshold'], width, label='Injury Threshold', alpha=0.8)
+    bars5 = ax.bar(x + 1.5*width, stats_by_tier['injury_probability'], width, label='Injury Probability', alpha=0.8)
+    
+    ax.set_xlabel('Ranking Tiers', fontsize=10)
+    ax.set_ylabel('Average Statistic Value', fontsize=10)
+    ax.set_title('Average Statistics by Ranking Tier', fontsize=12)
+    ax.set_xticks(x)
+    ax.set_xticklabels(tier_labels, rotation=45, fontsize=9)
+    ax.legend(fontsize=8)
+    ax.grid(True, alpha=0.3)
+    ax.tick_params(labelsize=8)
+    
+    plt.tight_layout()
+    show_figure("ranking_tiers")
+
+def create_distribution_plots(actualRankings, top_n=50):
+    """Compare distributions of top N vs bottom N players"""
+    
+    top_players = slice(None, top_n)
+    bottom_players = slice(-top_n, None)
+    
+    # REDUCED SIZE
+    fig, axes = plt.subplots(2, 3, figsize=(12, 8))  # Reduced from (18, 12)
+    fig.suptitle(f'Distribution Comparison: Top {top_n} vs Bottom {top_n} Players', fontsize=12)
+    
+    stats = [
+        ('serveStrength', 'Serve Strength'),
+        ('returnStrength', 'Return Strength'),
+        ('form', 'Form'),
+        ('injuryThreshold', 'Injury Threshold'),
+        ('injuryProbability', 'Injury Probability')
+    ]
+    
+    for i, (stat_attr, stat_name) in enumerate(stats):
+        row, col = i // 3, i % 3
+        
+        top_values = actualRankings.column(stat_attr, top_players)
+        bottom_values = actualRankings.column(stat_attr, bottom_players)
+        
+        axes[row, col].hist(top_values, alpha=0.7, label=f'Top {top_n}', bins=15, color='blue')
+        axes[row, col].hist(bottom_values, alpha=0.7, label=f'Bottom {top_n}', bins=15, color='red')
+        axes[row, col].set_title(stat_name, fontsize=10)
+        axes[row, col].set_xlabel(stat_name, fontsize=9)
+        axes[row, col].set_ylabel('Frequency', fontsize=9)
+        axes[row, col].legend(fontsize=8)
+        axes[row, col].grid(True, alpha=0.3)
+        axes[row, col].tick_params(labelsize=8)
+    
+    # Combined score distribution
+    top_combined = actualRankings.combined_score(top_players)
+    bottom_combined = actualRankings.combined_score(bottom_players)
+    
+    axes[1, 2].hist(top_combined, alpha=0.7, label=f'Top {top_n}', bins=15, color='blue')
+    axes[1, 2].hist(bottom_combined, alpha=0.7, label=f'Bottom {top_n}', bins=15, color='red')
+    axes[1, 2].set_title('Combined Score', fontsize=10)
+    axes[1, 2].set_xlabel('Combined Score', fontsize=9)
+    axes[1, 2].set_ylabel('Frequency', fontsize=9)
+    axes[1, 2].legend(fontsize=8)
+    axes[1, 2].grid(True, alpha=0.3)
+    axes[1, 2].tick_params(labelsize=8)
+    
+    plt.tight_layout()
+    show_figure("distributions")
+
+def create_serve_vs_return_scatter(actualRankings):
+    """Scatter plot of serve vs return strength colored by ranking"""
+    
+    serve_strength = actualRankings.column('serveStrength')
+    return_strength = actualRankings.column('returnStrength')
+    rankings = np.arange(len(actualRankings))
+    
+    # REDUCED SIZE
+    plt.figure(figsize=(8, 6))  # Reduced from (12, 8)
+    scatter = plt.scatter(serve_strength, return_strength, c=rankings, 
+                         cmap='viridis', alpha=0.7, s=50)
+    plt.colorbar(scatter, label='Ranking Position')
+    plt.xlabel('Serve Strength', fontsize=10)
+    plt.ylabel('Return Strength', fontsize=10)
+    plt.title('Serve Strength vs Return Strength (Colored by Ranking)', fontsize=12)
+    
+    # Add diagonal line to show balanced players
+    min_val = min(min(serve_strength), min(return_strength))
+    max_val = max(max(serve_strength), max(return_strength))
+    plt.plot([min_val, max_val], [min_val, max_val], 'r--', alpha=0.5, label='Balanced Line')
+    plt.legend(fontsize=9)
+    plt.grid(True, alpha=0.3)
+    plt.tick_params(labelsize=9)
+    plt.tight_layout()
+    show_figure("serve_vs_return")
+
+def create_rolling_average_plot(actualRankings, window_size=20):
+    """Create rolling average plots for smoother trend visualization"""
+    
+    def rolling_average(data, window):
+        # Centred window truncated at the ends, from cumulative sums of every column at once
+        cumulative = np.concatenate([np.zeros((1,) + data.shape[1:]), np.cumsum(data, axis=0)])
+        positions = np.arange(len(data))
+        low = np.maximum(0, positions - window//2)
+        high = np.minimum(len(data), positions + window//2 + 1)
+        return (cumulative[high] - cumulative[low]) / (high - low).reshape((-1,) + (1,) * (data.ndim - 1))
+    
+    serve_strength = actualRankings.column('serveStrength')
+    return_strength = actualRankings.column('returnStrength')
+    form = actualRankings.column('form')
+    
+    rolling = rolling_average(actualRankings.values, window_size)
+    serve_rolling = rolling[:, actualRankings.fieldIndex['serveStrength']]
+    return_rolling = rolling[:, actualRankings.fieldIndex['returnStrength']]
+    form_rolling = rolling[:, actualRankings.fieldIndex['form']]
+    
+    # REDUCED SIZE
+    plt.figure(figsize=(12, 8))  # Reduced from (15, 10)
+    
+    plt.subplot(2, 2, 1)
+    plt.plot(serve_strength, alpha=0.3, color='blue', label='Raw Data')
+    plt.plot(serve_rolling, color='blue', linewidth=2, label=f'Rolling Average (window={window_size})')
+    plt.title('Serve Strength by Ranking', fontsize=10)
+    plt.xlabel('Ranking Position', fontsize=9)
+    plt.ylabel('Serve Strength', fontsize=9)
+    plt.legend(fontsize=8)
+    plt.grid(True, alpha=0.3)
+    plt.tick_params(labelsize=8)
+    
+    plt.subplot(2, 2, 2)
+    plt.plot(return_strength, alpha=0.3, color='green', label='Raw Data')
+    plt.plot(return_rolling, color='green', linewidth=2, label=f'Rolling Average (window={window_size})')
+    plt.title('Return Strength by Ranking', fontsize=10)
+    plt.xlabel('Ranking Position', fontsize=9)
+    plt.ylabel('Return Strength', fontsize=9)
+    plt.legend(fontsize=8)
+    plt.grid(True, alpha=0.3)
+    plt.tick_params(labelsize=8)
+    
+    plt.subplot(2, 2, 3)
+    plt.plot(form, alpha=0.3, color='orange', label='Raw Data')
+    plt.plot(form_rolling, color='orange', linewidth=2, label=f'Rolling Average (window={window_size})')
+    plt.title('Form by Ranking', fontsize=10)
+    plt.xlabel('Ranking Position', fontsize=9)
+    plt.ylabel('Form', fontsize=9)
+    plt.legend(fontsize=8)
+    plt.grid(True, alpha=0.3)
+    plt.tick_params(labelsize=8)
+    
+    plt.subplot(2, 2, 4)
+    plt.plot(serve_rolling, label='Serve Strength', linewidth=2)
+    plt.plot(return_rolling, label='Return Strength', linewidth=2)
+    plt.plot(form_rolling, label='Form', linewidth=2)
+    plt.title('All Stats Comparison (Rolling Averages)', fontsize=10)
+    plt.xlabel('Ranking Position', fontsize=9)
+    plt.ylabel('Stat Value', fontsize=9)
+    plt.legend(fontsize=8)
+    plt.grid(True, alpha=0.3)
+    plt.tick_params(labelsize=8)
+    
+    plt.tight_layout()
+    show_figure("rolling_averages")
+
+def create_comprehensive_analysis(aggregator, method='average', q=None):
+    """
+    Create comprehensive analysis using aggregated data from all simulations
+    
+    Args:
+        aggregator: ReplicateAggregator that every simulation was streamed into
+        method: 'average', 'median' or 'quantile' for aggregation
+        q: The quantile for the 'quantile' method
+    """
+    print(f"\nCreating comprehensive analysis using {method} across all simulations...")
+    
+    # Create aggregated rankings
+    agg_predicted = create_aggregated_rankings(aggregator.predicted, method, q)
+    agg_actual = create_aggregated_rankings(aggregator.actual, method, q)
+    
+    # Run all visualization functions with aggregated data
+    print("1. Individual stats by ranking...")
+    visualize_individual_stats_by_ranking(agg_actual, f"({method.title()} across all simulations)")
+    
+    print("2. Ranking tier analysis...")
+    create_ranking_tier_analysis(agg_actual)
+    
+    print("5. Serve vs return scatter...")
+    create_serve_vs_return_scatter(agg_actual)
+    
+    print("6. Rolling average plot...")
+    create_rolling_average_plot(agg_actual)
+
+
+"""
+Simulation 2 plotting functions
+"""
+
+
+
+f"""
+Simulation 2 plotting functions
+"""
+
+
+
+def plot_strategy_ranking_distributions(strategy_results, title_suffix=""):
+    """Create box plots showing ranking distributions for each strategy"""
+    
+    # REDUCED SIZE
+    plt.figure(figsize=(8, 6))  # Reduced from (12, 8)
+    
+    strategies = strategy_results.strategies()
+    
+    # Boxes are drawn from the streamed rank histograms
+    box_plot = plt.gca().bxp([strategy_results.box_stats(strategy) for strategy in strategies], patch_artist=True)
+    
+    # Color the boxes differently
+    colors = ['lightblue', 'lightgreen', 'lightcoral', 'lightyellow', 'lightpink']
+    for patch, color in zip(box_plot['boxes'], colors[:len(strategies)]):
+        patch.set_facecolor(color)
+    
+    plt.title(f'Ranking Distribution by Strategy {title_suffix}', fontsize=12)
+    plt.xlabel('Strategy', fontsize=10)
+    plt.ylabel('Final Ranking Position', fontsize=10)
+    plt.xticks(rotation=45, fontsize=9)
+    plt.yticks(fontsize=9)
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    show_figure("strategy_ranking_distributions")
+
+def plot_strategy_performance_metrics(strategy_results, title_suffix=""):
+    """Create bar charts showing average ranking and other metrics for each strategy"""
+    
+    strategies = strategy_results.strategies()
+    avg_rankings = [strategy_results.mean(strategy) for strategy in strategies]
+    median_rankings = [strategy_results.quantile(strategy, 0.5) for strategy in strategies]
+    std_rankings = [strategy_results.std(strategy) for strategy in strategies]
+    
+    # REDUCED SIZE
+    fig, axes = plt.subplots(2, 2, figsize=(10, 8))  # Reduced from (15, 12)
+    fig.suptitle(f'Strategy Performance Metrics {title_suffix}', fontsize=12)
+    
+    # Average ranking (lower is better)
+    axes[0, 0].bar(strategies, avg_rankings, color='skyblue', alpha=0.7)
+    axes[0, 0].set_title('Average Ranking by Strategy', fontsize=10)
+    axes[0, 0].set_ylabel('Average Ranking', fontsize=9)
+    axes[0, 0].tick_params(axis='x', rotation=45, labelsize=8)
+    axes[0, 0].tick_params(axis='y', labelsize=8)
+    axes[0, 0].grid(True, alpha=0.3)
+    
+    # Median ranking (lower is better)
+    axes[0, 1].bar(strategies, median_rankings, color='lightgreen', alpha=0.7)
+    axes[0, 1].set_title('Median Ranking by Strategy', fontsize=10)
+    axes[0, 1].set_ylabel('Median Ranking', fontsize=9)
+    axes[0, 1].tick_params(axis='x', rotation=45, labelsize=8)
+    axes[0, 1].tick_params(axis='y', labelsize=8)
+    axes[0, 1].grid(True, alpha=0.3)
+    
+    # Standard deviation of rankings (consistency)
+    axes[1, 0].bar(strategies, std_rankings, color='lightcoral', alpha=0.7)
+    axes[1, 0].set_title('Ranking Consistency by Strategy\n(Lower = More Consistent)', fontsize=9)
+    axes[1, 0].set_ylabel('Standard Deviation of Rankings', fontsize=8)
+    axes[1, 0].tick_params(axis='x', rotation=45, labelsize=8)
+    axes[1, 0].tick_params(axis='y', labelsize=8)
+    axes[1, 0].grid(True, alpha=0.3)
+    
+    # Top 50 percentage
+    top_50_percentages = [strategy_results.fraction_within(strategy, 50) * 100 for strategy in strategies]
+    
+    axes[1, 1].bar(strategies, top_50_percentages, color='gold', alpha=0.7)
+    axes[1, 1].set_title('Percentage of Players in Top 50', fontsize=10)
+    axes[1, 1].set_ylabel('Percentage (%)', fontsize=9)
+    axes[1, 1].tick_params(axis='x', rotation=45, labelsize=8)
+    axes[1, 1].tick_params(axis='y', labelsize=8)
+    axes[1, 1].grid(True, alpha=0.3)
+    
+    plt.tight_layout()
+    show_figure("strategy_performance_metrics")
+
+def comprehensive_strategy_analysis(aggregator, title_suffix=""):
+    """
+    Run all strategy analysis functions
+    
+    Args:
+        aggregator: ReplicateAggregator that every simulation with different strategies was streamed into
+        title_suffix: Additional text for plot titles
+    """
+    
+    print("Analyzing strategy performance...")
+    strategy_results = aggregator.strategyRanks
+    
+    print("1. Creating ranking distribution plots...")
+    plot_strategy_ranking_distributions(strategy_results, title_suffix)
+    
+    print("2. Creating performance metrics...")
+    plot_strategy_performance_metrics(strategy_results, title_suffix)
+    
+    return strategy_results
@@ -0,0 +1,112 @@
+# Imports
+import numpy as np
+
+
+# Generator used by components that are not given one
+_defaultRng = None
+
+
+def get_default_rng():
+    """
+    Method:
+        Returns the process wide generator, creating it from fresh entropy on first use
+
+    Return:
+        rng (np.random.Generator)
+    """
+    global _defaultRng
+    if _defaultRng is None:
+        _defaultRng = np.random.default_rng()
+    return _defaultRng
+
+
+def resolve_rng(rng):
+    """
+    Method:
+        Returns the given generator, or the process wide one if None
+
+    Params:
+        rng (np.random.Generator | None)
+
+    Return:
+        rng (np.random.Generator)
+    """
+    return rng if rng is not None else get_default_rng()
+
+
+def as_seed_sequence(seed):
+    """
+    Method:
+        Converts a seed into a SeedSequence that substreams can be spawned from
+
+    Params:
+        seed (int | np.random.SeedSequence | None): None draws fresh entropy
+
+    Return:
+        seedSequence (np.random.SeedSequence)
+    """
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
+
+
+def copy_seed_sequence(seedSequence):
+    """
+    Method:
+        Copies a SeedSequence as it was before anything was spawned from it, so the
+        copy spawns the same children again. Used to replay the same random streams.
+
+    Params:
+        seedSequence (np.random.SeedSequence)
+
+    Return:
+        seedSequence (np.random.SeedSequence)
+    """
+    return np.random.SeedSequence(seedSequence.entropy, spawn_key=seedSequence.spawn_key, pool_size=seedSequence.pool_size)
+
+
+def spawn_generators(seedSequence, count, antithetic=False):
+    """
+    Method:
+        Spawns independent generators from a SeedSequence
+
+    Params:
+        seedSequence (np.random.SeedSequence): The parent sequence
+        count (int): The number of generators
+        antithetic (bool): Whether to mirror the uniform draws of every generator
+
+    Return:
+        generators (List(np.random.Generator | AntitheticGenerator))
+    """
+    generators = [np.random.default_rng(child) for child in seedSequence.spawn(count)]
+    if antithetic:
+        return [AntitheticGenerator(generator) for generator in generators]
+    return generators
+
+
+class AntitheticGenerator:
+    def __init__(self, generator):
+        """
+        Method:
+            init method for AntitheticGenerator class. Wraps a generator so that every
+            uniform draw u becomes 1 - u and every integer draw is mirrored within its
+            range. Paired with a run on the unwrapped generator this gives antithetic
+            draws: outcomes decided by a uniform falling below a probability are
+            negatively correlated between the two runs. Other draws are passed through.
+
+        Params:
+            generator (np.random.Generator): The generator to mirror
+        """
+        self.generator = generator
+
+    def random(self, size=None):
+        return 1 - self.generator.random(size)
+
+    def integers(self, low, high=None, size=None):
+        values = self.generator.integers(low, high, size)
+        if high is None:
+            low, high = 0, low
+        return low + high - 1 - values
+
+    def __getattr__(self, name):
+        return getattr(self.generator, name)
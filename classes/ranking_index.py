@@ -0,0 +1,202 @@
+# Imports
+import bisect
+
+
+class FenwickTree:
+    def __init__(self, counts):
+        """
+        Method:
+            init method for FenwickTree class. Holds a list of counts so that a count
+            can be changed and the sum of any leading counts found in O(log n).
+
+        Params:
+            counts (List(int)): The initial counts
+        """
+        self.tree = [0] + list(counts)
+        for i in range(1, len(self.tree)):
+            parent = i + (i & -i)
+            if parent < len(self.tree):
+                self.tree[parent] += self.tree[i]
+
+    def add(self, index, amount):
+        """
+        Method:
+            Adds an amount to one count
+
+        Params:
+            index (int): Position of the count
+            amount (int)
+        """
+        i = index + 1
+        while i < len(self.tree):
+            self.tree[i] += amount
+            i += i & -i
+
+    def prefix_sum(self, index):
+        """
+        Method:
+            Sums the counts before a position
+
+        Params:
+            index (int): Position to sum up to, excluding it
+
+        Return:
+            total (int)
+        """
+        total = 0
+        i = index
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+
+class RankingIndex:
+    def __init__(self, ids, points, bucketSize=128):
+        """
+        Method:
+            init method for RankingIndex class. Keeps player ids ordered by ranking
+            points in a bucketed sorted array so a points update only moves one
+            entry instead of re-sorting the field. Ties are ranked by who reached
+            the points total first, and the initial order breaks ties on creation.
+
+        Params:
+            ids (List(int)): Player ids in their current ranking order
+            points (List(int)): Ranking points of each player, in the same order
+            bucketSize (int): Target number of entries per bucket
+        """
+        self.bucketSize = bucketSize
+
+        # Sequence number of each insertion, used to break ties between equal points
+        self.sequence = 0
+        self.keys = {}
+
+        entries = []
+        for playerId, playerPoints in zip(ids, points):
+            key = (-playerPoints, self.sequence, playerId)
+            self.keys[playerId] = key
+            entries.append(key)
+            self.sequence += 1
+        entries.sort()
+
+        # Sorted buckets along with the last key of each bucket for searching
+        self.buckets = [entries[i : i + bucketSize] for i in range(0, len(entries), bucketSize)] or [[]]
+        self.maxes = [bucket[-1] if bucket else None for bucket in self.buckets]
+
+        # Size of each bucket, so the entries ahead of a bucket are counted in O(log n)
+        self.counts = FenwickTree(len(bucket) for bucket in self.buckets)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def find_bucket(self, key):
+        """
+        Method:
+            Finds the bucket a key belongs in with a binary search over the bucket maxes
+
+        Params:
+            key (tuple): A ranking key
+
+        Return:
+            bucketIndex (int)
+        """
+        if self.maxes[0] is None:
+            return 0
+        return min(bisect.bisect_left(self.maxes, key), len(self.buckets) - 1)
+
+    def insert(self, key):
+        """
+        Method:
+            Inserts a key, splitting its bucket when it grows too large
+
+        Params:
+            key (tuple): A ranking key
+        """
+        bucketIndex = self.find_bucket(key)
+        bucket = self.buckets[bucketIndex]
+        bisect.insort(bucket, key)
+        self.maxes[bucketIndex] = bucket[-1]
+        self.counts.add(bucketIndex, 1)
+
+        # Splitting shifts the later buckets, so the counts are rebuilt, once every bucketSize inserts at most
+        if len(bucket) > 2 * self.bucketSize:
+            self.buckets[bucketIndex : bucketIndex + 1] = [bucket[: self.bucketSize], bucket[self.bucketSize :]]
+            self.maxes[bucketIndex : bucketIndex + 1] = [bucket[self.bucketSize - 1], bucket[-1]]
+            self.counts = FenwickTree(len(bucket) for bucket in self.buckets)
+
+    def remove(self, key):
+        """
+        Method:
+            Removes a key, dropping its bucket if it becomes empty
+
+        Params:
+            key (tuple): A ranking key
+        """
+        bucketIndex = self.find_bucket(key)
+        bucket = self.buckets[bucketIndex]
+        del bucket[bisect.bisect_left(bucket, key)]
+        self.counts.add(bucketIndex, -1)
+
+        if bucket:
+            self.maxes[bucketIndex] = bucket[-1]
+        elif len(self.buckets) > 1:
+            # Dropping a bucket shifts the later ones, so the counts are rebuilt
+            del self.buckets[bucketIndex]
+            del self.maxes[bucketIndex]
+            self.counts = FenwickTree(len(bucket) for bucket in self.buckets)
+        else:
+            self.maxes[0] = None
+
+    def update(self, playerId, points):
+        """
+        Method:
+            Moves a player to their new points total
+
+        Params:
+            playerId (int)
+            points (int): The player's new ranking points
+        """
+        oldKey = self.keys[playerId]
+        if -oldKey[0] == points:
+            return None
+
+        self.remove(oldKey)
+        key = (-points, self.sequence, playerId)
+        self.sequence += 1
+        self.keys[playerId] = key
+        self.insert(key)
+
+    def rank(self, playerId):
+        """
+        Method:
+            Fetches a player's current ranking (1 is the best) in O(log n)
+
+        Params:
+            playerId (int)
+
+        Return:
+            ranking (int)
+        """
+        key = self.keys[playerId]
+        bucketIndex = self.find_bucket(key)
+        ahead = self.counts.prefix_sum(bucketIndex)
+        return ahead + bisect.bisect_left(self.buckets[bucketIndex], key) + 1
+
+    def top(self, count=None):
+        """
+        Method:
+            Returns player ids in ranking order
+
+        Params:
+            count (int): Optional number of leading ids to return, all if None
+
+        Return:
+            ids (List(int))
+        """
+        ids = []
+        for bucket in self.buckets:
+            for key in bucket:
+                if count is not None and len(ids) == count:
+                    return ids
+                ids.append(key[2])
+        return ids
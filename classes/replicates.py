@@ -0,0 +1,331 @@
+# Imports
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from season import Season
+from player import Player, PlayerPool
+from random_streams import resolve_rng, as_seed_sequence
+from strategies.big_event_focus import BigEventFocus
+from strategies.injury_avoider import InjuryAvoider
+from strategies.original import Original
+from strategies.play_everything import PlayEverything
+from strategies.ranking_based import RankingBased
+
+
+def init_players(numPlayers, rng=None):
+    # Create lists of first names and last names
+    first_names = [
+    "Liam", "Noah", "Oliver", "Elijah", "James", "William", "Benjamin", "Lucas",
+    "Henry", "Alexander", "Daniel", "Matthew", "Jack", "Sebastian", "Logan",
+    "Michael", "Ethan", "Jacob", "Mason", "David", "Samuel", "Joseph", "John",
+    "Owen", "Luke", "Gabriel", "Anthony", "Isaac", "Dylan", "Andrew" ]
+
+    last_names = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller",
+    "Davis", "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez",
+    "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+    "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark",
+    "Ramirez", "Lewis", "Robinson" ]
+
+    # Initiating empty list to store player objects, with their state held in one pool
+    players = []
+    nameDict = {}
+    pool = PlayerPool(numPlayers)
+
+    rng = resolve_rng(rng)
+
+    # Number of distinct first and last name pairs
+    numNames = len(first_names) * len(last_names)
+
+    # Creating players with different random stats
+    for i in range(numPlayers):
+
+        # Once every pair is used, names are numbered so that large fields stay unique
+        if i >= numNames:
+            pair = i % numNames
+            playerName = f'{first_names[pair // len(last_names)]} {last_names[pair % len(last_names)]} {i // numNames + 1}'
+            players.append(Player(playerName, pool, rng))
+            continue
+
+        # Make sure that player name is unique
+        while True:
+            playerName = f'{first_names[rng.integers(len(first_names))]} {last_names[rng.integers(len(last_names))]}'
+
+            if playerName not in nameDict:
+                players.append(Player(playerName, pool, rng))
+                nameDict[playerName] = 0
+                break
+
+    return players
+
+
+def assign_strategies(players, original=False, offset=0):
+    if original == True:
+        # Strategies hold no per player state so one instance is shared, letting the season batch its decisions
+        original = Original()
+        for player in players:
+            player.set_strategy(original)
+    else:
+        # Strategies, with offset shifting the rotation so the same players can be given other strategies
+        strategies = [BigEventFocus(), InjuryAvoider(), Original(), PlayEverything(), RankingBased()]
+
+        i = offset % len(strategies)
+        for player in players:
+            player.set_strategy(strategies[i])
+
+            if i == 4:
+                i = 0
+            else:
+                i += 1
+
+
+def configure_strategies(players, parameters=None):
+    """
+    Method:
+        Sets parameters on the strategies the players follow
+
+    Params:
+        players (List(Player))
+        parameters (dict): Maps strategy class names to the parameters to set on them
+    """
+    if not parameters:
+        return None
+
+    strategies = {id(player.strategy): player.strategy for player in players}
+    for strategy in strategies.values():
+        strategyParameters = parameters.get(type(strategy).__name__)
+        if strategyParameters:
+            strategy.set_parameters(strategyParameters)
+
+
+def predicted_strength(player):
+    """
+    Method:
+        Strength used to predict the rankings before the season is played
+
+    Params:
+        player (Player)
+
+    Return:
+        strength (float)
+    """
+    return (player.serveStrength + player.returnStrength)*player.form*player.injuryThreshold*(1-player.injuryProbability)
+
+
+class PlayerRecord:
+    __slots__ = ("name", "strategyName", "serveStrength", "returnStrength", "form", "injuryThreshold", "injuryProbability", "rankingPoints")
+
+    def __init__(self, result, index):
+        """
+        Method:
+            init method for PlayerRecord class. A read only stand in for a Player
+            built from one row of a SeasonResult, so the analysis code can keep
+            reading player attributes.
+
+        Params:
+            result (SeasonResult): The season the player played in
+            index (int): The player's row in the result
+        """
+        self.name = result.names[index]
+        self.strategyName = result.strategyNames[index]
+        for field in SeasonResult.FIELDS:
+            setattr(self, field, result.stats[field].item(index))
+
+
+class SeasonResult:
+    # Player attributes kept from each season
+    FIELDS = ("serveStrength", "returnStrength", "form", "injuryThreshold", "injuryProbability", "rankingPoints")
+
+    # Tournaments entered, by tier
+    ENTRY_FIELDS = ("entriesGrandSlam", "entriesMaster1000", "entriesATP500", "entriesATP250")
+
+    # Every numeric column of stats
+    COLUMNS = FIELDS + ENTRY_FIELDS
+
+    def __init__(self, rankings, predictedRankings, entryCounts=None):
+        """
+        Method:
+            init method for SeasonResult class. Compact, picklable summary of a
+            season: one array per player attribute in final ranking order, along
+            with the predicted ranking order as row indexes.
+
+        Params:
+            rankings (List(Player)): The players in final ranking order
+            predictedRankings (List(Player)): The players in predicted ranking order
+            entryCounts (dict): Maps each tournament tier to entries in ranking order, zeros if None
+        """
+        self.names = [player.name for player in rankings]
+        self.strategyNames = [type(player.strategy).__name__ for player in rankings]
+        self.stats = {field: np.array([getattr(player, field) for player in rankings]) for field in self.FIELDS}
+        for field in self.ENTRY_FIELDS:
+            tier = field[len("entries"):]
+            self.stats[field] = entryCounts[tier] if entryCounts is not None else np.zeros(len(rankings), dtype=np.int64)
+
+        row = {player: i for i, player in enumerate(rankings)}
+        self.predictedOrder = np.array([row[player] for player in predictedRankings], dtype=int)
+
+    @classmethod
+    def from_columns(cls, names, strategyNames, stats, predictedRanks):
+        """
+        Method:
+            Rebuilds a result from stored columns, with every row in final ranking order
+
+        Params:
+            names (List(str)): Player names
+            strategyNames (List(str)): Player strategy names
+            stats (dict): Maps each column to its values
+            predictedRanks (np.ndarray): Each player's predicted ranking, starting at 1
+
+        Return:
+            result (SeasonResult)
+        """
+        result = cls.__new__(cls)
+        result.names = list(names)
+        result.strategyNames = list(strategyNames)
+        result.stats = {column: np.asarray(stats[column]) for column in cls.COLUMNS}
+        result.predictedOrder = np.argsort(predictedRanks, kind="stable")
+        return result
+
+    def actual_rankings(self):
+        """
+        Method:
+            Rebuilds the final rankings as player records
+
+        Return:
+            rankings (List(PlayerRecord))
+        """
+        return [PlayerRecord(self, i) for i in range(len(self.names))]
+
+    def predicted_rankings(self):
+        """
+        Method:
+            Rebuilds the predicted rankings as player records
+
+        Return:
+            rankings (List(PlayerRecord))
+        """
+        return [PlayerRecord(self, i) for i in self.predictedOrder]
+
+
+def simulate_replicate(task):
+    """
+    Method:
+        Simulates one independent season. The players and the season draw from
+        streams spawned from the replicate's own seed, so results do not depend
+        on the worker
+
+    Params:
+        task (tuple): (numPlayers, original, seedSequence)
+
+    Return:
+        result (SeasonResult)
+    """
+    numPlayers, original, seedSequence = task
+    return play_season(numPlayers, original, seedSequence)
+
+
+def play_season(numPlayers, original, seedSequence, parameters=None):
+    """
+    Method:
+        Creates a field of players, gives them their strategies and plays a season
+
+    Params:
+        numPlayers (int): The number of players in the season
+        original (bool): Whether every player uses the original strategy
+        seedSequence (np.random.SeedSequence): Seed of the players and the season
+        parameters (dict): Maps strategy class names to the parameters to set on them, see TournamentStrategy.set_parameters
+
+    Return:
+        result (SeasonResult)
+    """
+    playerSeed, seasonSeed = seedSequence.spawn(2)
+
+    # Create new players
+    players = init_players(numPlayers, np.random.default_rng(playerSeed))
+    assign_strategies(players, original)
+    configure_strategies(players, parameters)
+
+    # Predicted rankings are taken before the season is played
+    predictedRankings = sorted(players, key=predicted_strength, reverse=True)
+
+    # Simulate season
+    season = Season(players, seasonSeed)
+    season.simulate_season()
+
+    return SeasonResult(season.rankings, predictedRankings, season.get_entry_counts(season.rankings))
+
+
+def iter_replicates(numReplicates, numPlayers=200, original=False, workers=None, seed=None, executor=None):
+    """
+    Method:
+        Simulates independent seasons across a pool of worker processes and
+        yields their results in replicate order as they complete, so callers
+        can fold them into aggregates without holding every result
+
+    Params:
+        numReplicates (int): The number of seasons to simulate
+        numPlayers (int): The number of players in each season
+        original (bool): Whether every player uses the original strategy
+        workers (int): Number of worker processes, every core if None and in process if 1
+        seed (int | np.random.SeedSequence): Root seed for the whole run, fresh entropy if None.
+                                             Spawning continues from a SeedSequence that has
+                                             already been spawned from, so calls in batches
+                                             give the same seasons as one call for all of them
+        executor (ProcessPoolExecutor): Pool to run on instead of starting one for this call
+
+    Yield:
+        result (SeasonResult)
+    """
+    seedSequences = as_seed_sequence(seed).spawn(numReplicates)
+    tasks = [(numPlayers, original, seedSequence) for seedSequence in seedSequences]
+    yield from map_replicates(simulate_replicate, tasks, workers, executor)
+
+
+def map_replicates(function, tasks, workers=None, executor=None):
+    """
+    Method:
+        Runs a replicate function over its tasks across a pool of worker processes,
+        yielding the results in the order of the tasks
+
+    Params:
+        function (function): Module level function taking one task, so it can be pickled
+        tasks (List): One task per replicate
+        workers (int): Number of worker processes, every core if None and in process if 1
+        executor (ProcessPoolExecutor): Pool to run on instead of starting one for this call
+
+    Yield:
+        result
+    """
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(tasks) // (4 * workers))
+    if executor is not None:
+        yield from executor.map(function, tasks, chunksize=chunksize)
+        return None
+
+    if workers == 1:
+        for task in tasks:
+            yield function(task)
+        return None
+
+    # Map keeps the results in the order of the tasks
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(function, tasks, chunksize=chunksize)
+
+
+def run_replicates(numReplicates, numPlayers=200, original=False, workers=None, seed=None):
+    """
+    Method:
+        Simulates independent seasons across a pool of worker processes and
+        returns their results in replicate order
+
+    Params:
+        numReplicates (int): The number of seasons to simulate
+        numPlayers (int): The number of players in each season
+        original (bool): Whether every player uses the original strategy
+        workers (int): Number of worker processes, every core if None and in process if 1
+        seed (int | np.random.SeedSequence): Root seed for the whole run, fresh entropy if None
+
+    Return:
+        results (List(SeasonResult))
+    """
+    return list(iter_replicates(numReplicates, numPlayers, original, workers, seed))
@@ -0,0 +1,273 @@
+# Imports
+import json
+import os
+import numpy as np
+from replicates import SeasonResult
+from aggregators import ReplicateAggregator
+
+# Parquet chunks are optional and only used when pyarrow is installed
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+class ResultsStore:
+    # Columns written for every player season, besides the SeasonResult columns
+    KEY_COLUMNS = {
+        "replicate": np.int64,
+        "rank": np.int32,
+        "predictedRank": np.int32,
+        "name": np.int32,
+        "strategy": np.int16,
+    }
+
+    # Names and strategies are stored as codes into these lists
+    CATEGORIES = ("name", "strategy")
+
+    def __init__(self, path, format=None):
+        """
+        Method:
+            init method for ResultsStore class. An append only columnar store of
+            replicate results in a directory. Rows are player seasons in final
+            ranking order, written in chunks that always hold whole replicates,
+            either as one .npy file per column or as one Parquet file.
+
+        Params:
+            path (str): The directory of the store, created if it does not exist
+            format (str): "npy" or "parquet" for a new store, Parquet if pyarrow is available when None
+        """
+        self.path = path
+        self.metadataPath = os.path.join(path, "metadata.json")
+
+        if os.path.exists(self.metadataPath):
+            with open(self.metadataPath) as file:
+                self.metadata = json.load(file)
+            if format is not None and format != self.metadata["format"]:
+                raise ValueError(f"Store at {path} uses the {self.metadata['format']} format, not {format}")
+        else:
+            if format is None:
+                format = "parquet" if pyarrow is not None else "npy"
+            if format == "parquet" and pyarrow is None:
+                raise ImportError("pyarrow is required for the parquet format")
+
+            self.metadata = {
+                "format": format,
+                "columns": {column: np.dtype(dtype).str for column, dtype in self.get_column_types().items()},
+                "categories": {category: [] for category in self.CATEGORIES},
+                "chunks": [],
+                "numReplicates": 0,
+            }
+
+        self.format = self.metadata["format"]
+        self.codes = {category: {value: code for code, value in enumerate(values)} for category, values in self.metadata["categories"].items()}
+
+    @classmethod
+    def get_column_types(cls):
+        """
+        Method:
+            Returns the type of every stored column
+
+        Return:
+            columnTypes (dict)
+        """
+        columnTypes = dict(cls.KEY_COLUMNS)
+        for column in SeasonResult.FIELDS:
+            columnTypes[column] = np.float64
+        for column in SeasonResult.ENTRY_FIELDS:
+            columnTypes[column] = np.int32
+        return columnTypes
+
+    @property
+    def numReplicates(self):
+        return self.metadata["numReplicates"]
+
+    def save_metadata(self):
+        """
+        Method:
+            Writes the metadata atomically, so a crash mid write leaves the previous chunks readable
+        """
+        temporaryPath = self.metadataPath + ".tmp"
+        with open(temporaryPath, "w") as file:
+            json.dump(self.metadata, file)
+        os.replace(temporaryPath, self.metadataPath)
+
+    def encode(self, category, values):
+        """
+        Method:
+            Converts names or strategies into integer codes, adding any new ones
+
+        Params:
+            category (str): "name" or "strategy"
+            values (List(str))
+
+        Return:
+            codes (np.ndarray)
+        """
+        codes = self.codes[category]
+        for value in values:
+            if value not in codes:
+                codes[value] = len(codes)
+                self.metadata["categories"][category].append(value)
+        return np.array([codes[value] for value in values], dtype=self.KEY_COLUMNS[category])
+
+    def writer(self, chunkRows=1_000_000):
+        """
+        Method:
+            Opens a writer that appends to the store
+
+        Params:
+            chunkRows (int): Rows buffered before a chunk is written
+
+        Return:
+            writer (ResultsWriter)
+        """
+        return ResultsWriter(self, chunkRows)
+
+    def iter_chunks(self):
+        """
+        Method:
+            Yields the columns of every chunk. The npy format memory maps each
+            column so only the parts that are used are read from disk.
+
+        Yield:
+            columns (dict): Maps each column name to its array
+        """
+        for chunk in self.metadata["chunks"]:
+            chunkPath = os.path.join(self.path, chunk)
+            if self.format == "parquet":
+                table = pyarrow.parquet.read_table(chunkPath)
+                yield {column: table.column(column).to_numpy() for column in table.column_names}
+            else:
+                yield {column: np.load(os.path.join(chunkPath, f"{column}.npy"), mmap_mode="r") for column in self.metadata["columns"]}
+
+    def iter_results(self):
+        """
+        Method:
+            Yields every stored replicate, in the order they were written
+
+        Yield:
+            result (SeasonResult)
+        """
+        names = self.metadata["categories"]["name"]
+        strategies = self.metadata["categories"]["strategy"]
+
+        for columns in self.iter_chunks():
+            # Rows of a replicate are contiguous, so split at the changes in replicate
+            replicates = np.asarray(columns["replicate"])
+            boundaries = np.flatnonzero(np.diff(replicates)) + 1
+            for start, end in zip(np.concatenate([[0], boundaries]), np.concatenate([boundaries, [len(replicates)]])):
+                yield SeasonResult.from_columns(
+                    [names[code] for code in columns["name"][start:end]],
+                    [strategies[code] for code in columns["strategy"][start:end]],
+                    {column: columns[column][start:end] for column in SeasonResult.COLUMNS},
+                    np.asarray(columns["predictedRank"][start:end]),
+                )
+
+    def aggregate(self, aggregator=None, keepArray=False):
+        """
+        Method:
+            Streams every stored replicate into an aggregator
+
+        Params:
+            aggregator (ReplicateAggregator): Aggregator to add to, one sized to the stored seasons if None
+            keepArray (bool): Whether a new aggregator keeps every replicate for exact quantiles
+
+        Return:
+            aggregator (ReplicateAggregator)
+        """
+        for result in self.iter_results():
+            if aggregator is None:
+                aggregator = ReplicateAggregator(len(result.names), keepArray=keepArray)
+            aggregator.update(result)
+        return aggregator
+
+
+class ResultsWriter:
+    def __init__(self, store, chunkRows):
+        """
+        Method:
+            init method for ResultsWriter class. Buffers whole replicates and
+            writes them to the store as chunks. Use as a context manager so the
+            last partial chunk is written.
+
+        Params:
+            store (ResultsStore): The store to append to
+            chunkRows (int): Rows buffered before a chunk is written
+        """
+        self.store = store
+        self.chunkRows = chunkRows
+        self.buffer = []
+        self.bufferedRows = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(self, result):
+        """
+        Method:
+            Adds one replicate
+
+        Params:
+            result (SeasonResult)
+        """
+        store = self.store
+        numPlayers = len(result.names)
+
+        predictedRanks = np.empty(numPlayers, dtype=np.int32)
+        predictedRanks[result.predictedOrder] = np.arange(1, numPlayers + 1)
+
+        columns = {
+            "replicate": np.full(numPlayers, store.metadata["numReplicates"]),
+            "rank": np.arange(1, numPlayers + 1),
+            "predictedRank": predictedRanks,
+            "name": store.encode("name", result.names),
+            "strategy": store.encode("strategy", result.strategyNames),
+        }
+        columns.update(result.stats)
+
+        self.buffer.append(columns)
+        self.bufferedRows += numPlayers
+        store.metadata["numReplicates"] += 1
+
+        if self.bufferedRows >= self.chunkRows:
+            self.flush()
+
+    def flush(self):
+        """
+        Method:
+            Writes the buffered replicates as a new chunk and records it in the metadata
+        """
+        if not self.buffer:
+            return None
+
+        store = self.store
+        columns = {
+            column: np.concatenate([replicate[column] for replicate in self.buffer]).astype(dtype)
+            for column, dtype in store.metadata["columns"].items()
+        }
+
+        chunk = f"chunk_{len(store.metadata['chunks']):06d}"
+        os.makedirs(store.path, exist_ok=True)
+        if store.format == "parquet":
+            chunk += ".parquet"
+            pyarrow.parquet.write_table(pyarrow.table(columns), os.path.join(store.path, chunk))
+        else:
+            chunkPath = os.path.join(store.path, chunk)
+            os.makedirs(chunkPath, exist_ok=True)
+            for column, values in columns.items():
+                np.save(os.path.join(chunkPath, f"{column}.npy"), values)
+
+        # The chunk only becomes part of the store once the metadata lists it
+        store.metadata["chunks"].append(chunk)
+        store.save_metadata()
+
+        self.buffer = []
+        self.bufferedRows = 0
+
+    def close(self):
+        self.flush()
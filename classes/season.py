@@ -1,89 +1,264 @@
 # Imports
-import random
+import numpy as np
 from tournament import GrandSlam, Master1000, ATP500, ATP250
+from win_matrix import WinMatrix
+from player import get_shared_pool, gather_attribute, rest_players
+from ranking_index import RankingIndex
+from random_streams import as_seed_sequence, spawn_generators
+from instrumentation import Instrumentation
+from contextlib import nullcontext
+import bisect
 import math
 
+
+class FieldStats:
+    # Win probability thresholds for each expected round bucket, and the rounds themselves
+    WIN_PROBABILITY_THRESHOLDS = [0.1, 0.3, 0.45, 0.6, 0.75, 0.85, 0.95]
+    EXPECTED_ROUNDS = [0.5, 1.0, 1.5, 2.0, 3.0, 4.0, 5.0, 6.0]
+
+    # ATP point structure by round reached
+    ROUNDS_TO_POINTS = {
+        "GrandSlam": [10, 45, 90, 180, 360, 720, 1200, 2000],
+        "Master1000": [10, 25, 50, 100, 200, 400, 600, 1000],
+        "ATP500": [0, 20, 45, 90, 180, 300, 500, 500],
+        "ATP250": [0, 8, 15, 30, 60, 120, 250, 250]
+    }
+
+    def __init__(self, rankings, pool=None):
+        """
+        Method:
+            init method for FieldStats class. Derived statistics of the field that only
+            change when the rankings do, so they are computed once and shared by every
+            strategy decision until the season next updates its rankings.
+
+        Params:
+            rankings (List(Player)) - The players sorted by ranking
+            pool (PlayerPool) - The pool holding the players' state, if they share one
+        """
+        self.totalPlayers = len(rankings)
+        self.pool = pool
+
+        # Average skill of the top 128 players
+        field = rankings[:128]
+        if pool is not None:
+            ids = [p.id for p in field]
+            self.avgOpponentSkill = (pool.serveStrength[ids] + pool.returnStrength[ids]).sum() / len(field)
+        else:
+            self.avgOpponentSkill = sum(p.serveStrength + p.returnStrength for p in field) / len(field)
+
+        # Normalized ranking of every player, by pool id or by player
+        if pool is not None:
+            self.normalizedRankings = (self.totalPlayers - pool.ranking[: pool.size] + 1) / self.totalPlayers
+        else:
+            self.normalizedRankings = {p: (self.totalPlayers - p.ranking + 1) / self.totalPlayers for p in rankings}
+
+        # Expected points for each expected round bucket, per tournament tier
+        self.pointTables = {tier: [self.interpolate_points(points, expectedRound) for expectedRound in self.EXPECTED_ROUNDS] for tier, points in self.ROUNDS_TO_POINTS.items()}
+
+    @staticmethod
+    def interpolate_points(points_array, expected_round_reached):
+        """
+        Method:
+            Interpolates between rounds for more granular expected points
+
+        Params:
+            points_array (List(int)) - Points for each round reached
+            expected_round_reached (float) - The expected round reached
+
+        Return:
+            expectedPoints (float)
+        """
+        base_round = int(expected_round_reached)
+        fraction = expected_round_reached - base_round
+        base_round = min(base_round, len(points_array) - 1)
+
+        if fraction > 0 and base_round < len(points_array) - 1:
+            return points_array[base_round] * (1 - fraction) + points_array[base_round + 1] * fraction
+        return points_array[base_round]
+
+    def get_normalized_ranking(self, player):
+        """
+        Method:
+            Fetches a player's normalized ranking
+
+        Params:
+            player (Player) - The target player
+
+        Return:
+            normalizedRanking (float)
+        """
+        if self.pool is not None:
+            return self.normalizedRankings.item(player.id)
+        return self.normalizedRankings[player]
+
+    def get_normalized_rankings(self, players):
+        """
+        Method:
+            Vectorised get_normalized_ranking for a list of players
+
+        Params:
+            players (List(Player))
+
+        Return:
+            normalizedRankings (np.ndarray)
+        """
+        if self.pool is not None:
+            return self.normalizedRankings[[player.id for player in players]]
+        return np.array([self.normalizedRankings[player] for player in players])
+
+
 class Season:
-    def __init__(self, players):
+    # Max amount of matches for each slam
+    MAX_MATCHES = {
+        "GrandSlam" : 7,
+        "Master1000" : 6,
+        "ATP500" : 5,
+        "ATP250" : 5
+    }
+
+    def __init__(self, players, seed=None, instrument=False, antithetic=False):
         """
         Method:
             init method for season class
         
         Params:
             players (List(players)) - The players that will be competing in this season
+            seed (int | np.random.SeedSequence) - Root of the season's random streams, fresh entropy if None
+            instrument (bool) - Whether to count and time the hot paths while the season is simulated
+            antithetic (bool) - Whether to mirror every uniform draw, for the antithetic partner of a season with the same seed
         """
+        # Independent random streams are spawned from here for every week and tournament
+        self.seedSequence = as_seed_sequence(seed)
+        self.antithetic = antithetic
+
         # Initialise tournament schedule
         self.init_tournaments()
         
         # To properly simulate the skill disparity start all competitors at the same ranking
         self.rankings = players
 
+        # Array backed state of the field when every player shares a pool
+        self.pool = get_shared_pool(players)
+
+        # Derived statistics of the field, rebuilt after the rankings change
+        self.fieldStats = None
+
+        # Number of tournaments of each tier every player entered, by their index in players
+        self.playerIndex = {player: i for i, player in enumerate(players)}
+        self.entryCounts = {tier: np.zeros(len(players), dtype=np.int64) for tier in FieldStats.ROUNDS_TO_POINTS}
+
+        # Ranking index kept up to date as points are awarded, so rankings never need a full sort
+        self.rankingIndex = None
+        if self.pool is not None:
+            self.playerById = {player.id: player for player in players}
+            self.rankingIndex = RankingIndex([player.id for player in players], [player.rankingPoints for player in players])
+
+        # Counters and timers, only installed while simulate_season runs
+        self.instrumentation = Instrumentation() if instrument else None
+
 
     def simulate_season(self):
         """
         Method:
             Simulate the season
         """
+        with self.instrumentation or nullcontext():
+            self.simulate_weeks()
+
+    def simulate_weeks(self):
+        """
+        Method:
+            Simulates every week of the schedule in order
+        """
         # Iterate through each week
-        for week in self.tournamentSchedule:
+        for weekIndex, (week, weekSeed) in enumerate(zip(self.tournamentSchedule, self.seedSequence.spawn(len(self.tournamentSchedule)))):
+            if self.instrumentation is not None:
+                self.instrumentation.start_week(weekIndex)
+
+            # One generator per tournament and one for the players resting this week
+            tournamentRngs = spawn_generators(weekSeed, len(week) + 1, self.antithetic)
     
-            # Update rankings
-            self.rankings = sorted(self.rankings, key=lambda player: player.rankingPoints, reverse=True)
-            
-            # Update ranking for each player
-            for idx, player in enumerate(self.rankings):
-                player.ranking = idx + 1
+            # Update rankings and ranking attribute for player
+            self.update_rankings()
+
+            # Pairwise win probabilities over the whole field for each match format played this week,
+            # computed lazily so only the pairs that meet are evaluated
+            winMatrices = {setFormat: WinMatrix(self.rankings, setFormat) for setFormat in {self.get_set_format(tournament) for tournament in week}}
 
             # Players not playing this week
             restingPlayers = []
-            
+
             rankingsIndex = 0
             # Iterate through each tournament in the week
-            for tournament in week:
+            for tournament, tournamentRng in zip(week, tournamentRngs):
                 # Adding set format to tournaments
-                if tournament.type == "GrandSlam":
-                    tournament.add_set_format(3)
-                else:
-                    tournament.add_set_format(2)
-                
-                # Create empty list for tournament registry
-                entrants = []
-                
-                # Iterate through players
-                while len(entrants) < tournament.drawSize and rankingsIndex < len(self.rankings):
-                    # Grabbing next player to consider for entry
-                    player = self.rankings[rankingsIndex]
-                    
-                    # Game Theory decision of whether this particular player should play the tournament
-                    shouldPlay = player.strategy.should_play_tournament(player, tournament, self)
-                    
-                    # If the player should then register them
-                    if shouldPlay:
-                        entrants.append(player)
-                    # If they shouldn't let them rest for this week
-                    else:
-                        restingPlayers.append(player)
-                    
-                    rankingsIndex += 1
+                tournament.add_set_format(self.get_set_format(tournament))
+
+                # Game Theory decision of whether each remaining player should play the tournament
+                candidates = self.rankings[rankingsIndex:]
+                shouldPlay = self.get_entry_mask(candidates, tournament)
+
+                # Players are registered in ranking order until the draw is full
+                entryPositions = np.flatnonzero(shouldPlay)[: tournament.drawSize]
+                considered = entryPositions[-1] + 1 if len(entryPositions) == tournament.drawSize else len(candidates)
+                entrants = [candidates[i] for i in entryPositions]
+
+                # Players that were considered and declined rest for this week
+                restingPlayers += [candidates[i] for i in np.flatnonzero(~shouldPlay[:considered])]
+                rankingsIndex += considered
                 
                 # Simulate the tournament
-                tournament.generate_draw(entrants)
+                # Entrants were taken from the rankings in order so they are already sorted
+                self.entryCounts[tournament.type][[self.playerIndex[player] for player in entrants]] += 1
+
+                tournament.winMatrix = winMatrices[tournament.setFormat]
+                tournament.rankingIndex = self.rankingIndex
+                tournament.generate_draw(entrants, presorted=True, rng=tournamentRng)
                 tournament.simulate_tournament()
             
-            # Handling injuries
-            for player in restingPlayers:
-                # Randomly treat injury if the player is injured
-                if player.isInjured and random.random() <= 0.5:
-                    player.isInjured = False
-            
-                # Increase fitness level
-                player.update_fitness(-0.5)
+            # Handling injuries and fitness for everyone that rested this week
+            rest_players(restingPlayers, tournamentRngs[-1])
                 
             # Update rankings and ranking attribute for player
-            self.rankings = sorted(self.rankings, key=lambda player: player.rankingPoints, reverse=True)
-            for idx,player in enumerate(self.rankings):
-                player.ranking = idx + 1
-      
+            self.update_rankings()
+
+    @staticmethod
+    def get_set_format(tournament):
+        return 5 if tournament.type == "GrandSlam" else 3
+
+    def update_rankings(self):
+        """
+        Method:
+            Orders the players by ranking points and updates each player's ranking,
+            reading the order off the ranking index when the players share a pool
+            and sorting them otherwise
+        """
+        # Field statistics depend on the rankings
+        self.fieldStats = None
+
+        if self.pool is None:
+            self.sort_rankings()
+        else:
+            self.read_rankings()
+
+    def sort_rankings(self):
+        """
+        Method:
+            Sorts players that are not in a pool by ranking points and numbers them
+        """
+        self.rankings = sorted(self.rankings, key=lambda player: player.rankingPoints, reverse=True)
+        for idx, player in enumerate(self.rankings):
+            player.ranking = idx + 1
+
+    def read_rankings(self):
+        """
+        Method:
+            Reads the order of pooled players straight off the ranking index and numbers them
+        """
+        ids = self.rankingIndex.top()
+        self.rankings = [self.playerById[playerId] for playerId in ids]
+        self.pool.ranking[ids] = np.arange(1, len(ids) + 1)
+
     def init_tournaments(self):
         """
         Method:
@@ -214,7 +389,87 @@ class Season:
     HELPER FUNCTIONS
     ----------------
     """
+
+    def get_instrumentation_report(self):
+        """
+        Method:
+            Returns the counts and times recorded while the season was simulated
+
+        Return:
+            report (dict) - Events in total, per tournament tier and per week, None if the season was not instrumented
+        """
+        if self.instrumentation is None:
+            return None
+        return self.instrumentation.summary()
+
+    def get_field_stats(self):
+        """
+        Method:
+            Returns the cached field statistics, building them if the rankings have changed
+
+        Return:
+            fieldStats (FieldStats)
+        """
+        if self.fieldStats is None:
+            self.fieldStats = FieldStats(self.rankings, self.pool)
+        return self.fieldStats
     
+    def get_entry_counts(self, players):
+        """
+        Method:
+            Fetches how many tournaments of each tier the given players entered
+
+        Params:
+            players (List(Player)) - The target players
+
+        Return:
+            entryCounts (dict) - Maps each tournament tier to an array of entries, one per player
+        """
+        indexes = [self.playerIndex[player] for player in players]
+        return {tier: counts[indexes] for tier, counts in self.entryCounts.items()}
+
+    def get_entry_mask(self, players, tournament):
+        """
+        Method:
+            Evaluates every player's strategy for a tournament, batching the players
+            that share a strategy object into one call
+
+        Params:
+            players (List(Player)) - The players to consider
+            tournament (Tournament) - The target tournament
+
+        Return:
+            shouldPlay (np.ndarray) - Boolean mask over players
+        """
+        shouldPlay = np.zeros(len(players), dtype=bool)
+
+        # Group players by the strategy object they follow
+        groups = {}
+        for i, player in enumerate(players):
+            groups.setdefault(id(player.strategy), (player.strategy, []))[1].append(i)
+
+        for strategy, indexes in groups.values():
+            shouldPlay[indexes] = strategy.should_play_batch([players[i] for i in indexes], tournament, self)
+
+        return shouldPlay
+
+    def get_injury_proximity_batch(self, players):
+        """
+        Method:
+            Calculates how close each player is to their injury threshold
+
+        Params:
+            players (List(Player)) - The target players
+
+        Return:
+            injuryProximity (np.ndarray)
+        """
+        injuryRisk = gather_attribute(players, "injuryRisk").astype(float)
+        injuryThreshold = gather_attribute(players, "injuryThreshold").astype(float)
+
+        # Players without a positive threshold have no proximity
+        return np.divide(injuryRisk, injuryThreshold, out=np.zeros(len(players)), where=injuryThreshold > 0)
+
     def get_tournament_risk(self, tournament, player):
         """
         Method:
@@ -247,6 +502,24 @@ class Season:
         return adjustedRisk
 
 
+    def get_tournament_risk_batch(self, tournament, players):
+        """
+        Method:
+            Vectorised get_tournament_risk for a list of players
+
+        Params:
+            tournament (Tournament) - The target tournament
+            players (List(Player)) - The target players
+
+        Return:
+            adjustedRisk (np.ndarray)
+        """
+        baseRisk = self.get_expected_matches_batch(players, tournament) * tournament.matchRisk
+        proximityMultiplier = 1.0 + (self.get_injury_proximity_batch(players) ** 2) * 0.5
+        fitnessMultiplier = 2.0 - gather_attribute(players, "fitness")
+        return baseRisk * proximityMultiplier * fitnessMultiplier
+
+
     def get_skill_based_expected_points(self, player, tournament):
         """
         Method:
@@ -263,14 +536,11 @@ class Season:
         # Get player's total skill
         player_skill = (player.serveStrength + player.returnStrength)*player.form
         
-        # Estimate average opponent skill
-        if len(self.rankings) >= 128:
-            avg_opponent_skill = sum(p.serveStrength + p.returnStrength for p in self.rankings[:128]) / 128
-        else:
-            avg_opponent_skill = sum(p.serveStrength + p.returnStrength for p in self.rankings) / len(self.rankings)
+        # Average opponent skill from the cached field statistics
+        fieldStats = self.get_field_stats()
         
         # Skill difference affects win probability
-        skill_diff = player_skill - avg_opponent_skill
+        skill_diff = player_skill - fieldStats.avgOpponentSkill
         
         # Skill differences of 10-20 points should matter
         base_win_prob = 1 / (1 + math.exp(-skill_diff / 15))
@@ -278,47 +548,32 @@ class Season:
         # Adjust for fitness
         win_prob = base_win_prob * max(0.7, player.fitness) 
         
-        # Calculate expected performance
-        if win_prob < 0.1:
-            expected_round_reached = 0.5  
-        elif win_prob < 0.3:
-            expected_round_reached = 1.0  
-        elif win_prob < 0.45:
-            expected_round_reached = 1.5  
-        elif win_prob < 0.6:
-            expected_round_reached = 2.0  
-        elif win_prob < 0.75:
-            expected_round_reached = 3.0  
-        elif win_prob < 0.85:
-            expected_round_reached = 4.0  
-        elif win_prob < 0.95:
-            expected_round_reached = 5.0  
-        else:
-            expected_round_reached = 6.0  
-        
-        # Convert to points using ATP point structure
-        rounds_to_points = {
-            "GrandSlam": [10, 45, 90, 180, 360, 720, 1200, 2000],
-            "Master1000": [10, 25, 50, 100, 200, 400, 600, 1000],
-            "ATP500": [0, 20, 45, 90, 180, 300, 500, 500],
-            "ATP250": [0, 8, 15, 30, 60, 120, 250, 250]
-        }
-        
-        # Interpolate between rounds for more granular expected points
-        base_round = int(expected_round_reached)
-        fraction = expected_round_reached - base_round
-        
-        points_array = rounds_to_points[tournament.type]
-        base_round = min(base_round, len(points_array) - 1)
-        
-        if fraction > 0 and base_round < len(points_array) - 1:
-            expected_points = points_array[base_round] * (1 - fraction) + points_array[base_round + 1] * fraction
-        else:
-            expected_points = points_array[base_round]
-        
-        return expected_points
+        # Look up the expected points for the expected round reached
+        bucket = bisect.bisect_right(FieldStats.WIN_PROBABILITY_THRESHOLDS, win_prob)
+        return fieldStats.pointTables[tournament.type][bucket]
 
     
+    def get_skill_based_expected_points_batch(self, players, tournament):
+        """
+        Method:
+            Vectorised get_skill_based_expected_points for a list of players
+
+        Params:
+            players (List(Player)) - The target players
+            tournament (Tournament) - The target tournament
+
+        Return:
+            expectedPoints (np.ndarray)
+        """
+        playerSkill = (gather_attribute(players, "serveStrength") + gather_attribute(players, "returnStrength")) * gather_attribute(players, "form")
+
+        fieldStats = self.get_field_stats()
+        baseWinProb = 1 / (1 + np.exp(-(playerSkill - fieldStats.avgOpponentSkill) / 15))
+        winProb = baseWinProb * np.maximum(0.7, gather_attribute(players, "fitness"))
+
+        buckets = np.searchsorted(FieldStats.WIN_PROBABILITY_THRESHOLDS, winProb, side="right")
+        return np.asarray(fieldStats.pointTables[tournament.type], dtype=float)[buckets]
+
     def get_expected_matches(self, player, tournament, fitnessWeight=0.5, rankingWeight=0.6):
         """
         Method:
@@ -334,13 +589,7 @@ class Season:
             expectedMatches (float) - The number of matches the player is expected to play
         """
         # Max amount of matches for each slam
-        maxMatches = {
-            "GrandSlam" : 7,
-            "Master1000" : 6,
-            "ATP500" : 5,
-            "ATP250" : 5
-        }
-        maxMatches = maxMatches[tournament.type]
+        maxMatches = self.MAX_MATCHES[tournament.type]
         
         # Normalize the players ranking
         normalizedRanking = self.normalize_ranking(player, self.rankings)
@@ -356,6 +605,26 @@ class Season:
         expectedMatches = score * maxMatches * injury_penalty
         return expectedMatches
     
+    def get_expected_matches_batch(self, players, tournament, fitnessWeight=0.5, rankingWeight=0.6):
+        """
+        Method:
+            Vectorised get_expected_matches for a list of players
+
+        Params:
+            players (List(Player)) - Target players
+            tournament (Tournament) - Target tournament
+            fitnessWeight (float) - The weight that fitness plays in the calculation
+            rankingWeight (float) - The weight that ranking plays in the calculation
+
+        Return:
+            expectedMatches (np.ndarray)
+        """
+        maxMatches = self.MAX_MATCHES[tournament.type]
+        normalizedRankings = self.get_field_stats().get_normalized_rankings(players)
+        score = (gather_attribute(players, "fitness") * fitnessWeight) + (normalizedRankings * rankingWeight)
+        injuryPenalty = np.maximum(0.7, 1.0 - self.get_injury_proximity_batch(players) * 0.3)
+        return score * maxMatches * injuryPenalty
+
     def normalize_ranking(self, player, rankings):
         """
         Method:
@@ -368,6 +637,10 @@ class Season:
         Returns:
             float - Normalized ranking score
         """
+        # The season's own rankings are cached in the field statistics
+        if rankings is self.rankings:
+            return self.get_field_stats().get_normalized_ranking(player)
+
         total_players = len(rankings)
         
         # Convert ranking to normalized score
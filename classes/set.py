@@ -1,9 +1,183 @@
 # Imports
+import functools
+import numpy as np
 from game import Game
-from tiebreak import Tiebreak
+from tiebreak import Tiebreak, get_tiebreak_distribution, get_tiebreak_win_probabilities
+from hold_table import get_hold_table
+from alias_table import AliasTable
+from random_streams import resolve_rng
+
+
+class SetDistribution:
+    def __init__(self, serverHold, returnerHold, tiebreakWin):
+        """
+        Method:
+            init method for SetDistribution class. Computes the exact distribution
+            over final set scores from the starting server's perspective, along with
+            who serves first in the following set.
+
+        Params:
+            serverHold (float):   Probability the starting server holds serve
+            returnerHold (float): Probability the starting returner holds serve
+            tiebreakWin (float):  Probability the starting server wins a 6-6 tiebreak
+        """
+        # Probability of reaching each game score (server games, returner games)
+        reach = np.zeros((8, 8))
+        reach[0, 0] = 1.0
+
+        self.scores = []
+        probabilities = []
+
+        for total in range(12):
+            for serverScore in range(max(0, total - 6), min(total, 6) + 1):
+                returnerScore = total - serverScore
+                probability = reach[serverScore, returnerScore]
+
+                # Skip scores where the set is already over
+                if probability == 0 or self.is_finished(serverScore, returnerScore):
+                    continue
+
+                # Starting server serves the even numbered games
+                gameWin = serverHold if total % 2 == 0 else 1 - returnerHold
+
+                reach[serverScore + 1, returnerScore] += probability * gameWin
+                reach[serverScore, returnerScore + 1] += probability * (1 - gameWin)
+
+        # Collect the final scores
+        for serverScore in range(8):
+            for returnerScore in range(8):
+                if reach[serverScore, returnerScore] > 0 and self.is_finished(serverScore, returnerScore):
+                    self.scores.append((serverScore, returnerScore))
+                    probabilities.append(reach[serverScore, returnerScore])
+
+        # 6-6 is decided by the tiebreak
+        self.scores += [(7, 6), (6, 7)]
+        probabilities += [reach[6, 6] * tiebreakWin, reach[6, 6] * (1 - tiebreakWin)]
+
+        self.probabilities = np.array(probabilities)
+        self.winProbability = sum(p for (a, b), p in zip(self.scores, probabilities) if a > b)
+
+        # Starting server serves first in the next set when an even number of games was played
+        self.serverServesNext = [(a + b) % 2 == 0 for a, b in self.scores]
+
+        self.aliasTable = AliasTable(self.probabilities)
+
+    @staticmethod
+    def is_finished(serverScore, returnerScore):
+        """
+        Method:
+            Checks whether a game score ends the set (6-6 goes to a tiebreak)
+
+        Params:
+            serverScore (int):   Games won by the starting server
+            returnerScore (int): Games won by the starting returner
+
+        Return:
+            finished (bool)
+        """
+        high, low = max(serverScore, returnerScore), min(serverScore, returnerScore)
+        return (high == 6 and low <= 4) or (high == 7 and low == 5)
+
+    def sample(self, rng=None):
+        """
+        Method:
+            Samples a final set score with a single uniform draw
+
+        Params:
+            rng (np.random.Generator): Generator to draw from, the process wide one if None
+
+        Return:
+            score (tuple(int)): Starting server's games followed by the starting returner's games
+            serverServesNext (bool): Whether the starting server serves first in the next set
+        """
+        index = self.aliasTable.sample(rng=rng)
+        return self.scores[index], self.serverServesNext[index]
+
+
+@functools.lru_cache(maxsize=65536)
+def get_set_distribution(serverHold, returnerHold, tiebreakWin):
+    """
+    Method:
+        Returns the (cached) set score distribution for the given probabilities
+
+    Params:
+        serverHold (float):   Probability the starting server holds serve
+        returnerHold (float): Probability the starting returner holds serve
+        tiebreakWin (float):  Probability the starting server wins a 6-6 tiebreak
+
+    Return:
+        distribution (SetDistribution)
+    """
+    return SetDistribution(serverHold, returnerHold, tiebreakWin)
+
+
+def get_point_set_distribution(serverPoint, returnerPoint):
+    """
+    Method:
+        Returns the set score distribution for a pair of point probabilities
+
+    Params:
+        serverPoint (float):   Probability the starting server wins a point on their serve
+        returnerPoint (float): Probability the starting returner wins a point on their serve
+
+    Return:
+        distribution (SetDistribution)
+    """
+    holdTable = get_hold_table()
+    return get_set_distribution(
+        holdTable.lookup(serverPoint),
+        holdTable.lookup(returnerPoint),
+        get_tiebreak_distribution(serverPoint, returnerPoint).winProbability,
+    )
+
+
+def get_set_outcome_probabilities(serverPoint, returnerPoint):
+    """
+    Method:
+        Vectorised set outcomes for arrays of point probabilities. Outcomes are
+        split by whether the starting server wins the set and whether they serve
+        first in the next set.
+
+    Params:
+        serverPoint (np.ndarray):   Probabilities the starting server wins a point on their serve
+        returnerPoint (np.ndarray): Probabilities the starting returner wins a point on their serve
+
+    Return:
+        outcomes (dict): Maps (serverWinsSet, serverServesNext) to an array of probabilities
+    """
+    holdTable = get_hold_table()
+    serverHold = holdTable.lookup_array(serverPoint)
+    breakChance = 1 - holdTable.lookup_array(returnerPoint)
+    tiebreakWin = get_tiebreak_win_probabilities(serverPoint, returnerPoint)
+
+    outcomes = {key: np.zeros_like(serverHold) for key in [(True, True), (True, False), (False, True), (False, False)]}
+    reach = {(0, 0): np.ones_like(serverHold)}
+
+    for total in range(12):
+        for serverScore in range(max(0, total - 6), min(total, 6) + 1):
+            returnerScore = total - serverScore
+            probability = reach.pop((serverScore, returnerScore), None)
+            if probability is None:
+                continue
+
+            # Starting server serves the even numbered games
+            won = probability * (serverHold if total % 2 == 0 else breakChance)
+
+            for nextScore, moved in (((serverScore + 1, returnerScore), won), ((serverScore, returnerScore + 1), probability - won)):
+                if SetDistribution.is_finished(*nextScore):
+                    outcomes[(nextScore[0] > nextScore[1], (total + 1) % 2 == 0)] += moved
+                else:
+                    reach[nextScore] = reach[nextScore] + moved if nextScore in reach else moved
+
+    # 6-6 is decided by the tiebreak, after which the starting returner serves
+    outcomes[(True, False)] += reach[(6, 6)] * tiebreakWin
+    outcomes[(False, False)] += reach[(6, 6)] * (1 - tiebreakWin)
+
+    return outcomes
+
 
 class Set:
-    def __init__(self, startingServer, startingReturner):
+    def __init__(self, startingServer, startingReturner, method="engine", rng=None):
         """
         Method:
             init method for set class, playerList will be used to determine
@@ -13,9 +187,14 @@ class Set:
         Params:
             startingServer (Player): The player that starts serving in the match
             startingReturner (Player): The player that starts returning in the match
+            method (str): "engine" to sample the whole set from its score distribution
+                          or "games" to play the set game by game
+            rng (np.random.Generator): Generator to draw from, the process wide one if None
         """
         self.server = startingServer
         self.returner = startingReturner
+        self.method = method
+        self.rng = resolve_rng(rng)
         self.score = [0, 0]
         self.winner = None
 
@@ -27,13 +206,16 @@ class Set:
         Return:
             nextServer (tuple(Player)): the player that serves next idx 0 & returner at idx 1
         """
+        if self.method == "engine":
+            return self.simulate_engine()
+
         # Initiating game list
         self.gameList = []
 
         # Simulating the set
         while self.winner == None:
             # Creating game object
-            game = Game(self.server, self.returner)
+            game = Game(self.server, self.returner, rng=self.rng)
 
             # Simulate the game
             game.simulate_game()
@@ -45,37 +227,61 @@ class Set:
             else:
                 self.score[1] += 1
 
-            # If the set has a game score that wins at 6 games
-            if max(self.score) == 6 and (self.score != (6, 6) or self.score != (6, 5) or self.score != (5,6)):
+            # If the set has a game score that wins at 6 games or 7-5 select winner appropriately
+            if SetDistribution.is_finished(self.score[0], self.score[1]):
                 # Updating the set win for the right player
-                if self.score[0] == 6:
+                if self.score[0] > self.score[1]:
                     self.winner = self.server
                 else:
                     self.winner = self.returner
 
-            # If the game score is 7-5 we should select winner appropriatly
-            elif self.score == (7, 5):
-                self.winner = self.server
-            elif self.score == (5, 7):
-                self.winner = self.returner 
-
             # If it is a tiebreak simulate accordingly
-            elif self.score == (6, 6):
+            elif self.score == [6, 6]:
+                # The tiebreak is the 13th game so it is started by the next server
+                self.server, self.returner = self.returner, self.server
+
                 # Simulate tiebreak
-                tiebreak = Tiebreak(self.server, self.returner)
+                tiebreak = Tiebreak(self.server, self.returner, rng=self.rng)
                 tiebreak.simulate_tiebreak()
-                
+
                 # Update winner and score
                 if tiebreak.winner == self.server:
                     self.score[0] += 1
                 else:
                     self.score[1] += 1
-                
+
                 self.winner = tiebreak.winner
 
             # swap server and return and update score to match
             self.server, self.returner = self.returner, self.server
-            
+
             self.score = [self.score[1], self.score[0]]
-                
+
+        return (self.server, self.returner)
+
+    def simulate_engine(self):
+        """
+        Method:
+            Simulates the set with one draw from the exact set score distribution.
+            As with the game by game path the score is left from the perspective of
+            the player that serves next.
+
+        Return:
+            nextServer (tuple(Player)): the player that serves next idx 0 & returner at idx 1
+        """
+        distribution = get_point_set_distribution(
+            Tiebreak.get_point_probability(self.server, self.returner),
+            Tiebreak.get_point_probability(self.returner, self.server),
+        )
+        (serverGames, returnerGames), serverServesNext = distribution.sample(self.rng)
+
+        self.winner = self.server if serverGames > returnerGames else self.returner
+
+        # Hand the serve over and orient the score to the next server
+        if serverServesNext:
+            self.score = [serverGames, returnerGames]
+        else:
+            self.server, self.returner = self.returner, self.server
+            self.score = [returnerGames, serverGames]
+
         return (self.server, self.returner)
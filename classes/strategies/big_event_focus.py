@@ -1,13 +1,23 @@
+import numpy as np
 from .tournament_strategy import TournamentStrategy
+from player import gather_attribute
 
 class BigEventFocus(TournamentStrategy):
+    # Players below this fitness do not play
+    MIN_FITNESS = 0.15
+
     def __init__(self):
         super().__init__("Big Event Focus")
 
     def should_play_tournament(self, player, tournament, season):
         # Skip if injured or unfit
-        if player.isInjured or player.fitness < 0.15:
+        if player.isInjured or player.fitness < self.MIN_FITNESS:
             return False
 
         # Only play Grand Slams and Masters 1000
-        return tournament.type in ["GrandSlam", "Master1000"]
\ No newline at end of file
+        return tournament.type in ["GrandSlam", "Master1000"]
+
+    def should_play_batch(self, players, tournament, season):
+        if tournament.type not in ["GrandSlam", "Master1000"]:
+            return np.zeros(len(players), dtype=bool)
+        return ~gather_attribute(players, "isInjured") & (gather_attribute(players, "fitness") >= self.MIN_FITNESS)
@@ -1,8 +1,32 @@
+import numpy as np
 from .tournament_strategy import TournamentStrategy
+from player import gather_attribute
 
 
 class InjuryAvoider(TournamentStrategy):
     """Strategy: Heavy focus on avoiding injury, very conservative"""
+    # Tournament importance consideration
+    IMPORTANCE = {
+        "GrandSlam": 10,
+        "Master1000": 7,
+        "ATP500": 4,
+        "ATP250": 2
+    }
+
+    # Conservative threshold
+    THRESHOLD = {
+        "GrandSlam": 50,
+        "Master1000": 30,
+        "ATP500": 20,
+        "ATP250": 15
+    }
+
+    # Tournament risk above which every tournament but a Grand Slam is skipped
+    MAX_TOURNAMENT_RISK = 0.1
+
+    # Injury proximity above which Grand Slams are skipped, slightly less conservative than injury_threshold
+    GRAND_SLAM_MAX_PROXIMITY = 0.4
+
     def __init__(self, injury_threshold=0.2, fitness_threshold=0.6):
         super().__init__("Injury Avoider")
         self.injury_threshold = injury_threshold
@@ -24,31 +48,36 @@ class InjuryAvoider(TournamentStrategy):
         tournament_risk = season.get_tournament_risk(tournament, player)
         
         # Skip high-risk tournaments unless it's a Grand Slam
-        if tournament_risk > 0.1 and tournament.type != "GrandSlam":
+        if tournament_risk > self.MAX_TOURNAMENT_RISK and tournament.type != "GrandSlam":
             return False
         
         # For Grand Slams, be slightly less conservative
-        if tournament.type == "GrandSlam" and injury_proximity > 0.4:
+        if tournament.type == "GrandSlam" and injury_proximity > self.GRAND_SLAM_MAX_PROXIMITY:
             return False
         
-        # Tournament importance consideration
-        importance = {
-            "GrandSlam": 10,
-            "Master1000": 7,
-            "ATP500": 4,
-            "ATP250": 2
-        }
-        
         # Only play if expected value is high enough given risk
         expected_points = season.get_skill_based_expected_points(player, tournament)
-        risk_adjusted_value = expected_points * importance[tournament.type] * (1 - tournament_risk)
-        
-        # Conservative threshold
-        threshold = {
-            "GrandSlam": 50,
-            "Master1000": 30,
-            "ATP500": 20,
-            "ATP250": 15
-        }
+        risk_adjusted_value = expected_points * self.IMPORTANCE[tournament.type] * (1 - tournament_risk)
         
-        return risk_adjusted_value > threshold[tournament.type]
+        return risk_adjusted_value > self.THRESHOLD[tournament.type]
+
+    def should_play_batch(self, players, tournament, season):
+        # Skip if injured or low fitness
+        shouldPlay = ~gather_attribute(players, "isInjured") & (gather_attribute(players, "fitness") >= self.fitness_threshold)
+
+        # Very conservative - skip if injury risk is elevated
+        injury_proximity = season.get_injury_proximity_batch(players)
+        shouldPlay &= injury_proximity <= self.injury_threshold
+
+        # Skip high-risk tournaments unless it's a Grand Slam, where proximity is checked instead
+        tournament_risk = season.get_tournament_risk_batch(tournament, players)
+        if tournament.type == "GrandSlam":
+            shouldPlay &= injury_proximity <= self.GRAND_SLAM_MAX_PROXIMITY
+        else:
+            shouldPlay &= tournament_risk <= self.MAX_TOURNAMENT_RISK
+
+        # Only play if expected value is high enough given risk
+        expected_points = season.get_skill_based_expected_points_batch(players, tournament)
+        risk_adjusted_value = expected_points * self.IMPORTANCE[tournament.type] * (1 - tournament_risk)
+
+        return shouldPlay & (risk_adjusted_value > self.THRESHOLD[tournament.type])
@@ -1,36 +1,86 @@
+import numpy as np
 from .tournament_strategy import TournamentStrategy
+from player import gather_attribute
 
 
 class Original(TournamentStrategy):
     """The original sophisticated strategy from the Season class"""
+    # Define the importance and/or prestige of each tournament type
+    IMPORTANCE = {
+        "GrandSlam": 10,
+        "Master1000": 7,
+        "ATP500": 4,
+        "ATP250": 2
+    }
+
+    # Define tournament importance, this will be what the payoff function checks against
+    BASE_THRESHOLD = {
+        "GrandSlam": 1,  
+        "Master1000": 2,
+        "ATP500": 3,
+        "ATP250": 4
+    }
+
+    # Players below this fitness do not play, and fitness below the floor is penalised no further
+    MIN_FITNESS = 0.15
+    FITNESS_FLOOR = 0.5
+
+    # Rankings below which players feel pressure to play, and the bonus added to their payoff, from the lowest
+    PRESSURE_RANKING = {"low": 100, "mid": 50}
+    PRESSURE_BONUS = {"low": 0.3, "mid": 0.1}
+
+    # Injury proximities above which the payoff is scaled down, and the multipliers applied, from the closest
+    PENALTY_PROXIMITY = {"severe": 0.7, "high": 0.5, "moderate": 0.3}
+    PENALTY_MULTIPLIER = {"severe": 0.05, "high": 0.1, "moderate": 0.2}
+
+    # Injury proximities above which the threshold is raised, and the factors applied, from the closest
+    CAUTION_PROXIMITY = {"high": 0.6, "moderate": 0.4}
+    CAUTION_FACTOR = {"high": 1.5, "moderate": 1.2}
+
+    # Injury proximity below which Grand Slams keep their base threshold
+    GRAND_SLAM_MAX_PROXIMITY = 0.8
+
+    # Tournament risk above which the cost of an injury is counted, and the value of the events it would cost
+    INJURY_COST_RISK = 0.05
+    FUTURE_TOURNAMENT_VALUE = 100
+
     def __init__(self):
         super().__init__("Original Strategy")
 
+    @staticmethod
+    def get_tiered(values, limits, amounts, default):
+        """
+        Method:
+            Picks the amount of the first tier whose limit a value is above, for one
+            player or an array of players. Tiers are checked in the order of limits.
+
+        Params:
+            values (float | np.ndarray)
+            limits (dict) - Maps each tier to its limit
+            amounts (dict) - Maps each tier to its amount
+            default (float) - The amount when no limit is passed
+
+        Return:
+            amounts (float | np.ndarray)
+        """
+        amount = np.select([values > limits[tier] for tier in limits], [amounts[tier] for tier in limits], default=default)
+        return amount if amount.ndim else amount.item()
+
     def should_play_tournament(self, player, tournament, season):
         # If the player is too unfit to play return False
-        if player.fitness < 0.15 or player.isInjured:
+        if player.fitness < self.MIN_FITNESS or player.isInjured:
             return False
 
         # Fitness penalty
-        fitnessMultiplier = max(0.5, player.fitness)
+        fitnessMultiplier = max(self.FITNESS_FLOOR, player.fitness)
 
-        # Define the importance and/or prestige of each tournament type
-        importance = {
-            "GrandSlam": 10,
-            "Master1000": 7,
-            "ATP500": 4,
-            "ATP250": 2
-        }
+        importance = self.IMPORTANCE
 
         # Get expected points for the tournament based on the skill level of the player
         xPoints = season.get_skill_based_expected_points(player, tournament)
         
         # Ranking Pressure
-        rankingMultiplier = 1
-        if player.ranking > 100:
-            rankingMultiplier += 0.3
-        elif player.ranking > 50:
-            rankingMultiplier += 0.1
+        rankingMultiplier = 1 + self.get_tiered(player.ranking, self.PRESSURE_RANKING, self.PRESSURE_BONUS, 0)
 
         # Injury Risk Consideration
         injuryRisk = season.get_tournament_risk(tournament, player)
@@ -39,40 +89,63 @@ class Original(TournamentStrategy):
         injury_proximity = player.injuryRisk / player.injuryThreshold if player.injuryThreshold > 0 else 0
         
         # Injury risk penalty - higher penalty as we get closer to injury threshold
-        injury_risk_multiplier = 1.0
-        if injury_proximity > 0.7: 
-            injury_risk_multiplier = 0.05
-        elif injury_proximity > 0.5:  
-            injury_risk_multiplier = 0.1
-        elif injury_proximity > 0.3:  
-            injury_risk_multiplier = 0.2
+        injury_risk_multiplier = self.get_tiered(injury_proximity, self.PENALTY_PROXIMITY, self.PENALTY_MULTIPLIER, 1.0)
         
         # If we expect to get injured, what's the cost of missing future tournaments?
         expected_injury_cost = 0
-        if injuryRisk > 0.05:
-            future_tournament_value = importance[tournament.type] * 100  
+        if injuryRisk > self.INJURY_COST_RISK:
+            future_tournament_value = importance[tournament.type] * self.FUTURE_TOURNAMENT_VALUE
             expected_injury_cost = injuryRisk * future_tournament_value
         
         # Calculate payoff score 
         payoffScore = (xPoints * importance[tournament.type] * rankingMultiplier * fitnessMultiplier * injury_risk_multiplier) - expected_injury_cost
 
-        # Define tournament importance, this will be what the payoff function checks against
-        base_threshold = {
-            "GrandSlam": 1,  
-            "Master1000": 2,
-            "ATP500": 3,
-            "ATP250": 4
-        }
+        base_threshold = self.BASE_THRESHOLD
         
         # Increase threshold if injury risk is high
-        threshold = base_threshold[tournament.type]
-        if injury_proximity > 0.6:
-            threshold *= 1.5  
-        elif injury_proximity > 0.4:
-            threshold *= 1.2  
+        threshold = base_threshold[tournament.type] * self.get_tiered(injury_proximity, self.CAUTION_PROXIMITY, self.CAUTION_FACTOR, 1.0)
         
         # Special case: Grand Slams are so important that players might risk injury
-        if tournament.type == "GrandSlam" and injury_proximity < 0.8:
+        if tournament.type == "GrandSlam" and injury_proximity < self.GRAND_SLAM_MAX_PROXIMITY:
             threshold = base_threshold[tournament.type] 
         
-        return abs(payoffScore) > threshold
\ No newline at end of file
+        return abs(payoffScore) > threshold
+
+    def should_play_batch(self, players, tournament, season):
+        # Players too unfit to play are masked out at the end
+        fitness = gather_attribute(players, "fitness")
+        ableToPlay = (fitness >= self.MIN_FITNESS) & ~gather_attribute(players, "isInjured")
+
+        # Fitness penalty
+        fitnessMultiplier = np.maximum(self.FITNESS_FLOOR, fitness)
+
+        # Get expected points for the tournament based on the skill level of the player
+        xPoints = season.get_skill_based_expected_points_batch(players, tournament)
+
+        # Ranking Pressure
+        ranking = gather_attribute(players, "ranking")
+        rankingMultiplier = 1 + self.get_tiered(ranking, self.PRESSURE_RANKING, self.PRESSURE_BONUS, 0)
+
+        # Injury Risk Consideration
+        injuryRisk = season.get_tournament_risk_batch(tournament, players)
+        injury_proximity = season.get_injury_proximity_batch(players)
+
+        # Injury risk penalty - higher penalty as we get closer to injury threshold
+        injury_risk_multiplier = self.get_tiered(injury_proximity, self.PENALTY_PROXIMITY, self.PENALTY_MULTIPLIER, 1.0)
+
+        # If we expect to get injured, what's the cost of missing future tournaments?
+        future_tournament_value = self.IMPORTANCE[tournament.type] * self.FUTURE_TOURNAMENT_VALUE
+        expected_injury_cost = np.where(injuryRisk > self.INJURY_COST_RISK, injuryRisk * future_tournament_value, 0)
+
+        # Calculate payoff score
+        payoffScore = (xPoints * self.IMPORTANCE[tournament.type] * rankingMultiplier * fitnessMultiplier * injury_risk_multiplier) - expected_injury_cost
+
+        # Increase threshold if injury risk is high
+        base = self.BASE_THRESHOLD[tournament.type]
+        threshold = base * self.get_tiered(injury_proximity, self.CAUTION_PROXIMITY, self.CAUTION_FACTOR, 1.0)
+
+        # Special case: Grand Slams are so important that players might risk injury
+        if tournament.type == "GrandSlam":
+            threshold = np.where(injury_proximity < self.GRAND_SLAM_MAX_PROXIMITY, base, threshold)
+
+        return ableToPlay & (np.abs(payoffScore) > threshold)
@@ -1,11 +1,18 @@
 from .tournament_strategy import TournamentStrategy
+from player import gather_attribute
 
 class PlayEverything(TournamentStrategy):
+    # Players below this fitness do not play
+    MIN_FITNESS = 0.1
+
     def __init__(self):
         super().__init__("Play Everything")
     
     def should_play_tournament(self, player, tournament, season):
         # Only skip if injured or critically unfit
-        if player.isInjured or player.fitness < 0.1:
+        if player.isInjured or player.fitness < self.MIN_FITNESS:
             return False
-        return True
\ No newline at end of file
+        return True
+
+    def should_play_batch(self, players, tournament, season):
+        return ~gather_attribute(players, "isInjured") & (gather_attribute(players, "fitness") >= self.MIN_FITNESS)
@@ -1,29 +1,74 @@
+import numpy as np
 from .tournament_strategy import TournamentStrategy
+from player import gather_attribute
 
 
 class RankingBased(TournamentStrategy):
     """Strategy: Adjust tournament selection based on current ranking"""
+    # Last ranking of the top 10, mid tier and climbing groups, everyone below is breaking through
+    TOP_10 = 10
+    MID_TIER = 50
+    CLIMBING = 100
+
+    # Players below this fitness do not play
+    MIN_FITNESS = 0.15
+
+    # Fitness each group must be above and injury proximity it must be below to enter each tier,
+    # infinite where there is no limit, so big events are always entered
+    TOP_10_MIN_FITNESS = {"GrandSlam": -np.inf, "Master1000": -np.inf, "ATP500": 0.7, "ATP250": 0.8}
+    TOP_10_MAX_PROXIMITY = {"GrandSlam": np.inf, "Master1000": np.inf, "ATP500": 0.3, "ATP250": 0.2}
+    MID_TIER_MIN_FITNESS = {"GrandSlam": -np.inf, "Master1000": -np.inf, "ATP500": -np.inf, "ATP250": -np.inf}
+    MID_TIER_MAX_PROXIMITY = {"GrandSlam": np.inf, "Master1000": np.inf, "ATP500": 0.5, "ATP250": 0.4}
+    CLIMBING_MIN_FITNESS = {"GrandSlam": -np.inf, "Master1000": -np.inf, "ATP500": -np.inf, "ATP250": 0.3}
+    CLIMBING_MAX_PROXIMITY = {"GrandSlam": np.inf, "Master1000": np.inf, "ATP500": 0.6, "ATP250": 0.5}
+
+    # Expected points a mid tier player needs from an ATP 250
+    MID_TIER_MIN_POINTS = 20
+
+    # Injury proximity above which a player breaking through skips a tournament, and the fitness they need
+    BREAKTHROUGH_MAX_PROXIMITY = 0.7
+    BREAKTHROUGH_MIN_FITNESS = 0.2
+
     def __init__(self):
         super().__init__("Ranking Based")
 
+    def within_limits(self, group, tournament, fitness, injury_proximity):
+        """
+        Method:
+            Checks a ranking group's fitness and injury proximity limits for a
+            tournament, for one player or arrays of players
+
+        Params:
+            group (str) - "TOP_10", "MID_TIER" or "CLIMBING"
+            tournament (Tournament) - The target tournament
+            fitness (float | np.ndarray)
+            injury_proximity (float | np.ndarray)
+
+        Return:
+            withinLimits (bool | np.ndarray)
+        """
+        minFitness = getattr(self, f"{group}_MIN_FITNESS")[tournament.type]
+        maxProximity = getattr(self, f"{group}_MAX_PROXIMITY")[tournament.type]
+        return (fitness > minFitness) & (injury_proximity < maxProximity)
+
     def should_play_tournament(self, player, tournament, season):
         # Basic health checks
-        if player.isInjured or player.fitness < 0.15:
+        if player.isInjured or player.fitness < self.MIN_FITNESS:
             return False
         
         # Get current ranking
         ranking = player.ranking
         
         # Top 10 players: Focus on big events, be selective
-        if ranking <= 10:
+        if ranking <= self.TOP_10:
             return self._top_10_strategy(player, tournament, season)
         
         # Ranked 11-50: Play most Masters and ATP 500s, selective on 250s
-        elif ranking <= 50:
+        elif ranking <= self.MID_TIER:
             return self._mid_tier_strategy(player, tournament, season)
         
         # Ranked 51-100: Play most tournaments to accumulate points
-        elif ranking <= 100:
+        elif ranking <= self.CLIMBING:
             return self._climbing_strategy(player, tournament, season)
         
         # Outside top 100: Play everything possible to break through
@@ -32,59 +77,29 @@ class RankingBased(TournamentStrategy):
 
     def _top_10_strategy(self, player, tournament, season):
         """Strategy for top 10 players"""
-        # Prioritize Grand Slams and Masters
-        if tournament.type in ["GrandSlam", "Master1000"]:
-            return True
-        
-        # Be selective with ATP 500s
-        if tournament.type == "ATP500":
-            # Only play if fitness is good and injury risk is low
-            injury_proximity = player.injuryRisk / player.injuryThreshold if player.injuryThreshold > 0 else 0
-            return player.fitness > 0.7 and injury_proximity < 0.3
-        
-        # Skip most ATP 250s unless very low risk
-        if tournament.type == "ATP250":
-            injury_proximity = player.injuryRisk / player.injuryThreshold if player.injuryThreshold > 0 else 0
-            return player.fitness > 0.8 and injury_proximity < 0.2
-        
-        return False
+        # Prioritize Grand Slams and Masters, be selective with ATP 500s and skip most ATP 250s unless very low risk
+        # Only play if fitness is good and injury risk is low
+        injury_proximity = player.injuryRisk / player.injuryThreshold if player.injuryThreshold > 0 else 0
+        return self.within_limits("TOP_10", tournament, player.fitness, injury_proximity)
 
     def _mid_tier_strategy(self, player, tournament, season):
         """Strategy for players ranked 11-50"""
-        # Play all Grand Slams and Masters
-        if tournament.type in ["GrandSlam", "Master1000"]:
-            return True
-        
-        # Play most ATP 500s
-        if tournament.type == "ATP500":
-            injury_proximity = player.injuryRisk / player.injuryThreshold if player.injuryThreshold > 0 else 0
-            return injury_proximity < 0.5
+        # Play all Grand Slams and Masters and most ATP 500s
+        injury_proximity = player.injuryRisk / player.injuryThreshold if player.injuryThreshold > 0 else 0
+        if not self.within_limits("MID_TIER", tournament, player.fitness, injury_proximity):
+            return False
         
         # Be somewhat selective with ATP 250s
         if tournament.type == "ATP250":
-            injury_proximity = player.injuryRisk / player.injuryThreshold if player.injuryThreshold > 0 else 0
-            expected_points = season.get_skill_based_expected_points(player, tournament)
-            return injury_proximity < 0.4 and expected_points > 20
+            return season.get_skill_based_expected_points(player, tournament) > self.MID_TIER_MIN_POINTS
         
-        return False
+        return True
 
     def _climbing_strategy(self, player, tournament, season):
         """Strategy for players ranked 51-100"""
-        # Play all big events
-        if tournament.type in ["GrandSlam", "Master1000"]:
-            return True
-        
-        # Play ATP 500s unless high injury risk
-        if tournament.type == "ATP500":
-            injury_proximity = player.injuryRisk / player.injuryThreshold if player.injuryThreshold > 0 else 0
-            return injury_proximity < 0.6
-        
-        # Play most ATP 250s - need points to climb
-        if tournament.type == "ATP250":
-            injury_proximity = player.injuryRisk / player.injuryThreshold if player.injuryThreshold > 0 else 0
-            return injury_proximity < 0.5 and player.fitness > 0.3
-        
-        return False
+        # Play all big events, ATP 500s unless high injury risk, and most ATP 250s - need points to climb
+        injury_proximity = player.injuryRisk / player.injuryThreshold if player.injuryThreshold > 0 else 0
+        return self.within_limits("CLIMBING", tournament, player.fitness, injury_proximity)
 
     def _breakthrough_strategy(self, player, tournament, season):
         """Strategy for players outside top 100"""
@@ -92,11 +107,36 @@ class RankingBased(TournamentStrategy):
         injury_proximity = player.injuryRisk / player.injuryThreshold if player.injuryThreshold > 0 else 0
         
         # Only skip if injury risk is very high
-        if injury_proximity > 0.7:
+        if injury_proximity > self.BREAKTHROUGH_MAX_PROXIMITY:
             return False
         
         # Minimum fitness requirement
-        if player.fitness < 0.2:
+        if player.fitness < self.BREAKTHROUGH_MIN_FITNESS:
             return False
         
-        return True
\ No newline at end of file
+        return True
+
+    def should_play_batch(self, players, tournament, season):
+        # Basic health checks
+        fitness = gather_attribute(players, "fitness")
+        healthy = ~gather_attribute(players, "isInjured") & (fitness >= self.MIN_FITNESS)
+
+        ranking = gather_attribute(players, "ranking")
+        injury_proximity = season.get_injury_proximity_batch(players)
+
+        # Top 10 players: Focus on big events, be selective
+        top10 = self.within_limits("TOP_10", tournament, fitness, injury_proximity)
+
+        # Ranked 11-50: Play most Masters and ATP 500s, selective on 250s
+        midTier = self.within_limits("MID_TIER", tournament, fitness, injury_proximity)
+        if tournament.type == "ATP250":
+            midTier &= season.get_skill_based_expected_points_batch(players, tournament) > self.MID_TIER_MIN_POINTS
+
+        # Ranked 51-100: Play most tournaments to accumulate points
+        climbing = self.within_limits("CLIMBING", tournament, fitness, injury_proximity)
+
+        # Outside top 100: Play everything possible to break through
+        breakthrough = (injury_proximity <= self.BREAKTHROUGH_MAX_PROXIMITY) & (fitness >= self.BREAKTHROUGH_MIN_FITNESS)
+
+        shouldPlay = np.select([ranking <= self.TOP_10, ranking <= self.MID_TIER, ranking <= self.CLIMBING], [top10, midTier, climbing], default=breakthrough)
+        return healthy & shouldPlay
@@ -1,7 +1,51 @@
+import numpy as np
+
+
 class TournamentStrategy:
     def __init__(self, name):
         self.name = name
         
     def should_play_tournament(self, player, tournament, season):
         raise NotImplementedError
-    
\ No newline at end of file
+
+    def set_parameters(self, parameters):
+        """
+        Method:
+            Overrides tunable parameters on this instance only. A name is either an
+            attribute, such as "injury_threshold", or a table and one of its keys,
+            such as "IMPORTANCE.ATP250", in which case the table is copied first so
+            the class default is left alone.
+
+        Params:
+            parameters (dict) - Maps parameter names to their values
+        """
+        for name, value in parameters.items():
+            attribute, _, key = name.partition(".")
+            if not hasattr(self, attribute):
+                raise AttributeError(f"{type(self).__name__} has no parameter {attribute}")
+
+            if key:
+                table = dict(getattr(self, attribute))
+                if key not in table:
+                    raise KeyError(f"{type(self).__name__}.{attribute} has no entry {key}")
+                table[key] = value
+                setattr(self, attribute, table)
+            else:
+                setattr(self, attribute, value)
+
+    def should_play_batch(self, players, tournament, season):
+        """
+        Method:
+            Decides for a list of players following this strategy whether each one
+            should play the tournament. Strategies with array based rules override
+            this, any other strategy falls back to one decision per player.
+
+        Params:
+            players (List(Player)) - The players following this strategy
+            tournament (Tournament) - The target tournament
+            season (Season) - The season being played
+
+        Return:
+            shouldPlay (np.ndarray) - Boolean mask over players
+        """
+        return np.array([self.should_play_tournament(player, tournament, season) for player in players], dtype=bool)
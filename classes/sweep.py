@@ -0,0 +1,347 @@
+# Imports
+import csv
+import hashlib
+import itertools
+import json
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from convergence import get_mean_ranks, get_top50_percentages
+from random_streams import copy_seed_sequence
+from replicates import play_season
+from strategies.big_event_focus import BigEventFocus
+from strategies.injury_avoider import InjuryAvoider
+from strategies.original import Original
+from strategies.play_everything import PlayEverything
+from strategies.ranking_based import RankingBased
+
+# Strategies that parameters can be set on, by class name
+STRATEGIES = {strategy.__name__: strategy for strategy in (BigEventFocus, InjuryAvoider, Original, PlayEverything, RankingBased)}
+
+
+def grid_design(space):
+    """
+    Method:
+        Every combination of the listed values of each parameter
+
+    Params:
+        space (dict): Maps parameter names to lists of values
+
+    Return:
+        configs (List(dict))
+    """
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def random_design(space, numConfigs, rng):
+    """
+    Method:
+        Parameters drawn independently and uniformly from their ranges
+
+    Params:
+        space (dict): Maps parameter names to (low, high) ranges
+        numConfigs (int): The number of configurations
+        rng (np.random.Generator)
+
+    Return:
+        configs (List(dict))
+    """
+    samples = {name: rng.uniform(low, high, numConfigs) for name, (low, high) in space.items()}
+    return [{name: float(values[i]) for name, values in samples.items()} for i in range(numConfigs)]
+
+
+def latin_hypercube_design(space, numConfigs, rng):
+    """
+    Method:
+        Latin hypercube sample: each range is cut into numConfigs equal strata and
+        every stratum of every parameter is used exactly once, in an independent
+        random order per parameter, with a uniform point inside each stratum
+
+    Params:
+        space (dict): Maps parameter names to (low, high) ranges
+        numConfigs (int): The number of configurations
+        rng (np.random.Generator)
+
+    Return:
+        configs (List(dict))
+    """
+    samples = {}
+    for name, (low, high) in space.items():
+        strata = (rng.permutation(numConfigs) + rng.random(numConfigs)) / numConfigs
+        samples[name] = low + strata * (high - low)
+    return [{name: float(values[i]) for name, values in samples.items()} for i in range(numConfigs)]
+
+
+def split_parameters(config):
+    """
+    Method:
+        Groups "Strategy.parameter" names by strategy, as play_season expects
+
+    Params:
+        config (dict): Maps "Strategy.parameter" names to values
+
+    Return:
+        parameters (dict): Maps strategy class names to their parameters
+    """
+    parameters = {}
+    for name, value in config.items():
+        strategy, _, parameter = name.partition(".")
+        if not parameter:
+            raise ValueError(f"Parameter {name} should be named Strategy.parameter")
+        parameters.setdefault(strategy, {})[parameter] = value
+    return parameters
+
+
+def validate_config(config):
+    """
+    Method:
+        Checks every parameter can be set, so mistakes surface before any season is played
+
+    Params:
+        config (dict): Maps "Strategy.parameter" names to values
+    """
+    for strategy, parameters in split_parameters(config).items():
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy {strategy}, choose from {sorted(STRATEGIES)}")
+        STRATEGIES[strategy]().set_parameters(parameters)
+
+
+def get_sweep_seed(cacheDirectory, seed=None):
+    """
+    Method:
+        Returns the root seed of the sweep cached in a directory, storing it the
+        first time. A resumed sweep without a seed continues with the one it
+        started with, so its configurations and replicates match the cached cells.
+
+    Params:
+        cacheDirectory (str): Directory holding the sweep, created if it does not exist
+        seed (int): Seed to use, the stored one or fresh entropy if None
+
+    Return:
+        seed (int)
+    """
+    os.makedirs(cacheDirectory, exist_ok=True)
+    seedPath = os.path.join(cacheDirectory, "seed.json")
+    if seed is None and os.path.exists(seedPath):
+        with open(seedPath) as file:
+            seed = json.load(file)["seed"]
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy)
+    write_json(seedPath, {"seed": seed})
+    return seed
+
+
+def simulate_cell(task):
+    """
+    Method:
+        Plays one replicate of one configuration and reduces it to one row per strategy
+
+    Params:
+        task (tuple): (numPlayers, original, config, seedSequence)
+
+    Return:
+        rows (List(dict)): Mean ranking, top 50 percentage, mean points and mean entries of each strategy
+    """
+    numPlayers, original, config, seedSequence = task
+    result = play_season(numPlayers, original, seedSequence, split_parameters(config))
+
+    names = np.asarray(result.strategyNames)
+    meanRanks = get_mean_ranks(result)
+    top50 = get_top50_percentages(result)
+    entries = sum(result.stats[field] for field in result.ENTRY_FIELDS)
+
+    return [
+        {
+            "strategy": str(strategy),
+            "meanRank": float(meanRanks[strategy]),
+            "top50": float(top50[strategy]),
+            "meanPoints": float(result.stats["rankingPoints"][names == strategy].mean()),
+            "meanEntries": float(entries[names == strategy].mean()),
+        }
+        for strategy in meanRanks
+    ]
+
+
+class ParameterSweep:
+    def __init__(self, configs, numReplicates, cacheDirectory, numPlayers=200, original=False, seed=None):
+        """
+        Method:
+            init method for ParameterSweep class. Plays every (configuration, replicate)
+            cell and keeps each finished cell as a file in the cache directory, so a
+            sweep that is interrupted resumes with only the missing cells.
+
+            Replicate r of every configuration uses the same seed, so configurations
+            are compared on the same players and random streams.
+
+        Params:
+            configs (List(dict)): Maps "Strategy.parameter" names to values, one dict per configuration
+            numReplicates (int): Replicates of every configuration
+            cacheDirectory (str): Directory holding finished cells, created if it does not exist
+            numPlayers (int): The number of players in each season
+            original (bool): Whether every player uses the original strategy
+            seed (int): Root seed, the stored one or fresh entropy if None, see get_sweep_seed
+        """
+        for config in configs:
+            validate_config(config)
+
+        self.configs = configs
+        self.numReplicates = numReplicates
+        self.cacheDirectory = cacheDirectory
+        self.numPlayers = numPlayers
+        self.original = original
+
+        self.seed = get_sweep_seed(cacheDirectory, seed)
+        os.makedirs(os.path.join(cacheDirectory, "cells"), exist_ok=True)
+
+        # One seed per replicate, shared by every configuration
+        self.replicateSeeds = np.random.SeedSequence(self.seed).spawn(numReplicates)
+
+    def get_cell_path(self, config, replicate):
+        """
+        Method:
+            Path of a cell's file, named by a hash of everything that determines its result
+
+        Params:
+            config (dict)
+            replicate (int)
+
+        Return:
+            path (str)
+        """
+        key = json.dumps({
+            "config": config,
+            "replicate": replicate,
+            "numPlayers": self.numPlayers,
+            "original": self.original,
+            "seed": self.seed,
+        }, sort_keys=True)
+        return os.path.join(self.cacheDirectory, "cells", hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+    def get_pending(self):
+        """
+        Method:
+            Lists the cells that have no file in the cache yet
+
+        Return:
+            pending (List(tuple)): (configIndex, replicate)
+        """
+        return [
+            (configIndex, replicate)
+            for configIndex, config in enumerate(self.configs)
+            for replicate in range(self.numReplicates)
+            if not os.path.exists(self.get_cell_path(config, replicate))
+        ]
+
+    def run(self, workers=None, verbose=True):
+        """
+        Method:
+            Plays every pending cell across a pool of worker processes, writing each
+            one to the cache as soon as it finishes
+
+        Params:
+            workers (int): Number of worker processes, every core if None and in process if 1
+            verbose (bool): Whether to print progress
+
+        Return:
+            numPlayed (int): The number of cells played, the rest came from the cache
+        """
+        pending = self.get_pending()
+        total = len(self.configs) * self.numReplicates
+        if verbose:
+            print(f"{total - len(pending)} of {total} cells cached, playing {len(pending)}")
+
+        tasks = {
+            cell: (self.numPlayers, self.original, self.configs[cell[0]], copy_seed_sequence(self.replicateSeeds[cell[1]]))
+            for cell in pending
+        }
+
+        workers = workers or os.cpu_count() or 1
+        if workers == 1:
+            finished = ((cell, simulate_cell(task)) for cell, task in tasks.items())
+            for done, (cell, rows) in enumerate(finished, 1):
+                self.save_cell(cell, rows, done, len(pending), verbose)
+            return len(pending)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(simulate_cell, task): cell for cell, task in tasks.items()}
+            for done, future in enumerate(as_completed(futures), 1):
+                self.save_cell(futures[future], future.result(), done, len(pending), verbose)
+        return len(pending)
+
+    def save_cell(self, cell, rows, done, numPending, verbose):
+        configIndex, replicate = cell
+        write_json(self.get_cell_path(self.configs[configIndex], replicate), rows)
+        if verbose:
+            print(f"\r{done}/{numPending} cells played", end="\n" if done == numPending else "", flush=True)
+
+    def get_table(self):
+        """
+        Method:
+            Builds the tidy results table from every cached cell: one row per
+            configuration, replicate and strategy, with the configuration's
+            parameters as columns
+
+        Return:
+            rows (List(dict))
+        """
+        table = []
+        for configIndex, config in enumerate(self.configs):
+            for replicate in range(self.numReplicates):
+                path = self.get_cell_path(config, replicate)
+                if not os.path.exists(path):
+                    continue
+                with open(path) as file:
+                    for row in json.load(file):
+                        table.append({"config": configIndex, **config, "replicate": replicate, **row})
+        return table
+
+
+def summarise_table(table, metrics=("meanRank", "top50", "meanPoints", "meanEntries")):
+    """
+    Method:
+        Averages the tidy table over replicates, one row per configuration and strategy
+
+    Params:
+        table (List(dict)): Rows from ParameterSweep.get_table
+        metrics (tuple(str)): Columns to average
+
+    Return:
+        rows (List(dict)): Configuration columns, strategy, replicates and the mean of every metric
+    """
+    groups = {}
+    for row in table:
+        groups.setdefault((row["config"], row["strategy"]), []).append(row)
+
+    summary = []
+    for (configIndex, strategy), rows in sorted(groups.items()):
+        first = {name: value for name, value in rows[0].items() if name not in metrics and name != "replicate"}
+        summary.append({**first, "replicates": len(rows), **{metric: float(np.mean([row[metric] for row in rows])) for metric in metrics}})
+    return summary
+
+
+def write_csv(rows, path):
+    """
+    Method:
+        Writes table rows to a CSV file with a header of every column
+
+    Params:
+        rows (List(dict))
+        path (str)
+    """
+    columns = list(dict.fromkeys(column for row in rows for column in row))
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_json(path, data):
+    """
+    Method:
+        Writes JSON atomically, so an interrupted write never leaves a partial file behind
+    """
+    temporaryPath = path + ".tmp"
+    with open(temporaryPath, "w") as file:
+        json.dump(data, file)
+    os.replace(temporaryPath, path)
@@ -0,0 +1,111 @@
+# Imports
+import numpy as np
+import pytest
+from game import check_hold_table
+from tiebreak import Tiebreak, get_tiebreak_win_probabilities
+from set import Set, get_set_outcome_probabilities
+from match import Match, get_match_win_probabilities
+from player import Player
+
+
+# Replicates of each simulated path, the analytic probability must be within this many standard errors
+NUM_REPLICATES = 4000
+TOLERANCE = 4
+
+# Seeds of the player pairs to compare on
+PAIR_SEEDS = [1, 2, 3]
+
+
+def make_pair(seed):
+    """
+    Method:
+        Creates two seeded players
+
+    Params:
+        seed (int)
+
+    Return:
+        players (tuple(Player))
+    """
+    rng = np.random.default_rng(seed)
+    return Player("Server", rng=rng), Player("Returner", rng=rng)
+
+
+def assert_close(wins, probability):
+    """
+    Method:
+        Checks a simulated win count against an analytic win probability
+
+    Params:
+        wins (int): The number of replicates won
+        probability (float): The analytic win probability
+    """
+    standardError = np.sqrt(max(probability * (1 - probability), 1e-4) / NUM_REPLICATES)
+    assert abs(wins / NUM_REPLICATES - probability) < TOLERANCE * standardError
+
+
+def test_hold_table():
+    assert check_hold_table() < 1e-6
+
+
+@pytest.mark.parametrize("seed", PAIR_SEEDS)
+def test_tiebreak_matches_points(seed):
+    server, returner = make_pair(seed)
+    rng = np.random.default_rng(seed)
+
+    wins = 0
+    for _ in range(NUM_REPLICATES):
+        tiebreak = Tiebreak(server, returner, method="points", rng=rng)
+        tiebreak.simulate_tiebreak()
+        wins += tiebreak.winner is server
+
+    probability = get_tiebreak_win_probabilities(
+        np.array([Tiebreak.get_point_probability(server, returner)]),
+        np.array([Tiebreak.get_point_probability(returner, server)]),
+    ).item()
+    assert_close(wins, probability)
+
+
+@pytest.mark.parametrize("seed", PAIR_SEEDS)
+def test_set_matches_games(seed):
+    server, returner = make_pair(seed)
+    rng = np.random.default_rng(seed)
+
+    wins = 0
+    for _ in range(NUM_REPLICATES):
+        currentSet = Set(server, returner, method="games", rng=rng)
+        currentSet.simulate_set()
+        wins += currentSet.winner is server
+
+    outcomes = get_set_outcome_probabilities(
+        np.array([Tiebreak.get_point_probability(server, returner)]),
+        np.array([Tiebreak.get_point_probability(returner, server)]),
+    )
+    probability = sum(outcome.item() for (serverWins, _), outcome in outcomes.items() if serverWins)
+    assert_close(wins, probability)
+
+
+@pytest.mark.parametrize("setFormat", [3, 5])
+@pytest.mark.parametrize("seed", PAIR_SEEDS)
+def test_match_matches_detailed(seed, setFormat):
+    player1, player2 = make_pair(seed)
+    rng = np.random.default_rng(seed)
+    forms = (player1.form, player2.form)
+
+    wins = 0
+    for _ in range(NUM_REPLICATES):
+        match = Match(player1, player2, setFormat, method="detailed", rng=rng)
+        match.simulate_match()
+        wins += match.winner is player1
+
+        # Finishing a match changes both players' form
+        player1.form, player2.form = forms
+
+    # The detailed path tosses a coin for the first server
+    probability = get_match_win_probabilities(
+        np.array([Tiebreak.get_point_probability(player1, player2)]),
+        np.array([Tiebreak.get_point_probability(player2, player1)]),
+        2 if setFormat == 3 else 3,
+        averageServe=True,
+    ).item()
+    assert_close(wins, probability)
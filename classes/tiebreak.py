@@ -2,33 +2,204 @@
 Imports
 """
 
+import functools
 import numpy as np
+from random_streams import resolve_rng
+
+
+class TiebreakDistribution:
+    def __init__(self, serverPoint, returnerPoint):
+        """
+        Method:
+            init method for TiebreakDistribution class. Computes the exact outcome
+            distribution of a first to 7 (win by 2) tiebreak where the first server
+            serves one point and the players then alternate every two points.
+
+        Params:
+            serverPoint (float):   Probability the first server wins a point on their serve
+            returnerPoint (float): Probability the first returner wins a point on their serve
+        """
+        self.serverPoint = serverPoint
+        self.returnerPoint = returnerPoint
+
+        # Probability of reaching each score (server points, returner points) before 7
+        reach = np.zeros((7, 7))
+        reach[0, 0] = 1.0
+
+        # Finite final scores and their probabilities
+        self.scores = []
+        finalProbabilities = []
+
+        for total in range(12):
+            for serverScore in range(max(0, total - 6), min(total, 6) + 1):
+                returnerScore = total - serverScore
+                probability = reach[serverScore, returnerScore]
+
+                # Probability the first server wins the point being played
+                if total == 0 or ((total + 1) // 2) % 2 == 0:
+                    pointWin = serverPoint
+                else:
+                    pointWin = 1 - returnerPoint
+
+                # Server wins the point
+                if serverScore == 6:
+                    self.scores.append((7, returnerScore))
+                    finalProbabilities.append(probability * pointWin)
+                else:
+                    reach[serverScore + 1, returnerScore] += probability * pointWin
+
+                # Returner wins the point
+                if returnerScore == 6:
+                    self.scores.append((serverScore, 7))
+                    finalProbabilities.append(probability * (1 - pointWin))
+                else:
+                    reach[serverScore, returnerScore + 1] += probability * (1 - pointWin)
+
+        self.finalProbabilities = np.array(finalProbabilities)
+
+        # From 6-6 each pair of points has one point on each serve, so a pair either
+        # decides the tiebreak or returns it to an equivalent level score
+        self.levelProbability = reach[6, 6]
+        self.serverPair = serverPoint * (1 - returnerPoint)
+        self.returnerPair = (1 - serverPoint) * returnerPoint
+        decided = self.serverPair + self.returnerPair
+
+        # If neither player can ever win both points of a pair treat it as a coin toss
+        self.serverLevelWin = self.serverPair / decided if decided > 0 else 0.5
+        self.decidedProbability = decided
+
+        serverFinal = sum(p for (a, b), p in zip(self.scores, finalProbabilities) if a > b)
+        self.winProbability = serverFinal + self.levelProbability * self.serverLevelWin
+
+    def sample_score(self, serverWins, rng=None):
+        """
+        Method:
+            Samples a final score conditioned on who won the tiebreak
+
+        Params:
+            serverWins (bool): Whether the first server won the tiebreak
+            rng (np.random.Generator): Generator to draw from, the process wide one if None
+
+        Return:
+            score (List(int)): The first server's points followed by the first returner's points
+        """
+        # Finite scores won by this player and the probability of going beyond 6-6
+        won = [i for i, (a, b) in enumerate(self.scores) if (a > b) == serverWins]
+        levelWin = self.serverLevelWin if serverWins else 1 - self.serverLevelWin
+        weights = np.append(self.finalProbabilities[won], self.levelProbability * levelWin)
+
+        rng = resolve_rng(rng)
+        choice = rng.choice(len(weights), p=weights / weights.sum())
+        if choice < len(won):
+            return list(self.scores[won[choice]])
+
+        # Number of split pairs played after 6-6 before the deciding pair
+        extraPairs = rng.geometric(self.decidedProbability) - 1 if self.decidedProbability > 0 else 0
+        return [8 + extraPairs, 6 + extraPairs] if serverWins else [6 + extraPairs, 8 + extraPairs]
+
+
+@functools.lru_cache(maxsize=65536)
+def get_tiebreak_distribution(serverPoint, returnerPoint):
+    """
+    Method:
+        Returns the (cached) tiebreak distribution for a pair of point probabilities
+
+    Params:
+        serverPoint (float):   Probability the first server wins a point on their serve
+        returnerPoint (float): Probability the first returner wins a point on their serve
+
+    Return:
+        distribution (TiebreakDistribution)
+    """
+    return TiebreakDistribution(serverPoint, returnerPoint)
+
+
+def get_tiebreak_win_probabilities(serverPoint, returnerPoint):
+    """
+    Method:
+        Vectorised tiebreak win probabilities for arrays of point probabilities,
+        using the same process as TiebreakDistribution
+
+    Params:
+        serverPoint (np.ndarray):   Probabilities the first server wins a point on their serve
+        returnerPoint (np.ndarray): Probabilities the first returner wins a point on their serve
+
+    Return:
+        winProbabilities (np.ndarray): Probabilities the first server wins the tiebreak
+    """
+    serverPoint = np.asarray(serverPoint, dtype=float)
+    returnerPoint = np.asarray(returnerPoint, dtype=float)
+
+    returnWin = 1 - returnerPoint
+
+    reach = {(0, 0): np.ones_like(serverPoint)}
+    winProbabilities = np.zeros_like(serverPoint)
+
+    for total in range(12):
+        for serverScore in range(max(0, total - 6), min(total, 6) + 1):
+            returnerScore = total - serverScore
+            probability = reach.pop((serverScore, returnerScore), None)
+            if probability is None:
+                continue
+
+            # Probability the first server wins the point being played
+            pointWin = serverPoint if total == 0 or ((total + 1) // 2) % 2 == 0 else returnWin
+            won = probability * pointWin
+
+            if serverScore == 6:
+                winProbabilities += won
+            else:
+                key = (serverScore + 1, returnerScore)
+                reach[key] = reach[key] + won if key in reach else won
+
+            if returnerScore != 6:
+                key = (serverScore, returnerScore + 1)
+                reach[key] = reach[key] + (probability - won) if key in reach else probability - won
+
+    # Win by two from 6-6
+    serverPair = serverPoint * (1 - returnerPoint)
+    decided = serverPair + (1 - serverPoint) * returnerPoint
+    levelWin = np.divide(serverPair, decided, out=np.full_like(decided, 0.5), where=decided > 0)
+
+    return winProbabilities + reach[(6, 6)] * levelWin
 
 
 class Tiebreak:
-    def __init__(self, server, returner):
+    def __init__(self, server, returner, method="analytic", rng=None):
         """
         Method:
-            init method for Game class
+            init method for Tiebreak class
 
         Params:
             server (Player):   The player that is serving in the game
             returner (Player): The player that is returning in the game
+            method (str):      "analytic" to sample from the exact tiebreak distribution
+                               or "points" to play the tiebreak point by point
+            rng (np.random.Generator): Generator to draw from, the process wide one if None
         """
         # Players
         self.server = server
         self.returner = returner
+        self.method = method
+        self.rng = resolve_rng(rng)
 
         # Points
         self.score = [0, 0]
         self.pointProgression = [0, 15, 30, 40, ("Hold", "Break")]
         self.winner = None
 
-    def simulate_tiebreak(self):
+    def simulate_tiebreak(self, sampleScore=False):
         """
         Method:
             simulates the tiebreak using monte carlo technique
+
+        Params:
+            sampleScore (bool): Whether the analytic method should also sample a final score
         """
+        if self.method == "analytic":
+            self.simulate_analytic(sampleScore)
+            return None
+
         # Initialising variables
         pointNumber = 0
         server = self.server
@@ -46,7 +217,7 @@ class Tiebreak:
             # Simulate point
             sWin = (server.serveStrength * server.form) / ( server.serveStrength * server.form + returner.returnStrength * returner.form )
 
-            if np.random.uniform(0, 1) <= sWin:
+            if self.rng.random() <= sWin:
                 self.score[0] += 1
             else:
                 self.score[1] += 1
@@ -64,7 +235,7 @@ class Tiebreak:
             
             # If the tiebreak score is over 50 pick random winner
             elif 50 in self.score:
-                if np.random.uniform(0,1) >= 0.5:
+                if self.rng.random() >= 0.5:
                     self.winner = server
                     self.score[0] += 1
                 else:
@@ -74,3 +245,40 @@ class Tiebreak:
 
             # increment point number
             pointNumber += 1
+
+    def simulate_analytic(self, sampleScore=False):
+        """
+        Method:
+            Draws the winner of the tiebreak with a single uniform draw from the
+            exact win probability, sampling the score only when asked for
+
+        Params:
+            sampleScore (bool): Whether to also sample a final score
+        """
+        distribution = get_tiebreak_distribution(
+            self.get_point_probability(self.server, self.returner),
+            self.get_point_probability(self.returner, self.server),
+        )
+
+        serverWins = self.rng.random() <= distribution.winProbability
+        self.winner = self.server if serverWins else self.returner
+
+        # Score is given from the perspective of the first server
+        if sampleScore:
+            self.score = distribution.sample_score(serverWins, self.rng)
+
+    @staticmethod
+    def get_point_probability(server, returner):
+        """
+        Method:
+            Calculates the probability the server wins a point, clipped to [0, 1]
+
+        Params:
+            server (Player):   The player serving the point
+            returner (Player): The player returning the point
+
+        Return:
+            sWin (float)
+        """
+        sWin = (server.serveStrength * server.form) / ( server.serveStrength * server.form + returner.returnStrength * returner.form )
+        return min(1.0, max(0.0, sWin))
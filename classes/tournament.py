@@ -1,7 +1,9 @@
 
 # Imports
 import numpy as np
-from match import Match
+from match import Match, get_match_win_probabilities
+from player import update_fitness, check_injuries, get_shared_pool, gather_attribute
+from random_streams import resolve_rng
 
 class Tournament:
     def __init__(self, courtType, name):
@@ -19,6 +21,18 @@ class Tournament:
         # Default match risk for 3 set tournaments
         self.matchRisk = 0.03
 
+        # Weekly win probability matrix for this tournament's match format (set by the season)
+        self.winMatrix = None
+
+        # "bracket" simulates whole rounds on arrays of player ids, "matches" plays match objects
+        self.method = "bracket"
+
+        # Generator for the current edition of the tournament (set with the draw)
+        self.rng = None
+
+        # Ranking index of the season, kept in step as points are awarded (set by the season)
+        self.rankingIndex = None
+
 
     def add_set_format(self, setFormat):
         """
@@ -31,70 +45,83 @@ class Tournament:
         self.setFormat = setFormat
         
         
-    def generate_draw(self, players):
+    def generate_draw(self, players, presorted=False, rng=None):
         """
         Method:
-            Generates the draw for a tournament
+            Generates the draw for a tournament in linear time. Each seeded player
+            (the top quarter of the draw size) is paired with a random non seeded
+            player, then the remaining non seeded players are paired at random.
+            Slots without enough players are left empty (byes).
 
         Params:
             players (List(Player)): The list of the players playing the tournament
+            presorted (bool): Whether players is already ordered by ranking
+            rng (np.random.Generator): Generator used for the draw and the rest of this
+                                       edition of the tournament, the process wide one if None
 
         Returns:
-            draw (List(List(Match))): A list that contains all rounds of the tournament
+            drawSlots (np.ndarray): Round 1 as (drawSize // 2, 2) indexes into self.entrants, -1 for empty
         """
+        self.rng = resolve_rng(rng)
+
+        # Array backed state of the entrants, used by the bracket engine
+        self.pool = get_shared_pool(players)
+        self.playerById = {player.id: player for player in players} if self.pool is not None else {}
+
         # Sort players in terms of rankings
-        players = sorted(players, key=lambda player: player.rankingPoints, reverse=True)
+        if not presorted:
+            players = sorted(players, key=lambda player: player.rankingPoints, reverse=True)
+        self.entrants = list(players)
 
-        # Seperate seeded players and non seeded players
-        seededPlayers = players[: (self.drawSize // 4)]
-        nonSeededPlayers = players[(self.drawSize // 4) :]
+        # Seperate seeded players and non seeded players (as indexes into the entrants)
+        numMatches = self.drawSize // 2
+        numSeeded = min(self.drawSize // 4, len(players))
+        seeded = self.rng.permutation(numSeeded)
+        nonSeeded = numSeeded + self.rng.permutation(len(players) - numSeeded)
 
-        # Initial draw variables
-        self.draw = []
-        round1 = []
+        # Seeded players face a non seeded player while both are available
+        self.drawSlots = np.full((numMatches, 2), -1)
+        seededMatches = min(numSeeded, len(nonSeeded), numMatches)
+        self.drawSlots[:seededMatches, 0] = seeded[:seededMatches]
+        self.drawSlots[:seededMatches, 1] = nonSeeded[:seededMatches]
 
-        # Getting first matches for round 1 based off of seedings
-        for match in range(self.drawSize // 2):
-            
-            # Check if we have enough players to add to round 1
-            if len(seededPlayers) == 0 and len(nonSeededPlayers) < 2:
-                # Not enough players left for a match
-                round1.append(Match(None, None, self.setFormat))
-            
-            # Otherwise check if there are still seeded players to be given a match
-            elif len(seededPlayers) > 0 and len(nonSeededPlayers) > 0:
-                # Get random index of a seeded player and a non seeded one
-                seededIndex = np.random.randint(low=0, high=len(seededPlayers))
-                nonSeededIndex = np.random.randint(low=0, high=len(nonSeededPlayers))
-                
-                # Add them to round 1 matches
-                round1.append(Match(seededPlayers[seededIndex], nonSeededPlayers[nonSeededIndex], self.setFormat))
-                
-                # Delete both players from list to avoid duplicate matches
-                del seededPlayers[seededIndex]
-                del nonSeededPlayers[nonSeededIndex]
-        
-            # If there are no seeded players left make sure we have enough non seeded players to create a match
-            elif len(nonSeededPlayers) >= 2:
-                # Only non-seeded players left, need at least 2 for a match
-                seededIndex = np.random.randint(low=0, high=len(nonSeededPlayers))
-                
-                # Make sure we don't pick the same player twice
-                remaining_indices = [i for i in range(len(nonSeededPlayers)) if i != seededIndex]
-                nonSeededIndex = np.random.choice(remaining_indices)
-                
-                # Append match to round 1
-                round1.append(Match(nonSeededPlayers[seededIndex], nonSeededPlayers[nonSeededIndex], self.setFormat))
-                
-                # Always delete the higher index first to avoid shifting
-                for i in sorted([seededIndex, nonSeededIndex], reverse=True):
-                    del nonSeededPlayers[i]
-            
-            # Otherwise we do not have enough players and the bracket should be empty
-            else:
-                round1.append(Match(None, None, self.setFormat))
+        # Once the seeds are used up the remaining non seeded players play each other
+        if seededMatches == numSeeded:
+            remaining = nonSeeded[seededMatches:]
+            openMatches = min(len(remaining) // 2, numMatches - seededMatches)
+            self.drawSlots[seededMatches : seededMatches + openMatches] = remaining[: 2 * openMatches].reshape(-1, 2)
+
+        # Match objects are only built when the tournament is played match by match
+        self.draw = None
+        return self.drawSlots
+
+    def get_draw_ids(self):
+        """
+        Method:
+            Converts round 1 of the draw into pool ids
+
+        Return:
+            players1 (np.ndarray): Pool id of the first player in each match, -1 if empty
+            players2 (np.ndarray): Pool id of the second player in each match, -1 if empty
+        """
+        entrantIds = np.array([player.id for player in self.entrants] + [-1])
+        return entrantIds[self.drawSlots[:, 0]], entrantIds[self.drawSlots[:, 1]]
+
+    def build_match_draw(self):
+        """
+        Method:
+            Builds the Match objects for round 1 and empty lists for the later rounds
 
-        self.draw.append(round1)
+        Returns:
+            draw (List(List(Match))): A list that contains all rounds of the tournament
+        """
+        round1 = []
+        for index1, index2 in self.drawSlots.tolist():
+            player1 = self.entrants[index1] if index1 >= 0 else None
+            player2 = self.entrants[index2] if index2 >= 0 else None
+            round1.append(Match(player1, player2, self.setFormat, winMatrix=self.winMatrix, rng=self.rng))
+
+        self.draw = [round1]
         
         # Round 1 has been created, create empty lists for the rest of the rounds
         drawSize = self.drawSize // 2
@@ -104,6 +131,8 @@ class Tournament:
 
             # Inserting empty list to draw as the current round
             self.draw.append([])
+
+        return self.draw
     
     
     def simulate_tournament(self):
@@ -111,6 +140,13 @@ class Tournament:
         Method:
             Simulates the tournament using Monte Carlo techniques    
         """
+        # The bracket engine needs every entrant in one player pool
+        if self.method == "bracket" and self.pool is not None:
+            self.simulate_bracket()
+            return None
+
+        self.build_match_draw()
+
         # Initialising variables
         roundIndex = 0
         completed = False
@@ -120,6 +156,7 @@ class Tournament:
         while completed == False:
             # Initialising variables
             nextRoundPlayers = []
+            playedPlayers = []
             drawForCurrentRound = self.draw[roundIndex]
             currentRound = self.rounds[roundIndex]
 
@@ -138,16 +175,16 @@ class Tournament:
                     
                     # Otherwise if the winner won by default handle only winner
                     elif match.loser is None:
-                        match.winner.increment_points(self.roundPoints["winner"])
+                        self.award_points(match.winner, self.roundPoints["winner"])
                         self.winner = match.winner
-                        self.winner.form += 0.5
+                        self.update_form(self.winner, 0.5)
                     
                     # If both players played update accordingly
                     else:
-                        match.winner.increment_points(self.roundPoints["winner"])
+                        self.award_points(match.winner, self.roundPoints["winner"])
                         self.winner = match.winner
-                        match.loser.increment_points(self.roundPoints["finalist"])
-                        self.winner.form += 0.5
+                        self.award_points(match.loser, self.roundPoints["finalist"])
+                        self.update_form(self.winner, 0.5)
                     
                     completed = True
                 
@@ -162,19 +199,24 @@ class Tournament:
                     
                     # If the match was won by default handle only the winner
                     elif match.loser == None:
-                        match.winner.update_fitness(self.matchRisk)
+                        playedPlayers.append(match.winner)
                     
                     # Otherwise handle normally
                     else:
                         # Add points to loser
-                        match.loser.increment_points(self.roundPoints[currentRound])
+                        self.award_points(match.loser, self.roundPoints[currentRound])
                         # Update both players injuries
-                        match.winner.update_fitness(self.matchRisk)
-                        match.loser.update_fitness(self.matchRisk)
+                        playedPlayers += [match.winner, match.loser]
 
             # Safety check to make sure the loop breaks correctly
             if completed == True:
                 break
+
+            # Update the fitness of everyone that played this round together
+            update_fitness(playedPlayers, self.matchRisk)
+
+            # Checking the players still in the draw for injuries together
+            check_injuries([player for player in nextRoundPlayers if player is not None], self.rng)
             
             # Setting up next round
             roundIndex += 1
@@ -188,18 +230,249 @@ class Tournament:
                 player1 = nextRoundPlayers[player1Index]
                 player2 = nextRoundPlayers[player2Index]
 
-                # Checking for injuries (only one player per match gets injured for simplicity)
-                player1Injured = False if player1 is None else player1.check_injury()
-                if not player1Injured:
-                    player2Injured = False if player2 is None else player2.check_injury()
-    
                 # Appending match to next round draw
-                drawForNextRound.append(Match(player1, player2, self.setFormat))
+                drawForNextRound.append(Match(player1, player2, self.setFormat, winMatrix=self.winMatrix, rng=self.rng))
 
                 player1Index += 2
                 player2Index += 2
 
 
+    def simulate_bracket(self):
+        """
+        Method:
+            Simulates the tournament a whole round at a time. Each round is a pair of
+            arrays of pool ids (-1 for an empty slot) and points, form and fitness are
+            applied to the pool with array operations.
+        """
+        pool = self.pool
+        players1, players2 = self.get_draw_ids()
+
+        # Keep each round's pairings and winners
+        self.bracket = []
+
+        for currentRound in self.rounds:
+            winners, losers = self.simulate_round(players1, players2)
+            self.bracket.append((players1, players2, winners))
+
+            playedWinners = winners[winners >= 0]
+            playedLosers = losers[losers >= 0]
+
+            if currentRound == "final":
+                self.award_pool_points(playedWinners, self.roundPoints["winner"])
+                self.award_pool_points(playedLosers, self.roundPoints["finalist"])
+                pool.form[playedWinners] += 0.5
+                if self.winMatrix is not None:
+                    self.winMatrix.mark_dirty_ids(playedWinners)
+                if len(playedWinners) > 0:
+                    self.winner = self.playerById[playedWinners[-1]]
+                break
+
+            # Losers collect their round points and everyone that played loses fitness
+            self.award_pool_points(playedLosers, self.roundPoints[currentRound])
+            pool.update_fitness(np.concatenate([playedWinners, playedLosers]), self.matchRisk)
+
+            # Winners are paired off in draw order and checked for injuries before the next round
+            pool.check_injuries(playedWinners, rng=self.rng)
+            players1 = winners[0::2]
+            players2 = winners[1::2]
+
+    def simulate_round(self, players1, players2):
+        """
+        Method:
+            Resolves every match of a round at once, following the same rules as Match
+
+        Params:
+            players1 (np.ndarray): Pool ids of the first player in each match, -1 if empty
+            players2 (np.ndarray): Pool ids of the second player in each match, -1 if empty
+
+        Return:
+            winners (np.ndarray): Pool id of each match winner, -1 if there was none
+            losers (np.ndarray): Pool id of each match loser, -1 if there was none
+        """
+        pool = self.pool
+        size = len(players1)
+        has1 = players1 >= 0
+        has2 = players2 >= 0
+
+        # Walkovers against empty slots
+        winners = np.where(has1, players1, players2)
+        losers = np.full(size, -1)
+
+        # Coin toss to see who the starting server is
+        coinToss = self.rng.integers(low=1, high=3, size=size)
+        servers = np.where(coinToss == 1, players1, players2)
+        returners = np.where(coinToss == 1, players2, players1)
+
+        # Injured players withdraw (the server is checked first)
+        both = has1 & has2
+        serverInjured = both & pool.isInjured[np.maximum(servers, 0)]
+        returnerInjured = both & ~serverInjured & pool.isInjured[np.maximum(returners, 0)]
+        played = both & ~serverInjured & ~returnerInjured
+
+        # Everything else is decided from the match win probability with one draw per match
+        playedServers = servers[played]
+        playedReturners = returners[played]
+        if self.winMatrix is not None:
+            winProbabilities = self.winMatrix.get_many(playedServers, playedReturners)
+        else:
+            serverPoint = pool.serveStrength[playedServers] * pool.form[playedServers]
+            returnerPoint = pool.serveStrength[playedReturners] * pool.form[playedReturners]
+            winProbabilities = get_match_win_probabilities(
+                np.clip(serverPoint / (serverPoint + pool.returnStrength[playedReturners] * pool.form[playedReturners]), 0, 1),
+                np.clip(returnerPoint / (returnerPoint + pool.returnStrength[playedServers] * pool.form[playedServers]), 0, 1),
+                2 if self.setFormat == 3 else 3,
+                averageServe=True,
+            )
+        serverWins = self.rng.random(len(playedServers)) <= winProbabilities
+
+        winners[serverInjured] = returners[serverInjured]
+        losers[serverInjured] = servers[serverInjured]
+        winners[returnerInjured] = servers[returnerInjured]
+        losers[returnerInjured] = returners[returnerInjured]
+        winners[played] = np.where(serverWins, playedServers, playedReturners)
+        losers[played] = np.where(serverWins, playedReturners, playedServers)
+
+        # Form swings for matches that were played out
+        pool.form[winners[played]] += 0.1
+        pool.form[losers[played]] -= 0.1
+        if self.winMatrix is not None:
+            self.winMatrix.mark_dirty_ids(np.concatenate([winners[played], losers[played]]))
+
+        return winners, losers
+
+    def get_entrant_win_probabilities(self):
+        """
+        Method:
+            Builds the probability that each entrant beats every other entrant, from the
+            weekly win matrix when there is one
+
+        Return:
+            winProbabilities (np.ndarray): (entrants, entrants) matrix in self.entrants order
+        """
+        if self.winMatrix is not None:
+            return self.winMatrix.get_block(self.entrants)
+
+        # Otherwise compute every pairing directly
+        serve = gather_attribute(self.entrants, "serveStrength") * gather_attribute(self.entrants, "form")
+        returns = gather_attribute(self.entrants, "returnStrength") * gather_attribute(self.entrants, "form")
+        rows, cols = np.meshgrid(np.arange(len(self.entrants)), np.arange(len(self.entrants)), indexing="ij")
+        rows, cols = rows.ravel(), cols.ravel()
+        winProbabilities = get_match_win_probabilities(
+            np.clip(serve[rows] / (serve[rows] + returns[cols]), 0, 1),
+            np.clip(serve[cols] / (serve[cols] + returns[rows]), 0, 1),
+            2 if self.setFormat == 3 else 3,
+            averageServe=True,
+        )
+        return winProbabilities.reshape(len(self.entrants), len(self.entrants))
+
+    def compute_outcome_distribution(self):
+        """
+        Method:
+            Computes exactly, over the current draw, the probability that each entrant
+            reaches each round and their expected round points. Uses the standard
+            bracket dynamic program over pairwise win probabilities, so form swings
+            and injuries during the tournament are not modelled.
+
+            The ATP 500 and ATP 250 draws have 64 slots but only five rounds, so, as in
+            the simulation, their final round is two matches that each pay the winner's
+            points. The last column then sums to self.finalMatches (2) rather than 1, and
+            is only a tournament win probability when self.finalMatches is 1.
+
+        Returns:
+            reachProbabilities (np.ndarray): (entrants, len(self.rounds) + 1) array where column k is
+                                             the probability of playing in self.rounds[k] and the last
+                                             column is the probability of winning a final round match
+            expectedPoints (np.ndarray): Expected round points of each entrant
+        """
+        numEntrants = len(self.entrants)
+        slots = self.drawSlots.ravel()
+        occupied = slots >= 0
+
+        # Win probabilities between draw slots (empty slots never reach a round)
+        slotWins = np.zeros((len(slots), len(slots)))
+        if numEntrants > 0:
+            entrantWins = self.get_entrant_win_probabilities()
+            slotWins[np.ix_(occupied, occupied)] = entrantWins[np.ix_(slots[occupied], slots[occupied])]
+
+        # Levels of the full bracket, of which the rounds are the first len(self.rounds)
+        depth = int(np.log2(len(slots)))
+        if 2 ** depth != len(slots) or depth < len(self.rounds):
+            raise ValueError(f"A draw of {len(slots)} slots cannot be played in {len(self.rounds)} rounds")
+        self.finalMatches = 2 ** (depth - len(self.rounds))
+
+        reach = occupied.astype(float)
+        slotReach = [reach]
+        for roundIndex in range(len(self.rounds)):
+            # Blocks of slots whose two halves meet in this round
+            half = 2 ** roundIndex
+            blockSize = 2 * half
+            numBlocks = len(slots) // blockSize
+            blocks = reach.reshape(numBlocks, 2, half)
+            wins = slotWins.reshape(numBlocks, blockSize, numBlocks, blockSize)[np.arange(numBlocks), :, np.arange(numBlocks), :]
+
+            # A player advances by beating whoever comes out of the other half, or by walkover if it is empty
+            firstHalf, secondHalf = blocks[:, 0, :], blocks[:, 1, :]
+            firstWins = np.einsum("bij,bj->bi", wins[:, :half, half:], secondHalf) + (secondHalf.sum(axis=1, keepdims=True) == 0)
+            secondWins = np.einsum("bij,bj->bi", wins[:, half:, :half], firstHalf) + (firstHalf.sum(axis=1, keepdims=True) == 0)
+
+            reach = np.stack([firstHalf * firstWins, secondHalf * secondWins], axis=1).reshape(-1)
+            slotReach.append(reach)
+
+        # Gather the slot probabilities back onto the entrants
+        reachProbabilities = np.zeros((numEntrants, len(self.rounds) + 1))
+        for roundIndex, roundReach in enumerate(slotReach):
+            reachProbabilities[slots[occupied], roundIndex] = roundReach[occupied]
+
+        # Losing in a round earns that round's points, each final round match pays the finalist and the winner
+        eliminated = reachProbabilities[:, :-1] - reachProbabilities[:, 1:]
+        roundPoints = [self.roundPoints[name] for name in self.rounds[:-1]] + [self.roundPoints["finalist"]]
+        expectedPoints = eliminated @ np.array(roundPoints, dtype=float) + reachProbabilities[:, -1] * self.roundPoints["winner"]
+
+        self.reachProbabilities = reachProbabilities
+        self.expectedPoints = expectedPoints
+        return reachProbabilities, expectedPoints
+
+    def update_form(self, player, change):
+        """
+        Method:
+            Changes a player's form and flags their win probabilities as stale
+
+        Params:
+            player (Player)
+            change (float)
+        """
+        player.form += change
+        if self.winMatrix is not None:
+            self.winMatrix.mark_dirty(player)
+
+    def award_points(self, player, points):
+        """
+        Method:
+            Gives a player ranking points and moves them in the season's ranking index
+
+        Params:
+            player (Player)
+            points (int)
+        """
+        player.increment_points(points)
+        if self.rankingIndex is not None:
+            self.rankingIndex.update(player.id, player.rankingPoints)
+
+    def award_pool_points(self, ids, points):
+        """
+        Method:
+            Vectorised award_points for players of the tournament's pool
+
+        Params:
+            ids (np.ndarray): Unique pool ids of the players
+            points (int)
+        """
+        self.pool.add_points(ids, points)
+        if self.rankingIndex is not None:
+            for playerId, playerPoints in zip(ids.tolist(), self.pool.rankingPoints[ids].tolist()):
+                self.rankingIndex.update(playerId, playerPoints)
+
+
 class GrandSlam(Tournament):
     def __init__(self, courtType, name):
         """
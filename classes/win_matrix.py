@@ -0,0 +1,193 @@
+# Imports
+import numpy as np
+from match import get_match_win_probabilities
+from player import gather_attribute, get_shared_pool
+
+
+class WinMatrix:
+    def __init__(self, players, setFormat):
+        """
+        Method:
+            init method for WinMatrix class. Holds the probability that each player
+            beats every other player in a match of the given format, averaged over
+            the coin toss for who serves first.
+
+            Entries are computed lazily, the first time a pair is looked up, and kept
+            until either player's form changes, so building the matrix over the whole
+            field only gathers the players' strengths.
+
+        Params:
+            players (List(Player)): The players in the field
+            setFormat (int): The format of the matches e.g. 5 for grand slams and 3 otherwise
+        """
+        self.players = list(players)
+        self.setTarget = 2 if setFormat == 3 else 3
+
+        # Matrix row of each pool id, for looking players up by id in bulk, or of each player otherwise
+        pool = get_shared_pool(self.players)
+        self.rowOfId = None
+        self.index = None
+        if pool is not None:
+            self.rowOfId = np.full(pool.size, -1)
+            self.rowOfId[[player.id for player in self.players]] = np.arange(len(self.players))
+        else:
+            self.index = {player: i for i, player in enumerate(self.players)}
+
+        # Players whose form has changed since their entries were computed
+        self.dirty = set()
+
+        self.build()
+
+    def build(self):
+        """
+        Method:
+            Gathers the strengths and forms of the field and empties the cache
+        """
+        self.serveStrengths = gather_attribute(self.players, "serveStrength").astype(float)
+        self.returnStrengths = gather_attribute(self.players, "returnStrength").astype(float)
+        self.forms = gather_attribute(self.players, "form").astype(float)
+
+        # Computed entries keyed by (row, col) with row < col, each stored with the versions of
+        # its rows, where a row's version counts the form changes it has been refreshed for.
+        # An entry computed before either row changed is stale and is overwritten when next looked up
+        self.versions = np.zeros(len(self.players), dtype=np.int64)
+        self.cache = {}
+        self.dirty.clear()
+
+    def get_row(self, player):
+        return self.index[player] if self.index is not None else self.rowOfId.item(player.id)
+
+    def fill(self, rows, cols):
+        """
+        Method:
+            Computes the win probabilities for the given pairs of players
+
+        Params:
+            rows (np.ndarray): Indexes of the first player of each pair
+            cols (np.ndarray): Indexes of the second player of each pair
+
+        Return:
+            winProbabilities (np.ndarray): The probability that each first player wins
+        """
+        # Point win probabilities on each player's serve
+        rowServe = self.serveStrengths[rows] * self.forms[rows]
+        colServe = self.serveStrengths[cols] * self.forms[cols]
+        rowPoint = np.clip(rowServe / (rowServe + self.returnStrengths[cols] * self.forms[cols]), 0, 1)
+        colPoint = np.clip(colServe / (colServe + self.returnStrengths[rows] * self.forms[rows]), 0, 1)
+
+        # Average over the first player serving first and the second player serving first
+        return get_match_win_probabilities(rowPoint, colPoint, self.setTarget, averageServe=True)
+
+    def mark_dirty(self, player):
+        """
+        Method:
+            Flags that a player's form has changed so their entries are stale
+
+        Params:
+            player (Player)
+        """
+        self.dirty.add(self.get_row(player))
+
+    def mark_dirty_ids(self, ids):
+        """
+        Method:
+            Flags that the form of the players with the given pool ids has changed
+
+        Params:
+            ids (np.ndarray): Pool ids of the players
+        """
+        self.dirty.update(self.rowOfId[ids].tolist())
+
+    def refresh(self):
+        """
+        Method:
+            Reads the new form of every stale player and bumps their versions, which
+            marks their cached entries as stale
+        """
+        if not self.dirty:
+            return None
+
+        dirtyIndexes = np.fromiter(self.dirty, dtype=int)
+        self.forms[dirtyIndexes] = gather_attribute([self.players[i] for i in dirtyIndexes], "form")
+        self.versions[dirtyIndexes] += 1
+        self.dirty.clear()
+
+    def lookup(self, rows, cols):
+        """
+        Method:
+            Fetches the win probabilities of pairs of rows, computing the pairs that
+            are not cached in one vectorised call
+
+        Params:
+            rows (np.ndarray): Indexes of the first player of each pair
+            cols (np.ndarray): Indexes of the second player of each pair
+
+        Return:
+            winProbabilities (np.ndarray): The probability that each first player wins
+        """
+        self.refresh()
+
+        # Every pair is stored once, oriented from the lower row to the higher row
+        low = np.minimum(rows, cols)
+        high = np.maximum(rows, cols)
+        keys = list(zip(low.tolist(), high.tolist()))
+        versions = list(zip(self.versions[low].tolist(), self.versions[high].tolist()))
+
+        # Entries that are missing or were computed for older versions of either row
+        missing = []
+        for i, key in enumerate(keys):
+            entry = self.cache.get(key)
+            if entry is None or entry[0] != versions[i]:
+                missing.append(i)
+        if missing:
+            for i, winProbability in zip(missing, self.fill(low[missing], high[missing]).tolist()):
+                self.cache[keys[i]] = (versions[i], winProbability)
+
+        lowWins = np.array([self.cache[key][1] for key in keys])
+        return np.where(rows == low, lowWins, 1 - lowWins)
+
+    def get(self, player1, player2):
+        """
+        Method:
+            Fetches the probability that player1 beats player2
+
+        Params:
+            player1 (Player)
+            player2 (Player)
+
+        Return:
+            winProbability (float)
+        """
+        return self.lookup(np.array([self.get_row(player1)]), np.array([self.get_row(player2)])).item()
+
+    def get_many(self, ids1, ids2):
+        """
+        Method:
+            Fetches the probability that each player in ids1 beats the matching player in ids2
+
+        Params:
+            ids1 (np.ndarray): Pool ids of the first players
+            ids2 (np.ndarray): Pool ids of the second players
+
+        Return:
+            winProbabilities (np.ndarray)
+        """
+        return self.lookup(self.rowOfId[ids1], self.rowOfId[ids2])
+
+    def get_block(self, players):
+        """
+        Method:
+            Fetches the probability that each of the given players beats every other one
+
+        Params:
+            players (List(Player))
+
+        Return:
+            winProbabilities (np.ndarray): (players, players) matrix in the given order, 0.5 on the diagonal
+        """
+        rows = np.array([self.get_row(player) for player in players], dtype=int)
+        first, second = np.nonzero(~np.eye(len(rows), dtype=bool))
+
+        block = np.full((len(rows), len(rows)), 0.5)
+        block[first, second] = self.lookup(rows[first], rows[second])
+        return block